@@ -0,0 +1,66 @@
+###
+# (C) Copyright [2019] Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##
+
+"""Benchmarks the JSON codecs decoding large /backups and /virtual_machines pages.
+
+Usage:
+    python benchmarks/bench_json_codecs.py [--repeat N]
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from simplivity import json_codecs
+
+import payloads
+
+PAYLOADS = [
+    ("virtual_machines x500", "virtual_machines", payloads.virtual_machine, 500),
+    ("virtual_machines x5000", "virtual_machines", payloads.virtual_machine, 5000),
+    ("backups x500", "backups", payloads.backup, 500),
+    ("backups x50000", "backups", payloads.backup, 50000),
+]
+
+
+def decode_with_str_copy(data):
+    """Decoding path used before the codecs: full str copy, then parse."""
+    return json.loads(data.decode('utf-8'))
+
+
+def run(repeat):
+    decoders = [("json (decode+loads)", decode_with_str_copy)]
+    for codec_cls in json_codecs.CODECS:
+        if codec_cls.is_available():
+            decoders.append((codec_cls.name, codec_cls().loads))
+
+    print("{:<24} {:>10} {:<20} {:>10} {:>10}".format("payload", "size KB", "decoder", "best ms", "MB/s"))
+    for label, members_field, factory, count in PAYLOADS:
+        data = payloads.encoded_listing(members_field, factory, count)
+        for name, decode in decoders:
+            best = min(timeit.repeat(lambda: decode(data), number=1, repeat=repeat))
+            print("{:<24} {:>10.0f} {:<20} {:>10.2f} {:>10.1f}".format(
+                label, len(data) / 1024.0, name, best * 1000, len(data) / best / 1e6))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5, help="Number of runs per payload, the best one is reported")
+    run(parser.parse_args().repeat)
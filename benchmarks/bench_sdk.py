@@ -0,0 +1,358 @@
+###
+# (C) Copyright [2019] Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##
+
+"""Benchmarks the SDK hot paths against the fake OVC.
+
+The benchmarks run offline on a synthetic federation: listing the backups with
+get_all and Pagination, creating the resource objects, decoding large pages,
+waiting for short tasks, bulk VM operations and logins under concurrency. The
+GET requests of a cassette recorded from an OVC can be replayed too. The
+results are written as JSON and can be compared with a baseline, to catch
+throughput or p99 latency regressions between releases.
+
+Usage:
+    python benchmarks/bench_sdk.py [--output results.json] [--baseline baseline.json] [--backups N] [--cassette FILE]
+"""
+
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import platform
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+import simplivity
+from simplivity import json_codecs
+from simplivity.cassette import Cassette
+from simplivity.ovc_client import OVC
+from simplivity.resources.resource import build_resource_objects
+from simplivity.testing import inventory
+from simplivity.testing.fake_ovc import FakeOVC
+
+import payloads
+
+# Tolerated relative change before a result is reported as a regression
+DEFAULT_TOLERANCE = 0.10
+
+
+def percentile(samples, fraction):
+    """Gets a percentile of samples by nearest rank, 0.0 without samples."""
+    if not samples:
+        return 0.0
+
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))]
+
+
+class Recorder(object):
+    """Records the latencies of the operations of a benchmark."""
+
+    def __init__(self):
+        self.latencies = []
+        self._started = time.perf_counter()
+
+    @contextlib.contextmanager
+    def measure(self):
+        """Measures the latency of one operation."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.latencies.append(time.perf_counter() - started)
+
+    def result(self, items, **extra):
+        """Gets the result of the benchmark.
+
+        Args:
+            items: Number of items processed (resources, requests, tasks...).
+            extra: Other measures of the benchmark.
+
+        Returns:
+            dict: Items, seconds, throughput (items per second) and latency percentiles in milliseconds.
+        """
+        seconds = time.perf_counter() - self._started
+        result = {
+            "items": items,
+            "operations": len(self.latencies),
+            "seconds": round(seconds, 6),
+            "throughput": round(items / seconds, 3) if seconds else 0.0,
+            "latency_ms": {name: round(value * 1000, 3) for name, value in (
+                ("p50", percentile(self.latencies, 0.50)),
+                ("p90", percentile(self.latencies, 0.90)),
+                ("p99", percentile(self.latencies, 0.99)),
+                ("max", max(self.latencies, default=0.0)))},
+        }
+        result.update(extra)
+        return result
+
+
+def bench_list_backups_pagination(fake, ovc, args):
+    recorder = Recorder()
+    with recorder.measure():
+        pages = ovc.backups.get_all(pagination=True, page_size=args.page_size, limit=args.backups)
+    count = pages.data["size"]
+
+    while pages.data["page"] < pages.data["requested_pages"]:
+        with recorder.measure():
+            count += pages.next_page()["size"]
+
+    return recorder.result(count)
+
+
+def bench_list_backups_stream(fake, ovc, args):
+    recorder = Recorder()
+    with recorder.measure():
+        count = sum(1 for _ in ovc.backups.get_all(limit=args.backups, stream=True))
+
+    return recorder.result(count)
+
+
+def bench_resource_objects(fake, ovc, args):
+    data = [payloads.backup(index) for index in range(args.backups)]
+    recorder = Recorder()
+    for _ in range(args.repeat):
+        with recorder.measure():
+            build_resource_objects(ovc.backups, data)
+
+    return recorder.result(len(data) * args.repeat)
+
+
+def bench_json_decode(fake, ovc, args):
+    page = payloads.encoded_listing("backups", payloads.backup, args.page_size)
+    codec = json_codecs.get_codec()
+    recorder = Recorder()
+    for _ in range(args.repeat * 10):
+        with recorder.measure():
+            codec.loads(page)
+
+    return recorder.result(len(page) * args.repeat * 10, codec=codec.name, unit="bytes")
+
+
+def bench_task_wait(fake, ovc, args):
+    fake.task_duration = args.task_duration
+    vms = ovc.virtual_machines.get_all(limit=args.tasks)
+    recorder = Recorder()
+    try:
+        for vm in vms:
+            with recorder.measure():
+                vm.power_off()
+    finally:
+        fake.task_duration = 0.0
+
+    stats = ovc.task_stats.get("POST /virtual_machines/{id}/power_off")
+    return recorder.result(len(vms), task_duration=args.task_duration, mean_polls=stats.mean_polls,
+                           wasted_sleep=round(stats.wasted_sleep, 3))
+
+
+def bench_bulk_set_policy(fake, ovc, args):
+    policy = ovc.policies.get_all(limit=1)[0]
+    vms = ovc.virtual_machines.get_all(limit=args.bulk)
+    recorder = Recorder()
+    with recorder.measure():
+        ovc.virtual_machines.set_policy_for_multiple_vms(policy, vms)
+
+    return recorder.result(len(vms))
+
+
+def bench_concurrent_set_policy(fake, ovc, args):
+    policy = ovc.policies.get_all(limit=1)[0]
+    vms = ovc.virtual_machines.get_all(limit=args.bulk)
+    recorder = Recorder()
+
+    def set_policy(vm):
+        with recorder.measure():
+            vm.set_policy(policy)
+
+    errors = sum(1 for result in ovc.map(set_policy, vms, max_workers=args.threads) if not result.ok)
+    return recorder.result(len(vms), errors=errors)
+
+
+def bench_bulk_delete_backups(fake, ovc, args):
+    backups = ovc.backups.get_all(limit=args.bulk)
+    recorder = Recorder()
+    with recorder.measure():
+        ovc.backups.delete_multiple_backups(backups)
+
+    return recorder.result(len(backups))
+
+
+def bench_concurrent_relogin(fake, ovc, args):
+    """Revokes the tokens, then calls the OVC from several threads at once."""
+    recorder = Recorder()
+    logins = fake.requests["POST /oauth/token"]
+
+    for _ in range(args.repeat):
+        fake.revoke_tokens()
+        barrier = threading.Barrier(args.threads)
+
+        def call():
+            barrier.wait()
+            with recorder.measure():
+                ovc.hosts.get_all()
+
+        threads = [threading.Thread(target=call) for _ in range(args.threads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    return recorder.result(args.threads * args.repeat, logins=fake.requests["POST /oauth/token"] - logins)
+
+
+def bench_cassette_replay(fake, ovc, args):
+    """Replays the GET requests of a recorded cassette, decoding the responses and creating the resource objects."""
+    cassette = Cassette.load(args.cassette)
+    ovc = OVC({"ip": "replay", "credentials": {"username": "replay", "password": "replay"}, "cassette": cassette})
+    paths = [interaction["path"] for interaction in cassette.interactions if interaction["method"] == "GET"]
+    recorder = Recorder()
+    count = 0
+
+    for path in paths:
+        with recorder.measure():
+            response = ovc.connection.get(path)
+            count += len(create_listed_objects(ovc, path, response))
+
+    return recorder.result(count, requests=len(paths))
+
+
+def create_listed_objects(ovc, path, response):
+    """Creates the resource objects of a listing response, if the path is a listing of a resource class."""
+    collection = path.split('?')[0].strip('/')
+    resources = getattr(ovc, collection, None) if '/' not in collection else None
+    members = response.get(collection) if isinstance(response, dict) else None
+    if resources is None or not isinstance(members, list):
+        return []
+
+    return build_resource_objects(resources, members)
+
+
+BENCHMARKS = [
+    ("list_backups_pagination", bench_list_backups_pagination),
+    ("list_backups_stream", bench_list_backups_stream),
+    ("resource_objects", bench_resource_objects),
+    ("json_decode", bench_json_decode),
+    ("task_wait", bench_task_wait),
+    ("bulk_set_policy", bench_bulk_set_policy),
+    ("concurrent_set_policy", bench_concurrent_set_policy),
+    ("bulk_delete_backups", bench_bulk_delete_backups),
+    ("concurrent_relogin", bench_concurrent_relogin),
+    ("cassette_replay", bench_cassette_replay),
+]
+
+
+def run(args):
+    """Runs the selected benchmarks.
+
+    Returns:
+        dict: Environment, parameters and results keyed by benchmark name.
+    """
+    vms = max(args.bulk, args.tasks, -(-args.backups // args.backups_per_vm))
+    federation = inventory.build_federation(virtual_machines=vms, backups_per_vm=args.backups_per_vm)
+
+    report = {
+        "sdk_version": simplivity.__version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "date": datetime.datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ'),
+        "parameters": {name: value for name, value in sorted(vars(args).items())
+                       if name not in ("output", "baseline", "only")},
+        "results": {},
+    }
+
+    with FakeOVC(federation, latency=args.latency, seed=0) as fake:
+        for name, benchmark in BENCHMARKS:
+            if args.only and name not in args.only or name == "cassette_replay" and not args.cassette:
+                continue
+            ovc = OVC(fake.config(pool_size=args.threads))
+            report["results"][name] = benchmark(fake, ovc, args)
+            ovc.logout()
+            print_result(name, report["results"][name])
+
+    return report
+
+
+def print_result(name, result):
+    latency = result["latency_ms"]
+    print("{:<26} {:>10} items {:>12.1f}/s  p50 {:>9.2f} ms  p99 {:>9.2f} ms".format(
+        name, result["items"], result["throughput"], latency["p50"], latency["p99"]))
+
+
+def compare(report, baseline, tolerance):
+    """Compares results with a baseline report.
+
+    Returns:
+        list: Regressions, as messages. A regression is a throughput lower or a p99
+        latency higher than the baseline by more than the tolerance.
+    """
+    regressions = []
+    for name, result in report["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous:
+            continue
+
+        if result["throughput"] < previous["throughput"] * (1 - tolerance):
+            regressions.append("{}: throughput {:.1f}/s, baseline {:.1f}/s".format(
+                name, result["throughput"], previous["throughput"]))
+
+        p99, previous_p99 = result["latency_ms"]["p99"], previous["latency_ms"]["p99"]
+        if p99 > previous_p99 * (1 + tolerance):
+            regressions.append("{}: p99 latency {:.2f} ms, baseline {:.2f} ms".format(name, p99, previous_p99))
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', help="JSON file receiving the results")
+    parser.add_argument('--baseline', help="JSON results of a previous run to compare with")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="Relative change tolerated before reporting a regression")
+    parser.add_argument('--only', nargs='*', help="Names of the benchmarks to run")
+    parser.add_argument('--backups', type=int, default=100000, help="Number of backups listed")
+    parser.add_argument('--backups-per-vm', type=int, default=2)
+    parser.add_argument('--page-size', type=int, default=5000, help="Page size of the listings")
+    parser.add_argument('--tasks', type=int, default=5, help="Number of task waits")
+    parser.add_argument('--task-duration', type=float, default=0.2, help="Seconds before a task completes")
+    parser.add_argument('--bulk', type=int, default=500, help="Number of VMs or backups of the bulk operations")
+    parser.add_argument('--threads', type=int, default=16, help="Number of concurrent calls")
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds added to each response by the server")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--cassette', help="Cassette recorded from an OVC, its GET requests are replayed")
+    args = parser.parse_args(argv)
+
+    report = run(args)
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as baseline:
+            regressions = compare(report, json.load(baseline), args.tolerance)
+        for regression in regressions:
+            print("REGRESSION " + regression)
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,108 @@
+###
+# (C) Copyright [2019] Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##
+
+"""Builds synthetic listing payloads shaped like the OVC responses."""
+
+import json
+import uuid
+import zlib
+
+
+def _uid(index, kind):
+    return str(uuid.UUID(int=zlib.crc32(kind.encode()) << 96 | index))
+
+
+def virtual_machine(index):
+    """Returns the data of a VM listed with show_optional_fields=true."""
+    return {
+        "id": _uid(index, "vm"),
+        "name": "vm-{:06d}".format(index),
+        "state": "ALIVE",
+        "created_at": "2020-05-11T10:24:12Z",
+        "policy_id": _uid(index % 20, "policy"),
+        "policy_name": "policy-{}".format(index % 20),
+        "datastore_id": _uid(index % 50, "datastore"),
+        "datastore_name": "datastore-{}".format(index % 50),
+        "omnistack_cluster_id": _uid(index % 10, "cluster"),
+        "omnistack_cluster_name": "cluster-{}".format(index % 10),
+        "compute_cluster_parent_hypervisor_object_id": "datacenter-{}".format(index % 4),
+        "compute_cluster_parent_name": "DC{}".format(index % 4),
+        "hypervisor_management_system": "10.0.0.{}".format(index % 4),
+        "hypervisor_management_system_name": "vcenter-{}".format(index % 4),
+        "hypervisor_object_id": "vm-{}".format(index),
+        "hypervisor_type": "VSPHERE",
+        "hypervisor_folder_name": "production",
+        "hypervisor_allocated_capacity": 107374182400,
+        "hypervisor_consumed_storage": 53687091200,
+        "hypervisor_free_space": 53687091200,
+        "hypervisor_cpu_count": 4,
+        "hypervisor_total_memory": 16384,
+        "hypervisor_virtual_disk_count": 2,
+        "hypervisor_allocated_cpu": 9600,
+        "hypervisor_is_template": False,
+        "hypervisor_virtual_machine_power_state": "ON",
+        "app_aware_vm_status": "VALID",
+        "ha_status": "SAFE",
+        "ha_resynchronization_progress": 100,
+        "host_id": _uid(index % 40, "host"),
+        "replica_set": [{"id": _uid(index % 40, "host"), "role": "PRIMARY"},
+                        {"id": _uid((index + 1) % 40, "host"), "role": "SECONDARY"}],
+    }
+
+
+def backup(index):
+    """Returns the data of a backup."""
+    return {
+        "id": _uid(index, "backup"),
+        "name": "backup-{:07d}".format(index),
+        "state": "PROTECTED",
+        "type": "POLICY",
+        "created_at": "2020-05-11T10:24:12Z",
+        "expiration_time": "2020-06-11T10:24:12Z",
+        "application_consistent": False,
+        "consistency_type": "NONE",
+        "virtual_machine_id": _uid(index % 5000, "vm"),
+        "virtual_machine_name": "vm-{:06d}".format(index % 5000),
+        "virtual_machine_type": "VM",
+        "virtual_machine_state": "ALIVE",
+        "datastore_id": _uid(index % 50, "datastore"),
+        "datastore_name": "datastore-{}".format(index % 50),
+        "omnistack_cluster_id": _uid(index % 10, "cluster"),
+        "omnistack_cluster_name": "cluster-{}".format(index % 10),
+        "compute_cluster_parent_hypervisor_object_id": "datacenter-{}".format(index % 4),
+        "compute_cluster_parent_name": "DC{}".format(index % 4),
+        "hypervisor_type": "VSPHERE",
+        "sent": 1073741824,
+        "sent_duration": 42,
+        "sent_completion_time": "2020-05-11T10:25:12Z",
+        "size": 53687091200,
+        "unique_size_bytes": 1073741824,
+        "unique_size_timestamp": "2020-05-11T10:25:12Z",
+        "replication_start_time": "2020-05-11T10:24:30Z",
+        "replication_end_time": "2020-05-11T10:25:12Z",
+        "cluster_group_ids": [_uid(0, "cluster_group")],
+    }
+
+
+def listing(members_field, item_factory, count, offset=0):
+    """Returns a listing response document."""
+    return {"offset": offset, "limit": count, "count": count,
+            members_field: [item_factory(offset + index) for index in range(count)]}
+
+
+def encoded_listing(members_field, item_factory, count):
+    """Returns a listing response encoded as it is received from the OVC."""
+    return json.dumps(listing(members_field, item_factory, count)).encode('utf-8')
@@ -26,5 +26,6 @@ setup(name='simplivity',
       author_email='simplivity-pythonsdk@hpe.com',
       license='Apache',
       packages=find_packages(exclude=['examples*', 'tests*']),
+      package_data={'simplivity.testing': ['*.crt', '*.key']},
       keywords=['simplivity', 'hpe'],
-      python_requires='>=3.3')
+      python_requires='>=3.6')
@@ -0,0 +1,203 @@
+###
+# (C) Copyright [2019] Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##
+
+"""Batching of single-resource operations into the bulk requests of the OVC.
+
+While a batch is open on a connection, the operations which have a bulk
+endpoint made by the same thread are queued instead of being sent, and return
+a Future. When the batch
+is flushed, the queued operations are grouped, for example the set_policy calls
+by policy, and sent as a few bulk requests; the Future of each operation gets
+its own result.
+"""
+
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from simplivity import exceptions
+
+# Maximum number of resources in one bulk request, the resources are then
+# listed by id and 100 ids keep the URL under the usual 8 KB limits
+MAX_BATCH_SIZE = 100
+
+# Kinds of batched operations
+SET_POLICY = 'set_policy'
+DELETE_BACKUP = 'delete_backup'
+
+MSG_BATCH_OPEN = "A batch is already open on this connection in this thread"
+MSG_NOT_AFFECTED = "The resource {} was not affected by the bulk {} request"
+
+# Open batches by connection, each thread has its own
+_local = threading.local()
+
+
+def _get_batches():
+    """Gets the batches open by the current thread, by connection."""
+    if not hasattr(_local, 'batches'):
+        _local.batches = weakref.WeakKeyDictionary()
+
+    return _local.batches
+
+
+def get_batch(connection):
+    """Gets the batch open on a connection by the current thread, None if there is none."""
+    return _get_batches().get(connection)
+
+
+class Batch(object):
+    """Queues the batched operations made on a connection and sends them as bulk requests.
+
+    Only the operations of the thread which opened the batch are queued, the
+    other threads keep sending theirs. The operations are flushed when the batch is closed, or on flush(). If the
+    block of the batch raises an exception, the queued operations are cancelled.
+
+    Attributes:
+        operations: Number of operations queued.
+        requests: Number of bulk requests sent.
+    """
+
+    def __init__(self, connection, max_size=MAX_BATCH_SIZE, timeout=-1):
+        """Initializes an empty batch.
+
+        Args:
+            connection: Connection of the batched operations.
+            max_size: Maximum number of resources in one bulk request.
+            timeout: Timeout of the tasks of the bulk requests in seconds.
+        """
+        self._connection = connection
+        self._max_size = max_size
+        self._timeout = timeout
+        self._groups = OrderedDict()
+        self._lock = threading.Lock()
+        self.operations = 0
+        self.requests = 0
+
+    def __enter__(self):
+        batches = _get_batches()
+        if self._connection in batches:
+            raise exceptions.HPESimpliVityException(MSG_BATCH_OPEN)
+        batches[self._connection] = self
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _get_batches().pop(self._connection, None)
+
+        if exc_type is None:
+            self.flush()
+        else:
+            self.cancel()
+
+    def set_policy(self, vm, policy):
+        """Queues the policy change of a virtual machine.
+
+        Args:
+            vm: VirtualMachine object.
+            policy: Policy object or reference.
+
+        Returns:
+            concurrent.futures.Future: Future of the virtual machine object, refreshed.
+        """
+        return self.__add((SET_POLICY, policy.data["id"]), policy, vm)
+
+    def delete_backup(self, backup):
+        """Queues the deletion of a backup.
+
+        Args:
+            backup: Backup object.
+
+        Returns:
+            concurrent.futures.Future: Future of None.
+        """
+        return self.__add((DELETE_BACKUP, None), None, backup)
+
+    def flush(self):
+        """Sends the queued operations as bulk requests and sets the results of their futures."""
+        with self._lock:
+            groups = self._groups
+            self._groups = OrderedDict()
+
+        for (kind, _), (argument, operations) in groups.items():
+            for start in range(0, len(operations), self._max_size):
+                self.__send(kind, argument, operations[start:start + self._max_size])
+
+    def cancel(self):
+        """Cancels the queued operations."""
+        with self._lock:
+            groups = self._groups
+            self._groups = OrderedDict()
+
+        for _, operations in groups.values():
+            for _, future in operations:
+                future.cancel()
+
+    def __add(self, key, argument, resource):
+        future = Future()
+        with self._lock:
+            self._groups.setdefault(key, (argument, []))[1].append((resource, future))
+            self.operations += 1
+
+        return future
+
+    def __send(self, kind, argument, operations):
+        """Sends one bulk request for a group of operations."""
+        operations = [(resource, future) for resource, future in operations if future.set_running_or_notify_cancel()]
+        if not operations:
+            return
+
+        resources = [resource for resource, _ in operations]
+        self.requests += 1
+        try:
+            if kind == SET_POLICY:
+                results = self.__set_policy(argument, resources)
+            else:
+                results = self.__delete_backups(resources)
+        except Exception as error:
+            for _, future in operations:
+                future.set_exception(error)
+            return
+
+        for (_, future), result in zip(operations, results):
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def __set_policy(self, policy, vms):
+        updated = {}
+        for vm in vms[0]._resources.set_policy_for_multiple_vms(policy, vms, self._timeout):
+            updated[vm.data["id"]] = vm
+
+        results = []
+        for vm in vms:
+            current = updated.get(vm.data["id"])
+            if current is None:
+                results.append(exceptions.HPESimpliVityException(MSG_NOT_AFFECTED.format(vm.data["id"], SET_POLICY)))
+                continue
+
+            vm.data = current.data
+            results.append(vm)
+
+        return results
+
+    def __delete_backups(self, backups):
+        backups[0]._resources.delete_multiple_backups(backups, self._timeout)
+        for backup in backups:
+            backup.data = None
+
+        return [None] * len(backups)
@@ -0,0 +1,357 @@
+###
+# (C) Copyright [2019] Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##
+
+"""Records the requests sent to an OVC and their responses, and replays them.
+
+A recording cassette captures the request and response pairs of a connection,
+with their timings, and saves them in a file, gzip-compressed if its name ends
+with .gz. The credentials and the tokens are scrubbed. A replaying cassette
+serves the recorded responses from memory, in the order they were recorded, so
+the parsing and the creation of the resource objects can be measured on real
+traffic without an OVC.
+"""
+
+import base64
+import gzip
+import io
+import json
+import threading
+import time
+import urllib.parse
+import zlib
+
+from simplivity import compression
+from simplivity import exceptions
+
+FORMAT_VERSION = 1
+
+# Fields of the request and response bodies replaced by SCRUBBED
+SCRUBBED_FIELDS = frozenset(['access_token', 'refresh_token', 'password', 'username',
+                             'guest_password', 'guest_username'])
+SCRUBBED = 'scrubbed'
+
+# Response headers kept in the cassette
+RECORDED_HEADERS = ('Content-Type', 'Content-Encoding', 'Retry-After')
+
+MSG_NOT_RECORDED = 'No recorded response for {} {}'
+
+
+def scrub(data):
+    """Replaces the values of the credential fields of JSON data.
+
+    Args:
+        data: Decoded JSON data.
+
+    Returns:
+        tuple: Tuple with two members (scrubbed data and True if a value was replaced).
+    """
+    if isinstance(data, dict):
+        scrubbed_data, changed = {}, False
+        for key, value in data.items():
+            if key in SCRUBBED_FIELDS:
+                scrubbed_data[key], changed = SCRUBBED, True
+            else:
+                scrubbed_data[key], value_changed = scrub(value)
+                changed = changed or value_changed
+        return scrubbed_data, changed
+
+    if isinstance(data, list):
+        items = [scrub(item) for item in data]
+        return [item for item, _ in items], any(changed for _, changed in items)
+
+    return data, False
+
+
+def scrub_body(body):
+    """Scrubs a JSON or form-encoded body.
+
+    Args:
+        body: Body (str or bytes).
+
+    Returns:
+        str: Scrubbed body.
+    """
+    if isinstance(body, bytes):
+        body = body.decode('utf-8', 'replace')
+    if not body:
+        return body or ''
+
+    try:
+        data = json.loads(body)
+    except ValueError:
+        form = urllib.parse.parse_qsl(body, keep_blank_values=True)
+        if not any(key in SCRUBBED_FIELDS for key, _ in form):
+            return body
+        return urllib.parse.urlencode([(key, SCRUBBED if key in SCRUBBED_FIELDS else value) for key, value in form])
+
+    data, changed = scrub(data)
+    return json.dumps(data) if changed else body
+
+
+def _get_path(url):
+    """Gets the path of a request URL below /api, with the query string."""
+    split_url = urllib.parse.urlsplit(url)
+    path = split_url.path[len('/api'):] if split_url.path.startswith('/api/') else split_url.path
+    return path + ('?' + split_url.query if split_url.query else '')
+
+
+class Cassette(object):
+    """Request and response pairs of a connection, recorded or replayed.
+
+    Pass it to the connection with the cassette configuration key:
+
+        cassette = Cassette()
+        ovc = OVC({"ip": "10.0.0.1", "credentials": {...}, "cassette": cassette})
+        ovc.backups.get_all(limit=5000)
+        cassette.save("backups.json.gz")
+
+        ovc = OVC({"ip": "10.0.0.1", "credentials": {...}, "cassette": Cassette.load("backups.json.gz")})
+    """
+
+    def __init__(self, interactions=None, replay=False, latency=False):
+        """Initializes the cassette.
+
+        Args:
+            interactions: Recorded interactions, dictionaries as saved in the files.
+            replay: True to replay the interactions, False to record new ones.
+            latency: True to delay the replayed responses by their recorded duration.
+        """
+        self._interactions = list(interactions or [])
+        self._replay = replay
+        self._latency = latency
+        self._lock = threading.Lock()
+        self._positions = {}
+        self._wire_bodies = {}
+        self._recorded = {}
+        for interaction in self._interactions:
+            self._recorded.setdefault((interaction['method'], interaction['path']), []).append(interaction)
+
+    @classmethod
+    def load(cls, file_name, latency=False):
+        """Loads a cassette file to replay it.
+
+        Args:
+            file_name: Path of the file, gzip-compressed if its name ends with .gz.
+            latency: True to delay the replayed responses by their recorded duration.
+
+        Returns:
+            Cassette object replaying the file.
+        """
+        opener = gzip.open if file_name.endswith('.gz') else open
+        with opener(file_name, 'rt', encoding='utf-8') as cassette_file:
+            document = json.load(cassette_file)
+
+        return cls(document['interactions'], replay=True, latency=latency)
+
+    def save(self, file_name):
+        """Saves the recorded interactions.
+
+        Args:
+            file_name: Path of the file, gzip-compressed if its name ends with .gz.
+        """
+        opener = gzip.open if file_name.endswith('.gz') else open
+        with opener(file_name, 'wt', encoding='utf-8') as cassette_file:
+            json.dump({"version": FORMAT_VERSION, "interactions": self.interactions}, cassette_file)
+
+    @property
+    def interactions(self):
+        """Gets a copy of the recorded interactions."""
+        with self._lock:
+            return list(self._interactions)
+
+    @property
+    def is_replaying(self):
+        """True if the cassette replays the recorded interactions."""
+        return self._replay
+
+    def open_connection(self, connection=None):
+        """Gets the connection sending a request.
+
+        Args:
+            connection: HTTPSConnection object, ignored when replaying.
+
+        Returns:
+            Connection recording the requests sent with the HTTPS connection, or
+            replaying the recorded responses.
+        """
+        if self._replay:
+            return _ReplayConnection(self)
+
+        return _RecordingConnection(self, connection)
+
+    def add(self, method, url, body, response, response_body, duration):
+        """Records an interaction.
+
+        Args:
+            method: HTTP method.
+            url: Request URL.
+            body: Request body.
+            response: HTTP response object.
+            response_body: Response body as received.
+            duration: Seconds from the request to the end of the response.
+        """
+        headers = {name: response.getheader(name) for name in RECORDED_HEADERS if response.getheader(name)}
+        decoder = compression.ResponseDecoder(headers.get('Content-Encoding'))
+        content = decoder.decompress(response_body) + decoder.flush()
+
+        interaction = {
+            "method": method,
+            "path": _get_path(url),
+            "request_body": scrub_body(body),
+            "status": response.status,
+            "reason": response.reason,
+            "headers": headers,
+            "duration": round(duration, 6),
+        }
+        try:
+            interaction["body"] = scrub_body(content.decode('utf-8'))
+        except UnicodeDecodeError:
+            interaction["body_base64"] = base64.b64encode(content).decode('ascii')
+
+        with self._lock:
+            self._interactions.append(interaction)
+
+    def next_interaction(self, method, url):
+        """Gets the next recorded interaction of a request, the last one is repeated.
+
+        Raises:
+            HPESimpliVityException: if no interaction was recorded for the request.
+        """
+        key = (method, _get_path(url))
+        recorded = self._recorded.get(key)
+        if not recorded:
+            raise exceptions.HPESimpliVityException(MSG_NOT_RECORDED.format(*key))
+
+        with self._lock:
+            position = self._positions.get(key, 0)
+            self._positions[key] = position + 1
+
+        return recorded[min(position, len(recorded) - 1)]
+
+    def get_wire_body(self, interaction):
+        """Gets the body of an interaction as sent by the OVC, compressed again if it was compressed."""
+        wire_body = self._wire_bodies.get(id(interaction))
+        if wire_body is not None:
+            return wire_body
+
+        if 'body_base64' in interaction:
+            content = base64.b64decode(interaction['body_base64'])
+        else:
+            content = interaction.get('body', '').encode('utf-8')
+
+        encoding = interaction.get('headers', {}).get('Content-Encoding', '').strip().lower()
+        if encoding in compression.GZIP_ENCODINGS:
+            content = gzip.compress(content)
+        elif encoding in compression.DEFLATE_ENCODINGS:
+            content = zlib.compress(content)
+
+        self._wire_bodies[id(interaction)] = content
+        return content
+
+    def delay(self, interaction):
+        """Waits for the recorded duration of an interaction if the latency is replayed."""
+        if self._latency:
+            time.sleep(interaction.get('duration', 0))
+
+
+class _RecordingConnection(object):
+    """HTTPS connection recording its requests and responses in a cassette."""
+
+    def __init__(self, cassette, connection):
+        self._cassette = cassette
+        self._connection = connection
+        self._request = None
+
+    def request(self, method, url, body=None, headers=None):
+        self._request = (method, url, body, time.monotonic())
+        self._connection.request(method, url, body, headers or {})
+
+    def getresponse(self):
+        return _RecordingResponse(self._cassette, self._request, self._connection.getresponse())
+
+    def close(self):
+        self._connection.close()
+
+
+class _RecordingResponse(object):
+    """HTTP response recording its body as it is read, the interaction is added once the body is read."""
+
+    def __init__(self, cassette, request, response):
+        self._cassette = cassette
+        self._request = request
+        self._response = response
+        self._chunks = []
+        self._recorded = False
+
+    def __getattr__(self, name):
+        return getattr(self._response, name)
+
+    def read(self, amt=None):
+        chunk = self._response.read(amt)
+        self._chunks.append(chunk)
+        if amt is None or not chunk or self._response.isclosed():
+            self.__record()
+        return chunk
+
+    def __record(self):
+        if self._recorded:
+            return
+
+        self._recorded = True
+        method, url, body, started = self._request
+        self._cassette.add(method, url, body, self._response, b''.join(self._chunks), time.monotonic() - started)
+
+
+class _ReplayConnection(object):
+    """Connection serving the responses recorded in a cassette."""
+
+    def __init__(self, cassette):
+        self._cassette = cassette
+        self._interaction = None
+
+    def request(self, method, url, body=None, headers=None):
+        self._interaction = self._cassette.next_interaction(method, url)
+
+    def getresponse(self):
+        self._cassette.delay(self._interaction)
+        return _ReplayResponse(self._interaction, self._cassette.get_wire_body(self._interaction))
+
+    def close(self):
+        pass
+
+
+class _ReplayResponse(object):
+    """HTTP response with a recorded status, headers and body."""
+
+    will_close = False
+
+    def __init__(self, interaction, wire_body):
+        self.status = interaction['status']
+        self.reason = interaction.get('reason', '')
+        self._headers = {name.lower(): value for name, value in interaction.get('headers', {}).items()}
+        self._body = io.BytesIO(wire_body)
+
+    def getheader(self, name, default=None):
+        return self._headers.get(name.lower(), default)
+
+    def read(self, amt=None):
+        return self._body.read() if amt is None else self._body.read(amt)
+
+    def isclosed(self):
+        return self._body.tell() == len(self._body.getbuffer())
+
+    def close(self):
+        self._body.seek(0, io.SEEK_END)
@@ -0,0 +1,99 @@
+###
+# (C) Copyright [2019] Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##
+
+"""Coalescing of identical requests in flight at the same time (single-flight).
+
+The first caller of a key sends the request, the callers arriving with the same
+key while it is in flight wait for it and share its outcome instead of sending
+their own request.
+"""
+
+import copy
+import threading
+
+
+class _Call(object):
+    """Request in flight and its outcome."""
+
+    __slots__ = ('done', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class RequestCoalescer(object):
+    """Shares the outcome of a request with the identical requests made while it is in flight.
+
+    Every caller gets its own deep copy of a shared result, so the callers can
+    change the response bodies they get. An exception is raised in all the callers.
+
+    Attributes:
+        calls: Number of requests sent.
+        coalesced: Number of requests which waited for an identical request instead of being sent.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def call(self, key, function):
+        """Calls a function unless a call with the same key is in flight, in which case its outcome is shared.
+
+        Args:
+            key: Key identifying identical calls, like the URL of a GET request.
+            function: Function without arguments making the request.
+
+        Returns:
+            The result of the function.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+            else:
+                call.waiters += 1
+                self.coalesced += 1
+
+        if not leader:
+            return self.__wait(call)
+
+        try:
+            call.result = function()
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        # The result handed to the waiters is never given out, it is copied for each caller
+        return copy.deepcopy(call.result) if call.waiters else call.result
+
+    @staticmethod
+    def __wait(call):
+        call.done.wait()
+        if call.error is not None:
+            raise call.error
+
+        return copy.deepcopy(call.result)
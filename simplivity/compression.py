@@ -0,0 +1,151 @@
+###
+# (C) Copyright [2019] Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##
+
+"""Implements decompression of the HTTP response bodies."""
+
+import threading
+import zlib
+
+from simplivity import exceptions
+
+# Value of the Accept-Encoding header sent to the OVC
+ACCEPT_ENCODING = 'gzip, deflate'
+
+GZIP_ENCODINGS = ('gzip', 'x-gzip')
+DEFLATE_ENCODINGS = ('deflate',)
+
+MSG_DECOMPRESSION_ERROR = "Failed to decompress the {} response body: {}"
+
+
+class TransferStats(object):
+    """Counts the bytes of response bodies.
+
+    Attributes:
+        wire_bytes (int): Bytes received from the OVC.
+        body_bytes (int): Bytes of the bodies after decompression.
+        responses (int): Number of responses counted.
+    """
+
+    def __init__(self):
+        """Initializes the counters to zero."""
+        self.wire_bytes = 0
+        self.body_bytes = 0
+        self.responses = 0
+        self._lock = threading.Lock()
+
+    @property
+    def saved_bytes(self):
+        """Bytes saved by the compression."""
+        return self.body_bytes - self.wire_bytes
+
+    @property
+    def compression_ratio(self):
+        """Ratio of the decompressed size to the received size (1.0 if not compressed)."""
+        return float(self.body_bytes) / self.wire_bytes if self.wire_bytes else 1.0
+
+    def add(self, stats):
+        """Adds the counters of another TransferStats object."""
+        with self._lock:
+            self.wire_bytes += stats.wire_bytes
+            self.body_bytes += stats.body_bytes
+            self.responses += stats.responses
+
+    def __repr__(self):
+        return "TransferStats(wire_bytes={}, body_bytes={}, responses={})".format(
+            self.wire_bytes, self.body_bytes, self.responses)
+
+
+class ResponseDecoder(object):
+    """Decompresses a response body incrementally and counts its bytes.
+
+    Attributes:
+        stats (TransferStats): Byte counters of the response.
+    """
+
+    def __init__(self, content_encoding=None):
+        """Initializes with the Content-Encoding of the response."""
+        encoding = content_encoding.strip().lower() if isinstance(content_encoding, str) else ''
+        self._encoding = encoding
+        self._decompressor = None
+
+        if encoding in GZIP_ENCODINGS:
+            self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif encoding in DEFLATE_ENCODINGS:
+            self._decompressor = zlib.decompressobj(zlib.MAX_WBITS)
+
+        self._first_chunk = True
+        self.stats = TransferStats()
+        self.stats.responses = 1
+
+    def decompress(self, chunk):
+        """Decompresses a chunk of the response body.
+
+        Args:
+            chunk: Chunk of the body as received (bytes).
+
+        Returns:
+            bytes: Decompressed data available so far.
+
+        Raises:
+            HPESimpliVityException: if the body is not valid compressed data.
+        """
+        self.stats.wire_bytes += len(chunk)
+        data = chunk
+
+        if self._decompressor:
+            try:
+                data = self.__decompress(chunk)
+            except zlib.error as error:
+                raise exceptions.HPESimpliVityException(MSG_DECOMPRESSION_ERROR.format(self._encoding, error))
+
+        self.stats.body_bytes += len(data)
+        return data
+
+    def __decompress(self, chunk):
+        if self._first_chunk and chunk:
+            self._first_chunk = False
+            if self._encoding in DEFLATE_ENCODINGS:
+                try:
+                    return self._decompressor.decompress(chunk)
+                except zlib.error:
+                    # Some servers send raw deflate data without the zlib wrapper
+                    self._decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+
+        return self._decompressor.decompress(chunk)
+
+    def flush(self):
+        """Returns the remaining decompressed data."""
+        data = self._decompressor.flush() if self._decompressor else b''
+        self.stats.body_bytes += len(data)
+        return data
+
+    def iter_decompressed(self, chunks):
+        """Yields the decompressed chunks of a response body.
+
+        Args:
+            chunks: Iterable of the body chunks as received.
+
+        Yields:
+            bytes: Decompressed chunks.
+        """
+        for chunk in chunks:
+            data = self.decompress(chunk)
+            if data:
+                yield data
+
+        data = self.flush()
+        if data:
+            yield data
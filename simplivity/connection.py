@@ -19,36 +19,213 @@
 import http.client
 from base64 import b64encode
 
-import json
 import logging
+import queue
 import ssl
+import threading
+import time
 import urllib
 import traceback
 
+from simplivity import coalescing
+from simplivity import compression
 from simplivity import exceptions
+from simplivity import instrumentation
+from simplivity import json_codecs
+from simplivity import json_stream
+from simplivity import task_stats
+from simplivity import throttling
+from simplivity import token_manager
+from simplivity import tracing
 
 logger = logging.getLogger(__name__)
 
+# Size in bytes of the chunks read when streaming a response
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Maximum number of idle connections kept open for reuse
+POOL_SIZE = 16
+
+# Errors raised when the OVC has closed an idle kept-alive connection
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+# Methods which can be sent again when the OVC may have received the request
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS')
+
+
+class TimedHTTPSConnection(http.client.HTTPSConnection):
+    """HTTPS connection recording the time spent opening it (name resolution, TCP and TLS handshakes)."""
+
+    connect_duration = 0
+
+    def connect(self):
+        started = time.monotonic()
+        super(TimedHTTPSConnection, self).connect()
+        self.connect_duration = time.monotonic() - started
+
 
 class Connection(object):
-    """Helps to make connection with the OVC and do rest calls."""
+    """Helps to make connection with the OVC and do rest calls.
+
+    A Connection object can be shared by several threads: the HTTPS connections
+    are kept alive in a pool and each request uses one of them exclusively,
+    the access token is swapped atomically and a login is shared by all the
+    threads waiting for a new token.
+    """
+
+    def __init__(self, ovc_ip, ssl_bundle=False, timeout=None, json_codec=None, accept_encoding=True,
+                 pool_size=POOL_SIZE, rate_limiter=None, concurrency_limiter=None, retry_policy=None, hooks=None,
+                 cassette=None, token_cache=None, inventory_store=None, coalesce_requests=True,
+                 identity_map=None):
+        """Initialize Connection class
 
-    def __init__(self, ovc_ip, ssl_bundle=False, timeout=None):
-        """Initialize Connection class"""
+        Args:
+            ovc_ip: IP address of the OVC.
+            ssl_bundle: Path of the CA certificate bundle, False to trust all certificates.
+            timeout: Connection timeout in seconds.
+            json_codec: Name of the JSON codec (json, orjson or ujson) used for the
+              request and response bodies. Default: fastest installed codec.
+            accept_encoding: True to accept gzip and deflate compressed responses.
+            pool_size: Maximum number of idle connections kept open for reuse, 0 to
+              open a new connection for every request.
+            rate_limiter: RateLimiter object limiting the requests sent per second.
+            concurrency_limiter: AdaptiveConcurrencyLimiter object limiting the requests
+              in flight, shrinking the limit when the OVC returns server errors or slows down.
+            retry_policy: RetryPolicy object retrying the requests failed with transient
+              errors, None to never retry.
+            hooks: List of RequestHook objects called for each request.
+            cassette: Cassette object recording the requests and responses, or replaying
+              recorded responses instead of connecting to the OVC.
+            token_cache: TokenCache object, the first login reuses a valid cached token
+              of the user and the new tokens are saved in it.
+            inventory_store: InventoryStore object serving the listings of the resources
+              from a local snapshot while it is fresh.
+            coalesce_requests: True to share the response of a GET request with the identical
+              GET requests made while it is in flight instead of sending them.
+            identity_map: IdentityMap object, the listings return the live object of a
+              resource id instead of a new one.
+        """
         self._ovc_ip = ovc_ip
         self._timeout = timeout
         self._ssl_trusted_bundle = ssl_bundle
         self._ssl_trust_all = False if ssl_bundle else True
         self._username = None
         self._password = None
-        self._access_token = None
+        self._token_manager = token_manager.TokenManager()
+        self._json_codec = json_codecs.get_codec(json_codec)
+        self._transfer_stats = compression.TransferStats()
+        self._last_transfer = threading.local()
+        self._pool = queue.LifoQueue(maxsize=pool_size) if pool_size else None
+        self._throttle = throttling.Throttle(rate_limiter, concurrency_limiter)
+        self._retry_policy = retry_policy
+        self._hooks = list(hooks or ())
+        self._task_stats = task_stats.TaskStatsCollector()
+        self._cassette = cassette
+        self._token_cache = token_cache
+        self._inventory_store = inventory_store
+        self._coalescer = coalescing.RequestCoalescer() if coalesce_requests else None
+        self._identity_map = identity_map
 
         self._headers = {'Accept': 'application/json'}
+        if accept_encoding:
+            self._headers['Accept-Encoding'] = compression.ACCEPT_ENCODING
         self._base_url = "https://{}/api".format(ovc_ip)
 
+    @property
+    def _access_token(self):
+        return self._token_manager.token
+
+    @_access_token.setter
+    def _access_token(self, token):
+        self._token_manager.set_token(token)
+
+    @property
+    def throttle(self):
+        """Gets the limits applied to the requests.
+
+        Returns:
+            Throttle object
+        """
+        return self._throttle
+
+    @property
+    def retry_policy(self):
+        """Gets the retry policy of the requests, None if the requests are not retried.
+
+        Returns:
+            RetryPolicy object
+        """
+        return self._retry_policy
+
+    @property
+    def hooks(self):
+        """Gets the hooks called for each request, hooks can be appended to the list.
+
+        Returns:
+            list: RequestHook objects
+        """
+        return self._hooks
+
+    @property
+    def cassette(self):
+        """Gets the cassette recording or replaying the requests, None if there is none.
+
+        Returns:
+            Cassette object
+        """
+        return self._cassette
+
+    @property
+    def inventory_store(self):
+        """Gets the store of the inventory snapshots, None if the listings are always sent to the OVC.
+
+        Returns:
+            InventoryStore object
+        """
+        return self._inventory_store
+
+    @property
+    def coalescer(self):
+        """Gets the coalescer of the identical GET requests in flight, None if they are all sent.
+
+        Returns:
+            RequestCoalescer object
+        """
+        return self._coalescer
+
+    @property
+    def identity_map(self):
+        """Gets the identity map of the resource objects, None if the listings always create new objects.
+
+        Returns:
+            IdentityMap object
+        """
+        return self._identity_map
+
+    @property
+    def task_stats(self):
+        """Gets the statistics of the task waits by operation.
+
+        Returns:
+            TaskStatsCollector object
+        """
+        return self._task_stats
+
+    @property
+    def token_manager(self):
+        """Gets the manager of the access token.
+
+        Returns:
+            TokenManager object
+        """
+        return self._token_manager
+
     def do_http(self, method, path, body, custom_headers=None, login=False):
         """Makes http calls.
 
+        The token is refreshed before it expires. If the OVC still returns an
+        invalid token error, the request is retried once with a new token.
+
         Args:
             method: HTTP methods (GET, POST, PUT, DELETE).
             path: URL
@@ -59,42 +236,292 @@ class Connection(object):
         Returns:
             tuple: Tuple with two members (HTTP response object and the response body in json).
         """
+        if login:
+            return self.__do_http(method, path, body, custom_headers, login)
+
+        self.__refresh_expiring_token()
+        token = self._access_token
+        resp, json_body = self.__do_http(method, path, body, custom_headers, login)
+
+        # Obtain a new token, if the Simplivity Product returns an invalid token error.
+        if self.__is_invalid_token(json_body):
+            self.__refresh_token(token)
+            resp, json_body = self.__do_http(method, path, body, custom_headers, login)
+
+        return resp, json_body
+
+    def __do_http(self, method, path, body, custom_headers, login):
+        """Sends the request and reads the whole response body, with the retries of the retry policy."""
+        return self.__with_retry(method,
+                                 lambda: self.__do_http_once(method, path, body, custom_headers, login),
+                                 lambda result: result[0])
+
+    def __with_retry(self, method, send, get_response):
+        """Sends a request again while the retry policy allows it.
+
+        Args:
+            method: HTTP method of the request.
+            send: Function sending the request.
+            get_response: Function getting the HTTP response object from the result of send.
+
+        Returns:
+            Result of the last call to send.
+        """
+        policy = self._retry_policy
+        if policy is None:
+            return send()
+
+        started = time.monotonic()
+        attempt = 1
+        while True:
+            try:
+                result = send()
+            except Exception as error:
+                delay = policy.get_delay(method, attempt, time.monotonic() - started, error=error)
+                if delay is None:
+                    raise
+                logger.debug("Request failed with %r, attempt %s in %.2f seconds", error, attempt + 1, delay)
+            else:
+                resp = get_response(result)
+                delay = policy.get_delay(method, attempt, time.monotonic() - started, resp=resp)
+                if delay is None:
+                    return result
+                logger.debug("Request failed with status %s, attempt %s in %.2f seconds",
+                             resp.status, attempt + 1, delay)
+
+            time.sleep(delay)
+            attempt += 1
+
+    def __do_http_once(self, method, path, body, custom_headers, login):
+        """Sends the request and reads the whole response body, in a span when the tracing is enabled."""
+        with tracing.span('HTTP ' + method, self.__get_span_attributes(method, path)) as span:
+            resp, json_body = self.__do_http_attempt(method, path, body, custom_headers, login)
+            span.set_attribute(tracing.HTTP_STATUS_CODE, resp.status)
+
+        return resp, json_body
+
+    def __get_span_attributes(self, method, path):
+        if not tracing.is_enabled():
+            return None
+
+        return {tracing.HTTP_METHOD: method, tracing.HTTP_TARGET: path, tracing.NET_PEER_NAME: self._ovc_ip}
+
+    def __do_http_attempt(self, method, path, body, custom_headers, login):
+        """Sends the request and reads the whole response body."""
+        json_body = None
+        http_headers = self.__build_headers(custom_headers, login)
+        request = instrumentation.RequestInfo(method, path)
+        self.__notify('on_request_start', request)
+        ticket = self._throttle.start()
+        status = None
+        try:
+            connection, resp = self.__send_request(method, path, body, http_headers, request)
+            try:
+                resp_body = self.__read_body(resp)
+                request.end_phase(instrumentation.READ)
+                status = resp.status
+                if resp_body:
+                    json_body = self._json_codec.loads(resp_body)
+                request.end_phase(instrumentation.DECODE)
+            except http.client.HTTPException as error:
+                raise exceptions.HPESimpliVityException(traceback.format_exc()) from error
+            finally:
+                self.__release_connection(connection, resp)
+        except Exception as error:
+            self.__notify('on_error', request, error)
+            raise
+        finally:
+            self._throttle.finish(ticket, status)
+
+        request.status = status
+        self.__notify('on_response', request, resp)
+        return resp, json_body
+
+    def __notify(self, event, *args):
+        """Calls a method of the hooks, a failing hook does not fail the request."""
+        for hook in self._hooks:
+            try:
+                getattr(hook, event)(*args)
+            except Exception:
+                logger.warning("Request hook %r failed on %s", hook, event, exc_info=True)
+
+    def __refresh_expiring_token(self):
+        """Logs in again if the token is about to expire and the credentials are known."""
+        if self._username is not None and self._token_manager.is_expiring():
+            self.__refresh_token(self._access_token)
+
+    def __refresh_token(self, stale_token):
+        """Logs in again, concurrent calls with the same stale token log in only once."""
+        self._token_manager.refresh(lambda: self.login(self._username, self._password), stale_token)
+
+    def __build_headers(self, custom_headers, login):
+        """Builds the headers of a request.
+
+        Args:
+            custom_headers: Custom headers to update/append default headers.
+            login: True if the call is for login and get the token.
+
+        Returns:
+            dict: HTTP headers
+        """
         http_headers = self._headers.copy()
-        full_path = "{}{}".format(self._base_url, path)
 
         if login:
             user_pass = b64encode(b"simplivity:").decode("ascii")
             http_headers.update({'Content-type': 'application/x-www-form-urlencoded',
                                  'Authorization': 'Basic %s' % user_pass})
         else:
-            if not self._access_token:
+            # Read once, a logout in another thread may remove the token
+            access_token = self._access_token
+            if not access_token:
                 raise exceptions.HPESimpliVityException("There is no active session, please login")
 
             http_headers['Content-type'] = 'application/vnd.simplivity.v1.8+json'
-            http_headers['Authorization'] = "Bearer " + self._access_token
+            http_headers['Authorization'] = "Bearer " + access_token
+            self._token_manager.touch()
 
         # Updates default headers with the custom headers
         if custom_headers:
             http_headers.update(custom_headers)
 
-        json_body = None
+        return http_headers
+
+    def __send_request(self, method, path, body, http_headers, request):
+        """Sends the request and gets the response.
+
+        Args:
+            method: HTTP methods (GET, POST, PUT, DELETE).
+            path: URL
+            body: Request body.
+            http_headers: HTTP headers.
+            request: RequestInfo object recording the timings of the phases.
+
+        Returns:
+            tuple: Tuple with two members (connection and the HTTP response object, the body is not read).
+        """
+        full_path = "{}{}".format(self._base_url, path)
+
+        while True:
+            request.start_phase()
+            connection, reused = self.__acquire_connection()
+            sent = False
+            try:
+                connection.request(method, full_path, body, http_headers)
+                sent = True
+                request.end_phase(instrumentation.SEND, self.__pop_connect_duration(connection))
+                resp = connection.getresponse()
+                request.end_phase(instrumentation.WAIT)
+                return connection, resp
+            except Exception as error:
+                connection.close()
+                if reused and self.__can_send_again(method, error, sent):
+                    logger.debug("Kept-alive connection closed by the OVC, sending the request again")
+                    continue
+                if isinstance(error, http.client.HTTPException):
+                    raise exceptions.HPESimpliVityException(traceback.format_exc()) from error
+                raise
+
+    @staticmethod
+    def __pop_connect_duration(connection):
+        """Gets the seconds spent opening a new connection during the last request, 0 if it was open."""
+        if not isinstance(connection, TimedHTTPSConnection):
+            return 0
+
+        duration, connection.connect_duration = connection.connect_duration, 0
+        return duration
+
+    @staticmethod
+    def __can_send_again(method, error, sent):
+        """Checks if a request failed on a stale connection can be sent on a new one.
+
+        A request which may have reached the OVC is sent again only if its method
+        is idempotent, so operations like backups are never run twice.
+        """
+        if not isinstance(error, STALE_CONNECTION_ERRORS):
+            return False
+
+        return method in IDEMPOTENT_METHODS or (not sent and isinstance(error, BrokenPipeError))
+
+    def __acquire_connection(self):
+        """Gets an idle connection from the pool or a new one.
+
+        Returns:
+            tuple: Tuple with two members (HTTPSConnection object and True if it was reused).
+        """
+        if self._pool is not None:
+            try:
+                return self._pool.get_nowait(), True
+            except queue.Empty:
+                pass
+
+        return self.get_connection(), False
+
+    def __release_connection(self, connection, resp):
+        """Returns the connection to the pool if the response was fully read and can be kept alive."""
+        if self._pool is not None and resp.will_close is False and resp.isclosed() is True:
+            try:
+                self._pool.put_nowait(connection)
+                return
+            except queue.Full:
+                pass
+
+        connection.close()
+
+    def close(self):
+        """Closes the idle connections of the pool."""
+        while self._pool is not None:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def __read_body(self, resp):
+        """Reads and decompresses the whole response body."""
+        decoder = self.__get_decoder(resp)
+        resp_body = decoder.decompress(resp.read()) + decoder.flush()
+        self.__count_transfer(decoder)
+        return resp_body
+
+    def __iter_body(self, resp, chunk_size):
+        """Yields the decompressed chunks of the response body."""
+        decoder = self.__get_decoder(resp)
         try:
-            connection = self.get_connection()
-            connection.request(method, full_path, body, http_headers)
-            resp = connection.getresponse()
-            resp_body = resp.read()
-            connection.close()
-            if resp_body:
-                json_body = json.loads(resp_body.decode('utf-8'))
-        except http.client.HTTPException:
-            raise exceptions.HPESimpliVityException(traceback.format_exc())
+            chunks = iter(lambda: resp.read(chunk_size), b'')
+            for chunk in decoder.iter_decompressed(chunks):
+                yield chunk
+        finally:
+            self.__count_transfer(decoder)
 
-        # Obtain a new token, if the Simplivity Product returns an invalid token error.
-        if json_body and 'error' in json_body and json_body['error'] == 'invalid_token':
-            self.login(self._username, self._password)
-            resp, json_body = self.do_http(method, path, body, custom_headers)
+    @staticmethod
+    def __get_decoder(resp):
+        return compression.ResponseDecoder(resp.getheader('Content-Encoding'))
 
-        return resp, json_body
+    def __count_transfer(self, decoder):
+        self._last_transfer.stats = decoder.stats
+        self._transfer_stats.add(decoder.stats)
+
+    @property
+    def transfer_stats(self):
+        """Byte counters of all the responses received by the connection.
+
+        Returns:
+            TransferStats object
+        """
+        return self._transfer_stats
+
+    @property
+    def last_transfer(self):
+        """Byte counters of the last response received by the calling thread.
+
+        Returns:
+            TransferStats object or None if no response has been received yet.
+        """
+        return getattr(self._last_transfer, 'stats', None)
+
+    @staticmethod
+    def __is_invalid_token(json_body):
+        """Checks if the response body is an invalid token error."""
+        return isinstance(json_body, dict) and json_body.get('error') == 'invalid_token'
 
     def get_connection(self):
         """Makes connection with the OVC.
@@ -102,18 +529,25 @@ class Connection(object):
         Returns:
           HTTPSConnection object
         """
+        if self._cassette is not None and self._cassette.is_replaying:
+            return self._cassette.open_connection()
+
         context = ssl.SSLContext(ssl.PROTOCOL_TLSv1_2)
         if self._ssl_trust_all is False:
             context.verify_mode = ssl.CERT_REQUIRED
             context.load_verify_locations(self._ssl_trusted_bundle)
-            conn = http.client.HTTPSConnection(self._ovc_ip,
-                                               context=context,
-                                               timeout=self._timeout)
+            conn = TimedHTTPSConnection(self._ovc_ip,
+                                        context=context,
+                                        timeout=self._timeout)
         else:
             context.verify_mode = ssl.CERT_NONE
-            conn = http.client.HTTPSConnection(self._ovc_ip,
-                                               context=context,
-                                               timeout=self._timeout)
+            conn = TimedHTTPSConnection(self._ovc_ip,
+                                        context=context,
+                                        timeout=self._timeout)
+
+        if self._cassette is not None:
+            return self._cassette.open_connection(conn)
+
         return conn
 
     def get(self, url):
@@ -128,12 +562,107 @@ class Connection(object):
         Raises:
             HPESimpliVityException: if the response status is 400 and above
         """
-        resp, body = self.do_http('GET', url, '')
+        if self._coalescer is not None:
+            resp, body = self._coalescer.call(url, lambda: self.do_http('GET', url, ''))
+        else:
+            resp, body = self.do_http('GET', url, '')
+        if resp.status >= 500:
+            raise exceptions.HPESimpliVityServerError(body)
         if resp.status >= 400:
             raise exceptions.HPESimpliVityException(body)
 
         return body
 
+    def get_members(self, url, members_field, chunk_size=STREAM_CHUNK_SIZE):
+        """Calls get http method and parses the members of the listing incrementally.
+
+        The response body is read from the socket in chunks and the members of
+        the listing are yielded as soon as they are parsed.
+
+        Args:
+            url: Resource URL
+            members_field: Name of the field with the members of the listing
+            chunk_size: Size in bytes of the chunks read from the socket
+
+        Yields:
+            dict: Members of the listing
+
+        Raises:
+            HPESimpliVityException: if the response status is 400 and above
+        """
+        self.__refresh_expiring_token()
+        token = self._access_token
+        ticket, connection, resp, error_body = self.__open_listing(url)
+
+        # Obtain a new token, if the Simplivity Product returns an invalid token error.
+        if self.__is_invalid_token(error_body):
+            self.__refresh_token(token)
+            ticket, connection, resp, error_body = self.__open_listing(url)
+
+        if resp.status >= 500:
+            raise exceptions.HPESimpliVityServerError(error_body)
+        if resp.status >= 400:
+            raise exceptions.HPESimpliVityException(error_body)
+
+        # The latency of a stream is the time to the response headers. The ticket is
+        # released before the body is read, the caller may make other requests
+        # while it iterates the members
+        self._throttle.finish(ticket, resp.status)
+        try:
+            chunks = self.__iter_body(resp, chunk_size)
+            for member in json_stream.iter_members(chunks, members_field):
+                yield member
+        except http.client.HTTPException as error:
+            raise exceptions.HPESimpliVityException(traceback.format_exc()) from error
+        finally:
+            self.__release_connection(connection, resp)
+
+    def __open_listing(self, url):
+        """Sends a listing request, with the retries of the retry policy."""
+        return self.__with_retry('GET', lambda: self.__open_listing_once(url), lambda result: result[2])
+
+    def __open_listing_once(self, url):
+        """Sends a listing request, in a span ending with the response headers when the tracing is enabled."""
+        with tracing.span('HTTP GET', self.__get_span_attributes('GET', url)) as span:
+            result = self.__open_listing_attempt(url)
+            span.set_attribute(tracing.HTTP_STATUS_CODE, result[2].status)
+
+        return result
+
+    def __open_listing_attempt(self, url):
+        """Sends a listing request, the response body is read only if the status is an error.
+
+        Returns:
+            tuple: Tuple with four members (throttle ticket, connection, HTTP response object
+              and the error body in json).
+        """
+        http_headers = self.__build_headers(None, False)
+        request = instrumentation.RequestInfo('GET', url)
+        self.__notify('on_request_start', request)
+        ticket = self._throttle.start()
+        try:
+            connection, resp = self.__send_request('GET', url, '', http_headers, request)
+        except Exception as error:
+            self._throttle.finish(ticket, None)
+            self.__notify('on_error', request, error)
+            raise
+
+        request.status = resp.status
+        if resp.status < 400:
+            self.__notify('on_response', request, resp)
+            return ticket, connection, resp, None
+
+        try:
+            resp_body = self.__read_body(resp)
+            request.end_phase(instrumentation.READ)
+            return ticket, connection, resp, self._json_codec.loads(resp_body) if resp_body else None
+        except http.client.HTTPException as error:
+            raise exceptions.HPESimpliVityException(traceback.format_exc()) from error
+        finally:
+            self.__release_connection(connection, resp)
+            self._throttle.finish(ticket, resp.status)
+            self.__notify('on_response', request, resp)
+
     def post(self, uri, body, custom_headers=None):
         """Calls post http method.
 
@@ -201,7 +730,7 @@ class Connection(object):
         """
         resp, body = self.do_http(method=http_method,
                                   path=url,
-                                  body=json.dumps(body),
+                                  body=self._json_codec.dumps(body),
                                   custom_headers=custom_headers)
 
         if resp.status in [400, 401, 403, 404]:
@@ -222,6 +751,9 @@ class Connection(object):
         Returns:
             boolean: Returns True if login is successfull.
         """
+        if self.__resume_cached_session(username, password):
+            return True
+
         login_url = "/oauth/token"
         data = {'grant_type': 'password',
                 'username': username,
@@ -230,7 +762,7 @@ class Connection(object):
         resp, body = self.do_http('POST', login_url, body=urllib.parse.urlencode(data), login=True)
 
         try:
-            self._access_token = body["access_token"]
+            self._token_manager.set_token(body["access_token"], body.get("expires_in"))
             logger.info('Logged in successfully')
         except KeyError:
             raise exceptions.HPESimpliVityAuthenticationError("Invalid credentials")
@@ -238,16 +770,49 @@ class Connection(object):
         # Save the username and password for refreshing the connection
         self._username = username
         self._password = password
+        self.__save_token(body.get("expires_in"))
 
         return True
 
+    def __resume_cached_session(self, username, password):
+        """Reuses the cached token of the user if there is no session yet.
+
+        Logins refreshing a rejected or expired token never reuse the cached one.
+
+        Returns:
+            boolean: True if a cached token was reused.
+        """
+        if self._token_cache is None or self._access_token is not None:
+            return False
+
+        cached = self._token_cache.get(self._ovc_ip, username)
+        if cached is None:
+            return False
+
+        self._token_manager.set_token(*cached)
+        self._username = username
+        self._password = password
+        logger.info('Reusing the cached access token')
+        return True
+
+    def __save_token(self, expires_in):
+        """Saves the new token in the token cache, a failure to write it is only logged."""
+        if self._token_cache is None:
+            return
+
+        try:
+            self._token_cache.set(self._ovc_ip, self._username, self._access_token, expires_in)
+        except OSError as error:
+            logger.warning("Could not save the access token in %s: %s", self._token_cache.path, error)
+
     def logout(self):
         """Removes the access token.
 
         Returns:
             boolean: Returns True
         """
-        self._access_token = None
+        self._token_manager.clear()
+        self.close()
         logger.info('Logged out successfully')
 
         return True
@@ -72,6 +72,17 @@ class HPESimpliVityTimeout(HPESimpliVityException):
     pass
 
 
+class HPESimpliVityServerError(HPESimpliVityException):
+    """
+    SimpliVity Server Error Exception.
+    The exception is raised when a read request is answered with a server error, status 500 and above.
+
+    Attributes:
+       msg (str): Exception message.
+    """
+    pass
+
+
 class HPESimpliVityResourceNotFound(HPESimpliVityException):
     """
     SimpliVity Resource Not Found Exception.
@@ -0,0 +1,150 @@
+###
+# (C) Copyright [2019] Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##
+
+"""Runs SDK calls concurrently against one OVC."""
+
+import logging
+import threading
+from concurrent import futures
+
+from simplivity import throttling
+
+# Default maximum number of SDK calls running at once against an OVC
+MAX_IN_FLIGHT = 8
+
+logger = logging.getLogger(__name__)
+
+
+class ItemResult(object):
+    """Outcome of a call made for one item by Executor.map.
+
+    Attributes:
+        item: Item passed to the function.
+        result: Value returned by the function, None if it raised an exception.
+        error: Exception raised by the function, None if it succeeded.
+    """
+
+    def __init__(self, item, result=None, error=None):
+        self.item = item
+        self.result = result
+        self.error = error
+
+    @property
+    def ok(self):
+        """True if the call succeeded."""
+        return self.error is None
+
+    def __repr__(self):
+        return "ItemResult(item={!r}, result={!r}, error={!r})".format(self.item, self.result, self.error)
+
+
+class Executor(object):
+    """Runs SDK calls concurrently with a limit of calls in flight.
+
+    The limit is shared by all the map and submit calls of the executor, so
+    several bulk operations started at once do not overload the OVC.
+    """
+
+    def __init__(self, max_in_flight=MAX_IN_FLIGHT):
+        """Initializes the executor.
+
+        Args:
+            max_in_flight: Maximum number of calls running at once.
+        """
+        self._max_in_flight = max_in_flight
+        self._in_flight = threading.BoundedSemaphore(max_in_flight)
+        self._pool = None
+        self._lock = threading.Lock()
+
+    @property
+    def max_in_flight(self):
+        """Maximum number of calls running at once."""
+        return self._max_in_flight
+
+    def submit(self, fn, *args, **kwargs):
+        """Schedules a call.
+
+        Args:
+            fn: Function to call.
+            args: Positional arguments of the function.
+            kwargs: Keyword arguments of the function.
+
+        Returns:
+            concurrent.futures.Future object of the call.
+        """
+        with self._lock:
+            if self._pool is None:
+                self._pool = futures.ThreadPoolExecutor(max_workers=self._max_in_flight)
+            pool = self._pool
+
+        return pool.submit(self.__call, None, fn, *args, **kwargs)
+
+    def map(self, fn, items, max_workers=None, rate_limit=None, progress=None):
+        """Calls a function for each item concurrently.
+
+        An exception raised for one item does not stop the calls for the other items.
+
+        Args:
+            fn: Function called with each item.
+            items: Iterable of items.
+            max_workers: Number of worker threads. Default: the limit of calls in flight.
+            rate_limit: Maximum number of calls started per second. Default: no limit.
+            progress: Function called as each item completes, with the number of
+              completed items, the total number of items and the ItemResult object.
+
+        Returns:
+            list: ItemResult objects in the order of the items.
+        """
+        items = list(items)
+        results = [None] * len(items)
+        limiter = throttling.RateLimiter(rate_limit) if rate_limit else None
+
+        with futures.ThreadPoolExecutor(max_workers=max_workers or self._max_in_flight) as pool:
+            pending = {pool.submit(self.__call_item, limiter, fn, item): index for index, item in enumerate(items)}
+
+            for completed, future in enumerate(futures.as_completed(pending), 1):
+                result = results[pending[future]] = future.result()
+                if progress:
+                    progress(completed, len(items), result)
+
+        return results
+
+    def __call(self, limiter, fn, *args, **kwargs):
+        """Calls the function when the rate and the limit of calls in flight allow it."""
+        if limiter:
+            limiter.acquire()
+
+        with self._in_flight:
+            return fn(*args, **kwargs)
+
+    def __call_item(self, limiter, fn, item):
+        try:
+            return ItemResult(item, result=self.__call(limiter, fn, item))
+        except Exception as error:
+            logger.debug("Call failed for %r: %s", item, error)
+            return ItemResult(item, error=error)
+
+    def shutdown(self, wait=True):
+        """Stops the worker threads of the submitted calls.
+
+        Args:
+            wait: True to wait for the pending calls to complete.
+        """
+        with self._lock:
+            pool, self._pool = self._pool, None
+
+        if pool:
+            pool.shutdown(wait=wait)
@@ -0,0 +1,466 @@
+###
+# (C) Copyright [2019] Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##
+
+"""
+This module implements a client spreading the requests over several OVCs of a federation.
+"""
+
+import http.client
+import itertools
+import logging
+import re
+import socket
+import threading
+import time
+from collections import OrderedDict
+
+from simplivity import coalescing
+from simplivity import exceptions
+from simplivity import task_stats
+from simplivity.ovc_client import OVC
+from simplivity.resources.tasks import TASK_PENDING_STATES
+
+ROUND_ROBIN = 'round_robin'
+LEAST_LATENCY = 'least_latency'
+ROUTING_STRATEGIES = (ROUND_ROBIN, LEAST_LATENCY)
+
+# Seconds an OVC is skipped after a failure
+COOLDOWN = 30
+
+# Weight of the last request in the latency average of an OVC
+LATENCY_SMOOTHING = 0.2
+
+# Errors raised when an OVC cannot be reached
+FAILOVER_ERRORS = (OSError, http.client.HTTPException)
+
+# Errors raised when a request could not be sent at all, so a write can be sent to another OVC
+CONNECT_ERRORS = (ConnectionRefusedError, socket.gaierror)
+
+TASK_URL = re.compile(r'^/tasks/([^/?]+)')
+
+# Maximum number of tasks pinned to their OVC, the oldest are dropped when a
+# task is never polled until its end
+MAX_TASK_MEMBERS = 10000
+
+MSG_NO_ENDPOINTS = "At least one OVC IP address must be provided in ips"
+MSG_UNKNOWN_ROUTING = "Unknown routing {}, valid values: {}"
+MSG_ALL_OVCS_FAILED = "All the OVCs of the federation failed: {}"
+
+logger = logging.getLogger(__name__)
+
+
+class FederationMember(object):
+    """One OVC of the federation with its health and latency.
+
+    Attributes:
+        connection: Connection object of the OVC.
+        latency: Average latency in seconds of the requests, None before the first request.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.latency = None
+        self._unhealthy_until = 0
+
+    @property
+    def ovc_ip(self):
+        """IP address of the OVC."""
+        return self.connection._ovc_ip
+
+    def is_healthy(self):
+        """True if the OVC has not failed during the cooldown period."""
+        return time.monotonic() >= self._unhealthy_until
+
+    def mark_failed(self):
+        """Skips the OVC during the cooldown period."""
+        self._unhealthy_until = time.monotonic() + COOLDOWN
+
+    def record_latency(self, latency):
+        """Adds a request latency to the average."""
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += LATENCY_SMOOTHING * (latency - self.latency)
+
+
+class FederatedConnection(object):
+    """Connection spreading the requests over the connections to several OVCs.
+
+    Read requests are spread with round-robin or least-latency routing and sent
+    to another OVC when one is unreachable or returns a server error. Write
+    requests go to the first healthy OVC, and to the next one only if the
+    request could not be sent. Tasks are polled on the OVC which started them.
+    """
+
+    def __init__(self, connections, routing=ROUND_ROBIN, coalesce_requests=True):
+        """Initializes with the connections to the OVCs.
+
+        Args:
+            connections: List of Connection objects.
+            routing: Routing of the read requests, round_robin or least_latency.
+            coalesce_requests: True to share the response of a GET request with the identical
+              GET requests made while it is in flight instead of sending them.
+        """
+        if routing not in ROUTING_STRATEGIES:
+            raise exceptions.HPESimpliVityException(MSG_UNKNOWN_ROUTING.format(routing, ", ".join(ROUTING_STRATEGIES)))
+
+        self._members = [FederationMember(connection) for connection in connections]
+        self._routing = routing
+        self._counter = itertools.count()
+        self._task_members = OrderedDict()
+        self._task_stats = task_stats.TaskStatsCollector()
+        self._coalescer = coalescing.RequestCoalescer() if coalesce_requests else None
+        self._lock = threading.Lock()
+
+    @property
+    def members(self):
+        """List of FederationMember objects."""
+        return list(self._members)
+
+    @property
+    def inventory_store(self):
+        """Gets the store of the inventory snapshots of the first OVC, the listings cover the whole federation.
+
+        Returns:
+            InventoryStore object
+        """
+        return self._members[0].connection.inventory_store
+
+    @property
+    def coalescer(self):
+        """Gets the coalescer of the identical GET requests in flight, None if they are all sent.
+
+        Returns:
+            RequestCoalescer object
+        """
+        return self._coalescer
+
+    @property
+    def identity_map(self):
+        """Gets the identity map of the resource objects of the first OVC, which serves all the listings.
+
+        Returns:
+            IdentityMap object
+        """
+        return self._members[0].connection.identity_map
+
+    @property
+    def task_stats(self):
+        """Gets the statistics of the task waits of all the OVCs by operation.
+
+        Returns:
+            TaskStatsCollector object
+        """
+        return self._task_stats
+
+    def login(self, username, password):
+        """Logs in to all the OVCs.
+
+        Returns:
+            boolean: Returns True if login is successfull.
+        """
+        for member in self._members:
+            member.connection.login(username, password)
+
+        return True
+
+    def logout(self):
+        """Removes the access tokens.
+
+        Returns:
+            boolean: Returns True
+        """
+        for member in self._members:
+            member.connection.logout()
+
+        return True
+
+    def close(self):
+        """Closes the idle connections of all the OVCs."""
+        for member in self._members:
+            member.connection.close()
+
+    def do_http(self, method, path, body, custom_headers=None, login=False):
+        """Makes an http call on one of the OVCs.
+
+        Returns:
+            tuple: Tuple with two members (HTTP response object and the response body in json).
+        """
+        if method == 'GET':
+            return self.__read(lambda member: member.connection.do_http(method, path, body, custom_headers), path)
+
+        return self.__write(lambda member: member.connection.do_http(method, path, body, custom_headers))
+
+    def get(self, url):
+        """Calls get http method on one of the OVCs.
+
+        Args:
+            url: Resource URL
+
+        Returns:
+            dict: Response body
+
+        Raises:
+            HPESimpliVityException: if the response status is 400 and above
+        """
+        if self._coalescer is not None:
+            resp, body = self._coalescer.call(url, lambda: self.do_http('GET', url, ''))
+        else:
+            resp, body = self.do_http('GET', url, '')
+        if resp.status >= 400:
+            raise exceptions.HPESimpliVityException(body)
+
+        return body
+
+    def get_members(self, url, members_field, **kwargs):
+        """Calls get http method on one of the OVCs and parses the members of the listing incrementally.
+
+        The listing is requested from another OVC if one fails before the first member.
+
+        Yields:
+            dict: Members of the listing
+        """
+        errors = []
+        for member in self.__read_order():
+            members = member.connection.get_members(url, members_field, **kwargs)
+            try:
+                first = next(members)
+            except StopIteration:
+                return
+            except Exception as error:
+                if not self.__can_fail_over(error):
+                    raise
+                self.__fail(member, error, errors)
+                continue
+
+            yield first
+            for item in members:
+                yield item
+            return
+
+        raise exceptions.HPESimpliVityException(MSG_ALL_OVCS_FAILED.format("; ".join(errors)))
+
+    def post(self, uri, body, custom_headers=None):
+        """Calls post http method on the write OVC.
+
+        Returns:
+            tuple: Tuple with two members (task and response body)
+        """
+        return self.__write_task(lambda member: member.connection.post(uri, body, custom_headers))
+
+    def put(self, uri, body, custom_headers=None):
+        """Calls put http method on the write OVC.
+
+        Returns:
+            tuple: Tuple with two members (task and response body)
+        """
+        return self.__write_task(lambda member: member.connection.put(uri, body, custom_headers))
+
+    def delete(self, uri, custom_headers=None):
+        """Calls delete http method on the write OVC.
+
+        Returns:
+            tuple: Tuple with two members (task and response body)
+        """
+        return self.__write_task(lambda member: member.connection.delete(uri, custom_headers))
+
+    def get_task_ovc(self, task_id):
+        """Gets the IP address of the OVC which started a task.
+
+        Args:
+            task_id: Id of the task.
+
+        Returns:
+            str: IP address of the OVC, None if the task is not pinned to an OVC.
+        """
+        member = self.__get_task_member(task_id)
+        return member.ovc_ip if member else None
+
+    def pin_task(self, task_id, ovc_ip):
+        """Polls a task on the OVC which started it, for a task started by another client.
+
+        Args:
+            task_id: Id of the task.
+            ovc_ip: IP address of the OVC which started the task.
+
+        Returns:
+            bool: False if the OVC is not a member of the federation.
+        """
+        for member in self._members:
+            if member.ovc_ip == ovc_ip:
+                self.__pin_task(task_id, member)
+                return True
+
+        return False
+
+    def __write_task(self, call):
+        """Sends a write request and pins the task it started to its OVC."""
+        member, result = self.__write(call, with_member=True)
+        task = result[0]
+        if task:
+            self.__pin_task(task['task']['id'], member)
+
+        return result
+
+    def __write(self, call, with_member=False):
+        """Sends a write request to the first healthy OVC, to the next one if it could not be sent."""
+        errors = []
+        for member in self.__write_order():
+            try:
+                result = call(member)
+            except CONNECT_ERRORS as error:
+                self.__fail(member, error, errors)
+                continue
+
+            return (member, result) if with_member else result
+
+        raise exceptions.HPESimpliVityException(MSG_ALL_OVCS_FAILED.format("; ".join(errors)))
+
+    def __read(self, call, path):
+        """Sends a read request, to the next OVC on network and server errors.
+
+        A task not pinned to its OVC, started by another client for example, is
+        asked to the next OVC while the OVCs answer that they do not know it.
+        """
+        errors = []
+        task_id = self.__get_task_id(path)
+        pinned = self.__get_task_member(task_id)
+        not_found = None
+        for member in [pinned] if pinned else self.__read_order():
+            started = time.monotonic()
+            try:
+                resp, body = call(member)
+            except Exception as error:
+                if not self.__can_fail_over(error):
+                    raise
+                self.__fail(member, error, errors)
+                continue
+
+            if resp.status >= 500 and not pinned:
+                self.__fail(member, "status {}".format(resp.status), errors)
+                continue
+
+            member.record_latency(time.monotonic() - started)
+            if task_id and not pinned and resp.status == 404:
+                not_found = resp, body
+                continue
+
+            if task_id:
+                self.__update_task(task_id, member, body)
+            return resp, body
+
+        if not_found:
+            return not_found
+
+        raise exceptions.HPESimpliVityException(MSG_ALL_OVCS_FAILED.format("; ".join(errors)))
+
+    @staticmethod
+    def __get_task_id(path):
+        """Gets the id of the task of a URL, None for the other URLs."""
+        match = TASK_URL.match(path)
+        return match.group(1) if match else None
+
+    def __get_task_member(self, task_id):
+        """Gets the OVC which started a task, tasks are known only by this OVC."""
+        if not task_id:
+            return None
+
+        with self._lock:
+            return self._task_members.get(task_id)
+
+    def __pin_task(self, task_id, member):
+        with self._lock:
+            self._task_members[task_id] = member
+            self._task_members.move_to_end(task_id)
+            if len(self._task_members) > MAX_TASK_MEMBERS:
+                self._task_members.popitem(last=False)
+
+    def __update_task(self, task_id, member, body):
+        """Pins a running task to the OVC which knows it, and forgets the OVC once the task has ended."""
+        task = body.get('task') if isinstance(body, dict) else None
+        if not isinstance(task, dict):
+            return
+
+        if task.get('state') in TASK_PENDING_STATES:
+            self.__pin_task(task_id, member)
+        else:
+            with self._lock:
+                self._task_members.pop(task_id, None)
+
+    def __read_order(self):
+        """Gets the OVCs to try for a read request, in order."""
+        healthy = [member for member in self._members if member.is_healthy()] or list(self._members)
+        if self._routing == LEAST_LATENCY:
+            # Members without latency samples are tried first
+            healthy.sort(key=lambda member: -1 if member.latency is None else member.latency)
+            return healthy
+
+        start = next(self._counter) % len(healthy)
+        return healthy[start:] + healthy[:start]
+
+    def __write_order(self):
+        """Gets the OVCs to try for a write request, in order."""
+        healthy = [member for member in self._members if member.is_healthy()]
+        return healthy + [member for member in self._members if member not in healthy]
+
+    @staticmethod
+    def __can_fail_over(error):
+        """Checks if an error means the OVC is unreachable or failed to serve the request."""
+        if isinstance(error, exceptions.HPESimpliVityServerError):
+            return True
+        if isinstance(error, exceptions.HPESimpliVityException):
+            error = error.__cause__
+
+        return isinstance(error, FAILOVER_ERRORS)
+
+    @staticmethod
+    def __fail(member, error, errors):
+        logger.warning("OVC %s failed, trying the next one: %s", member.ovc_ip, error)
+        member.mark_failed()
+        errors.append("{}: {}".format(member.ovc_ip, error))
+
+
+class FederationClient(OVC):
+    """Client for all the resources spreading the requests over several OVCs of a federation.
+
+    The configuration is the one of the OVC client, with the list of the OVC IP
+    addresses in "ips" instead of "ip" and the optional "routing" of the read
+    requests (round_robin or least_latency).
+    """
+
+    def __init__(self, config):
+        """Initialize FederationClient class."""
+        if not config.get("ips"):
+            raise exceptions.HPESimpliVityException(MSG_NO_ENDPOINTS)
+
+        super(FederationClient, self).__init__(config)
+
+    def _create_connection(self, config):
+        """Creates the connections to the OVCs of the federation.
+
+        Args:
+            config: Client configuration.
+
+        Returns:
+            FederatedConnection object
+        """
+        connections = []
+        for ip in config["ips"]:
+            ovc_config = dict(config, ip=ip)
+            connections.append(super(FederationClient, self)._create_connection(ovc_config))
+
+        return FederatedConnection(connections, config.get("routing", ROUND_ROBIN),
+                                   config.get('coalesce_requests', True))
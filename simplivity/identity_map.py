@@ -0,0 +1,75 @@
+###
+# (C) Copyright [2019] Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##
+
+"""Identity map of the resource objects of a client session.
+
+The listings, get_by_id and get_by_name return the live object of a resource
+id when there is one, with its data updated, instead of a new object. The map
+references the objects weakly, an object is dropped once the caller releases it.
+"""
+
+import threading
+import weakref
+
+
+class IdentityMap(object):
+    """Live resource objects by resource class and id.
+
+    Attributes:
+        hits: Number of times a live object was returned instead of a new one.
+    """
+
+    def __init__(self):
+        self._objects = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+        self.hits = 0
+
+    def __len__(self):
+        return len(self._objects)
+
+    def get(self, resource_cls, resource_id):
+        """Gets the live object of a resource, None if there is none.
+
+        Args:
+            resource_cls: Class of the resource class object, like VirtualMachines.
+            resource_id: ID of the resource.
+        """
+        return self._objects.get((resource_cls, resource_id))
+
+    def get_or_create(self, resource_cls, resource_id, create, update):
+        """Gets the live object of a resource, updated, or creates it.
+
+        Args:
+            resource_cls: Class of the resource class object, like VirtualMachines.
+            resource_id: ID of the resource.
+            create: Function without arguments creating the object.
+            update: Function updating the data of the live object, called with the object.
+
+        Returns:
+            Resource object
+        """
+        key = (resource_cls, resource_id)
+        with self._lock:
+            resource = self._objects.get(key)
+            if resource is None:
+                resource = create()
+                self._objects[key] = resource
+                return resource
+
+            self.hits += 1
+
+        update(resource)
+        return resource
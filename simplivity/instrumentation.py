@@ -0,0 +1,257 @@
+###
+# (C) Copyright [2019] Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##
+
+"""Hooks observing the requests of a connection and a latency histogram collector."""
+
+import bisect
+import re
+import threading
+import time
+
+# Phases of a request, in order
+CONNECT = 'connect'
+SEND = 'send'
+WAIT = 'wait'
+READ = 'read'
+DECODE = 'decode'
+PHASES = (CONNECT, SEND, WAIT, READ, DECODE)
+
+# Upper bounds in seconds of the histogram buckets, the last bucket has no bound
+BUCKET_BOUNDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# The names of the collections and actions have no digit, the ids have
+ID_SEGMENT = re.compile(r'\d')
+
+
+def get_path_template(path):
+    """Gets the template of a request path, with the ids replaced by {id} and without the query.
+
+    Args:
+        path: Request path, like /virtual_machines/4230-a8c1/backup?fields=id
+
+    Returns:
+        str: Path template, like /virtual_machines/{id}/backup
+    """
+    path = path.split('?', 1)[0]
+    return '/'.join('{id}' if ID_SEGMENT.search(segment) else segment for segment in path.split('/'))
+
+
+class RequestInfo(object):
+    """A request observed by the hooks.
+
+    Attributes:
+        method: HTTP method.
+        path: Request path.
+        status: HTTP status of the response, None until the response is received.
+        timings: Seconds spent in each phase, keyed by phase name: connect (name
+          resolution, TCP and TLS handshakes, only for a new connection), send,
+          wait (until the response headers), read (body and decompression) and
+          decode (JSON parsing). The read and decode phases are not measured for
+          the streamed listings.
+    """
+
+    def __init__(self, method, path):
+        self.method = method
+        self.path = path
+        self.status = None
+        self.timings = {}
+        self.started = time.monotonic()
+        self._phase_started = self.started
+
+    @property
+    def template(self):
+        """Path template of the request."""
+        return get_path_template(self.path)
+
+    @property
+    def duration(self):
+        """Seconds spent in all the measured phases."""
+        return sum(self.timings.values())
+
+    def start_phase(self):
+        """Marks the start of a phase."""
+        self._phase_started = time.monotonic()
+
+    def end_phase(self, phase, connect_duration=0):
+        """Records the time elapsed since the start of the phase.
+
+        Args:
+            phase: Name of the phase.
+            connect_duration: Seconds of the phase spent opening the connection,
+              recorded in the connect phase.
+        """
+        now = time.monotonic()
+        elapsed = now - self._phase_started
+        if connect_duration:
+            self.timings[CONNECT] = self.timings.get(CONNECT, 0) + connect_duration
+            elapsed = max(0.0, elapsed - connect_duration)
+
+        self.timings[phase] = self.timings.get(phase, 0) + elapsed
+        self._phase_started = now
+
+    def __repr__(self):
+        return "RequestInfo(method={!r}, path={!r}, status={!r})".format(self.method, self.path, self.status)
+
+
+class RequestHook(object):
+    """Base class of the hooks called for each request sent by a connection.
+
+    A retried request is reported once per attempt. Exceptions raised by a hook
+    are logged and do not fail the request.
+    """
+
+    def on_request_start(self, request):
+        """Called before the request is sent.
+
+        Args:
+            request: RequestInfo object.
+        """
+
+    def on_response(self, request, resp):
+        """Called when the response is received, with the timings of the request.
+
+        Args:
+            request: RequestInfo object.
+            resp: HTTP response object.
+        """
+
+    def on_error(self, request, error):
+        """Called when the request failed without a response.
+
+        Args:
+            request: RequestInfo object.
+            error: Exception raised.
+        """
+
+
+class HistogramStats(object):
+    """Latency distribution of the requests of one method and path template.
+
+    Attributes:
+        count (int): Requests with a response.
+        errors (int): Requests failed without a response.
+        buckets (list): Number of requests per latency bucket, see BUCKET_BOUNDS.
+        total (float): Seconds spent in the requests.
+        max (float): Highest latency in seconds.
+        phase_totals (dict): Seconds spent in each phase.
+    """
+
+    def __init__(self, bounds):
+        self.count = 0
+        self.errors = 0
+        self.bounds = bounds
+        self.buckets = [0] * (len(bounds) + 1)
+        self.total = 0.0
+        self.max = 0.0
+        self.phase_totals = {}
+
+    @property
+    def mean(self):
+        """Mean latency in seconds."""
+        return self.total / self.count if self.count else 0.0
+
+    def add(self, request):
+        """Records the latency of a request."""
+        duration = request.duration
+        self.count += 1
+        self.buckets[bisect.bisect_left(self.bounds, duration)] += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+        for phase, seconds in request.timings.items():
+            self.phase_totals[phase] = self.phase_totals.get(phase, 0) + seconds
+
+    def percentile(self, percent):
+        """Estimates a latency percentile by the upper bound of its bucket.
+
+        Args:
+            percent: Percentile, between 0 and 100.
+
+        Returns:
+            float: Latency in seconds, None if no request was recorded.
+        """
+        if not self.count:
+            return None
+
+        rank = percent / 100.0 * self.count
+        seen = 0
+        for index, bucket in enumerate(self.buckets):
+            seen += bucket
+            if bucket and seen >= rank:
+                return min(self.bounds[index], self.max) if index < len(self.bounds) else self.max
+
+        return self.max
+
+    def phase_mean(self, phase):
+        """Mean seconds spent in a phase."""
+        return self.phase_totals.get(phase, 0) / self.count if self.count else 0.0
+
+    def __repr__(self):
+        return "HistogramStats(count={}, errors={}, mean={:.4f}, max={:.4f})".format(
+            self.count, self.errors, self.mean, self.max)
+
+
+class LatencyHistogram(RequestHook):
+    """Hook collecting the latencies of the requests in memory, by method and path template."""
+
+    def __init__(self, bounds=BUCKET_BOUNDS):
+        """Initializes an empty histogram.
+
+        Args:
+            bounds: Upper bounds in seconds of the buckets, in increasing order.
+        """
+        self._bounds = tuple(bounds)
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def on_response(self, request, resp):
+        with self._lock:
+            self.__get_stats(request).add(request)
+
+    def on_error(self, request, error):
+        with self._lock:
+            self.__get_stats(request).errors += 1
+
+    def __get_stats(self, request):
+        key = (request.method, request.template)
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = HistogramStats(self._bounds)
+
+        return stats
+
+    def get(self, method, template):
+        """Gets the latency distribution of a method and path template.
+
+        Returns:
+            HistogramStats object, None if no request was recorded.
+        """
+        return self._stats.get((method, template))
+
+    def summary(self):
+        """Gets the latency distributions of all the requests.
+
+        Returns:
+            dict: HistogramStats objects keyed by (method, path template), slowest mean first.
+        """
+        with self._lock:
+            items = sorted(self._stats.items(), key=lambda item: item[1].mean, reverse=True)
+
+        return dict(items)
+
+    def reset(self):
+        """Removes the recorded latencies."""
+        with self._lock:
+            self._stats.clear()
@@ -0,0 +1,262 @@
+###
+# (C) Copyright [2019] Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##
+
+"""Persistent snapshot of the inventory of a federation, kept in SQLite.
+
+The listings of each resource type are saved with the time they were loaded, and
+served from the file while they are fresher than the freshness window of the
+type, so repeated runs of a tool start from a warm local snapshot. The resources
+are indexed by id, name, cluster and datastore; the listings filtered on other
+fields are always sent to the OVC.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Default path of the inventory file
+DEFAULT_PATH = os.path.join(os.path.expanduser('~'), '.simplivity', 'inventory.sqlite')
+
+# Seconds a snapshot is served before it is loaded again, by resource type.
+# Only these types are kept in the store.
+DEFAULT_FRESHNESS = {
+    'virtual_machines': 300,
+    'backups': 300,
+    'datastores': 900,
+    'policies': 3600,
+    'hosts': 3600,
+    'omnistack_clusters': 3600,
+    'cluster_groups': 3600,
+    'external_stores': 3600,
+}
+
+# Resource types listed with their optional fields when the snapshot is loaded
+OPTIONAL_FIELDS_TYPES = ('virtual_machines',)
+
+# Optional fields, removed from the resources served to the callers which did not ask for them
+OPTIONAL_FIELDS = ('ha_status', 'ha_resynchronization_progress', 'hypervisor_virtual_machine_power_state',
+                   'hypervisor_is_template')
+
+# Object types of the task affected objects, with their resource type
+OBJECT_TYPES = {
+    'virtual_machine': 'virtual_machines',
+    'backup': 'backups',
+    'datastore': 'datastores',
+    'policy': 'policies',
+    'host': 'hosts',
+    'omnistack_cluster': 'omnistack_clusters',
+    'cluster_group': 'cluster_groups',
+}
+
+# Filters served from the store, with their indexed column
+INDEXED_FILTERS = {
+    'id': 'id',
+    'name': 'name',
+    'omnistack_cluster_id': 'cluster_id',
+    'datastore_id': 'datastore_id',
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS resources (
+    scope TEXT NOT NULL,
+    type TEXT NOT NULL,
+    id TEXT NOT NULL,
+    name TEXT,
+    cluster_id TEXT,
+    datastore_id TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (scope, type, id)
+);
+CREATE INDEX IF NOT EXISTS resources_name ON resources (scope, type, name);
+CREATE INDEX IF NOT EXISTS resources_cluster ON resources (scope, type, cluster_id);
+CREATE INDEX IF NOT EXISTS resources_datastore ON resources (scope, type, datastore_id);
+CREATE TABLE IF NOT EXISTS snapshots (
+    scope TEXT NOT NULL,
+    type TEXT NOT NULL,
+    loaded_at REAL NOT NULL,
+    PRIMARY KEY (scope, type)
+);
+"""
+
+
+def _get_row(scope, resource_type, data):
+    # External stores have no id, they are identified by their name
+    return (scope, resource_type, data.get('id') or data.get('name'), data.get('name'),
+            data.get('omnistack_cluster_id'), data.get('datastore_id'), json.dumps(data))
+
+
+def _escape_glob(pattern):
+    """Escapes the GLOB wildcards of a filter value, except the asterisks."""
+    return pattern.replace('[', '[[]').replace('?', '[?]')
+
+
+class InventoryStore(object):
+    """Snapshots of the resource listings of an OVC in a SQLite file.
+
+    A file can hold the snapshots of several OVCs, they are kept apart by scope.
+    """
+
+    def __init__(self, path=None, scope='', freshness=None):
+        """Opens the store, the file and its tables are created if needed.
+
+        Args:
+            path: Path of the SQLite file, ':memory:' for a store lasting as long as the
+              object. Default: ~/.simplivity/inventory.sqlite
+            scope: Name of the snapshots in the file, like the OVC IP address.
+            freshness: Seconds a snapshot is served before it is loaded again, by resource
+              type, overriding DEFAULT_FRESHNESS; 0 disables the store for a type.
+        """
+        self.path = path or DEFAULT_PATH
+        self.scope = scope
+        self.freshness = dict(DEFAULT_FRESHNESS, **(freshness or {}))
+        if self.path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), mode=0o700, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        with self._db:
+            self._db.executescript(SCHEMA)
+
+    def close(self):
+        """Closes the file."""
+        with self._lock:
+            self._db.close()
+
+    def is_stored(self, resource_type):
+        """Returns True if the listings of a resource type are kept in the store."""
+        return bool(self.freshness.get(resource_type))
+
+    def can_serve(self, resource_type, filters):
+        """Returns True if a listing of a resource type with filters can be served from the store."""
+        return self.is_stored(resource_type) and all(field in INDEXED_FILTERS for field in filters)
+
+    def get_loaded_at(self, resource_type):
+        """Gets the time the snapshot of a resource type was loaded, None if there is none."""
+        with self._lock:
+            row = self._db.execute("SELECT loaded_at FROM snapshots WHERE scope = ? AND type = ?",
+                                   (self.scope, resource_type)).fetchone()
+
+        return row[0] if row else None
+
+    def is_fresh(self, resource_type):
+        """Returns True if the snapshot of a resource type is within its freshness window."""
+        loaded_at = self.get_loaded_at(resource_type)
+        return loaded_at is not None and time.time() - loaded_at < self.freshness.get(resource_type, 0)
+
+    def replace(self, resource_type, resources):
+        """Replaces the snapshot of a resource type.
+
+        Args:
+            resource_type: Resource type, like virtual_machines.
+            resources: Data of all the resources of the type.
+        """
+        rows = [_get_row(self.scope, resource_type, data) for data in resources]
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM resources WHERE scope = ? AND type = ?", (self.scope, resource_type))
+            self._db.executemany("INSERT OR REPLACE INTO resources VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            self._db.execute("INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?)",
+                             (self.scope, resource_type, time.time()))
+
+    def upsert(self, resource_type, resources):
+        """Adds or updates resources in the snapshot of a resource type, if there is one."""
+        if self.get_loaded_at(resource_type) is None:
+            return
+
+        rows = [_get_row(self.scope, resource_type, data) for data in resources]
+        with self._lock, self._db:
+            self._db.executemany("INSERT OR REPLACE INTO resources VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def remove(self, resource_type, resource_ids):
+        """Removes resources from the snapshot of a resource type."""
+        with self._lock, self._db:
+            self._db.executemany("DELETE FROM resources WHERE scope = ? AND type = ? AND id = ?",
+                                 [(self.scope, resource_type, resource_id) for resource_id in resource_ids])
+
+    def invalidate(self, resource_types=None):
+        """Marks snapshots as stale, they are loaded again on next use.
+
+        Args:
+            resource_types: Resource types to invalidate. Default: all.
+        """
+        with self._lock, self._db:
+            if resource_types is None:
+                self._db.execute("DELETE FROM snapshots WHERE scope = ?", (self.scope,))
+            else:
+                self._db.executemany("DELETE FROM snapshots WHERE scope = ? AND type = ?",
+                                     [(self.scope, resource_type) for resource_type in resource_types])
+
+    def select(self, resource_type, filters=None, sort='name', order='descending', case_sensitive=True,
+               offset=0, limit=None):
+        """Lists resources of the snapshot of a resource type, like the OVC would.
+
+        Args:
+            resource_type: Resource type, like virtual_machines.
+            filters: Filters on the indexed fields (id, name, omnistack_cluster_id, datastore_id),
+              with comma-separated values and asterisk wildcards.
+            sort: Field to sort on.
+            order: ascending or descending.
+            case_sensitive: False to filter and sort case-insensitively.
+            offset: Number of resources skipped.
+            limit: Maximum number of resources returned.
+
+        Returns:
+            list: Data of the resources.
+        """
+        clauses, parameters = ["scope = ?", "type = ?"], [self.scope, resource_type]
+        for field, value in (filters or {}).items():
+            clause, values = self.__get_filter_clause(INDEXED_FILTERS[field], str(value), case_sensitive)
+            clauses.append(clause)
+            parameters.extend(values)
+
+        query = "SELECT data FROM resources WHERE " + " AND ".join(clauses)
+        with self._lock:
+            resources = [json.loads(row[0]) for row in self._db.execute(query, parameters)]
+
+        resources.sort(key=lambda data: self.__get_sort_key(data.get(sort), case_sensitive),
+                       reverse=order == 'descending')
+        return resources[offset:offset + limit if limit is not None else None]
+
+    @staticmethod
+    def __get_filter_clause(column, value, case_sensitive):
+        """Gets the SQL condition of a filter with comma-separated values and asterisk wildcards."""
+        target = column if case_sensitive else "lower({})".format(column)
+        values = value.split(',') if case_sensitive else value.lower().split(',')
+
+        conditions, parameters = [], []
+        for item in values:
+            if '*' in item:
+                conditions.append("{} GLOB ?".format(target))
+                parameters.append(_escape_glob(item))
+            else:
+                conditions.append("{} = ?".format(target))
+                parameters.append(item)
+
+        return "(" + " OR ".join(conditions) + ")", parameters
+
+    @staticmethod
+    def __get_sort_key(value, case_sensitive):
+        if isinstance(value, str) and not case_sensitive:
+            value = value.lower()
+
+        # Resources without the field are sorted first, then the numbers by value and the other values as strings
+        if value is None:
+            return 0, 0, ''
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return 1, value, ''
+
+        return 2, 0, str(value)
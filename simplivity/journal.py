@@ -0,0 +1,275 @@
+###
+# (C) Copyright [2019] Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##
+
+"""Journal of the operations of a long-running job, to resume the job after a restart.
+
+Each operation is recorded in an append-only file of JSON lines when it is
+submitted, when the OVC has started its task and when the task ends. Run again
+with the same journal, a job skips the operations already completed and waits
+for the tasks still running by polling /tasks/{id}, instead of submitting them
+again. With a federation, the tasks are polled on the OVC which started them. The request bodies are not recorded, they may hold credentials.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+from simplivity import exceptions
+from simplivity.instrumentation import get_path_template
+from simplivity.resources.resource import ResourceClient
+
+# Events of an operation, in their order
+SUBMITTED = 'submitted'
+STARTED = 'started'
+COMPLETED = 'completed'
+FAILED = 'failed'
+
+logger = logging.getLogger(__name__)
+
+
+def get_operation_key(method, uri, data):
+    """Gets the key of an operation from its request, the same request always gets the same key."""
+    digest = hashlib.sha256(json.dumps(data, sort_keys=True).encode('utf-8')).hexdigest()
+    return "{} {} {}".format(method, uri, digest[:16])
+
+
+class Journal(object):
+    """Last event of each operation, kept in an append-only file of JSON lines.
+
+    A line cut short by a crash is ignored when the file is read.
+    """
+
+    def __init__(self, path, fsync=True):
+        """Reads the journal file, it is created if needed.
+
+        Args:
+            path: Path of the journal file.
+            fsync: True to flush each record to the disk before going on.
+        """
+        self.path = path
+        self._fsync = fsync
+        self._lock = threading.Lock()
+        self._entries = self.__read()
+        self._file = open(path, 'a')
+
+    def __read(self):
+        entries = {}
+        try:
+            with open(self.path) as journal_file:
+                for number, line in enumerate(journal_file, 1):
+                    try:
+                        entry = json.loads(line)
+                        entries[entry['key']] = entry
+                    except (ValueError, KeyError, TypeError):
+                        logger.warning("Ignoring the line %s of the journal %s", number, self.path)
+        except FileNotFoundError:
+            pass
+
+        return entries
+
+    def close(self):
+        """Closes the journal file."""
+        with self._lock:
+            self._file.close()
+
+    def get(self, key):
+        """Gets the last event of an operation, None if it was never submitted.
+
+        Returns:
+            dict: Record with the key, the event, its time and its fields.
+        """
+        return self._entries.get(key)
+
+    def get_pending(self):
+        """Gets the last event of the operations submitted or started, which did not end.
+
+        Returns:
+            list: Records of the pending operations.
+        """
+        with self._lock:
+            return [entry for entry in self._entries.values() if entry['event'] in (SUBMITTED, STARTED)]
+
+    def record(self, key, event, **fields):
+        """Appends an event of an operation.
+
+        Args:
+            key: Key of the operation.
+            event: submitted, started, completed or failed.
+            fields: Fields of the event, serializable in JSON.
+        """
+        entry = dict(fields, key=key, event=event, time=time.time())
+        with self._lock:
+            self._file.write(json.dumps(entry) + '\n')
+            self._file.flush()
+            if self._fsync:
+                os.fsync(self._file.fileno())
+            self._entries[key] = entry
+
+
+class JournalingExecutor(object):
+    """Makes post requests like ResourceClient.do_post, recording them in a journal.
+
+    The executor can be used by several threads at once.
+
+    Attributes:
+        submitted: Number of operations submitted to the OVC.
+        resumed: Number of tasks of a previous run waited for instead of submitting them.
+        skipped: Number of operations completed in a previous run.
+    """
+
+    def __init__(self, connection, journal, timeout=-1):
+        """Initializes with the connection and the journal.
+
+        Args:
+            connection: Connection object.
+            journal: Journal object or path of the journal file.
+            timeout: Default timeout of the tasks in seconds.
+        """
+        self._connection = connection
+        self._client = ResourceClient(connection, None)
+        self._journal = journal if isinstance(journal, Journal) else Journal(journal)
+        self._timeout = timeout
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.resumed = 0
+        self.skipped = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def journal(self):
+        """Gets the journal of the operations.
+
+        Returns:
+            Journal object
+        """
+        return self._journal
+
+    def close(self):
+        """Closes the journal file."""
+        self._journal.close()
+
+    def post(self, uri, data, key=None, timeout=None, custom_headers=None):
+        """Makes a post request unless the journal shows it was already made.
+
+        An operation completed in a previous run is not submitted again and its
+        recorded affected resources are returned; the task of an operation started
+        in a previous run is waited for.
+
+        Args:
+            uri: URI of the resource.
+            data: Request body of the call.
+            key: Key identifying the operation across runs. Default: derived from the request.
+            timeout: Time out for the task in seconds. Default: the timeout of the executor.
+            custom_headers: Allows to add custom http headers.
+
+        Returns:
+            list: Returns ids of the affected resources.
+        """
+        key = key or get_operation_key('POST', uri, data)
+        timeout = self._timeout if timeout is None else timeout
+
+        entry = self._journal.get(key)
+        if entry is not None and entry['event'] == COMPLETED:
+            self.__count('skipped')
+            return entry.get('affected')
+        if entry is not None and entry['event'] == STARTED:
+            self.__count('resumed')
+            return self.__resume(entry, timeout)
+        if entry is not None and entry['event'] == SUBMITTED:
+            logger.warning("The task of the operation %s is unknown, submitting it again", key)
+
+        operation = "POST " + get_path_template(uri)
+        self._journal.record(key, SUBMITTED, operation=operation)
+        self.__count('submitted')
+        try:
+            task, body = self._connection.post(uri, data, custom_headers=custom_headers)
+        except exceptions.HPESimpliVityException as error:
+            self._journal.record(key, FAILED, operation=operation, error=str(error))
+            raise
+
+        if not task:
+            self._journal.record(key, COMPLETED, operation=operation, affected=body)
+            return body
+
+        task_id = task['task']['id'] if 'task' in task else task['id']
+        self._journal.record(key, STARTED, operation=operation, task_id=task_id, ovc_ip=self.__get_task_ovc(task_id))
+        return self.__wait(key, task_id, operation, timeout)
+
+    def resume(self, timeout=None):
+        """Waits for the tasks started in a previous run which did not end.
+
+        Args:
+            timeout: Time out for each task in seconds. Default: the timeout of the executor.
+
+        Returns:
+            dict: Affected resources, or the exception raised by the task, by operation key.
+        """
+        timeout = self._timeout if timeout is None else timeout
+        results = {}
+        for entry in self._journal.get_pending():
+            if entry['event'] != STARTED:
+                continue
+
+            self.__count('resumed')
+            try:
+                results[entry['key']] = self.__resume(entry, timeout)
+            except exceptions.HPESimpliVityException as error:
+                results[entry['key']] = error
+
+        return results
+
+    def __get_task_ovc(self, task_id):
+        """Gets the IP address of the OVC which started a task, None without a federation."""
+        get_task_ovc = getattr(self._connection, 'get_task_ovc', None)
+        return get_task_ovc(task_id) if get_task_ovc else None
+
+    def __resume(self, entry, timeout):
+        """Waits for the task of an operation started in a previous run, on the OVC which started it."""
+        pin_task = getattr(self._connection, 'pin_task', None)
+        if pin_task and entry.get('ovc_ip'):
+            pin_task(entry['task_id'], entry['ovc_ip'])
+
+        return self.__wait(entry['key'], entry['task_id'], entry['operation'], timeout)
+
+    def __wait(self, key, task_id, operation, timeout):
+        """Waits for the task of an operation and records its outcome.
+
+        A timeout leaves the operation started, so the next run waits for the task again.
+        """
+        task = {'id': task_id, 'state': 'IN_PROGRESS'}
+        try:
+            affected = self._client.task_affected_resources(task, timeout, operation)
+        except exceptions.HPESimpliVityTimeout:
+            raise
+        except exceptions.HPESimpliVityException as error:
+            self._journal.record(key, FAILED, operation=operation, task_id=task_id, error=str(error))
+            raise
+
+        affected = list(affected)
+        self._journal.record(key, COMPLETED, operation=operation, task_id=task_id, affected=affected)
+        return affected
+
+    def __count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
@@ -0,0 +1,144 @@
+###
+# (C) Copyright [2019] Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##
+
+"""Implements the JSON codecs used to encode and decode the REST payloads.
+
+The codecs decode straight from the response bytes. orjson and ujson are used
+when installed, they are optional dependencies.
+"""
+
+import json
+
+from simplivity import exceptions
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+UNKNOWN_CODEC = "Unknown JSON codec {}, valid values: {}"
+CODEC_NOT_INSTALLED = "JSON codec {} is not installed"
+
+
+class JSONCodec(object):
+    """Encodes and decodes JSON with the standard library json module."""
+
+    name = 'json'
+
+    @staticmethod
+    def is_available():
+        """Returns True if the codec backend is installed."""
+        return True
+
+    def loads(self, data):
+        """Decodes JSON data.
+
+        Args:
+            data: JSON document (bytes or str)
+
+        Returns:
+            Decoded object
+        """
+        return json.loads(data)
+
+    def dumps(self, obj):
+        """Encodes an object to JSON.
+
+        Args:
+            obj: Object to encode
+
+        Returns:
+            str/bytes: JSON document
+        """
+        return json.dumps(obj)
+
+
+class OrjsonCodec(JSONCodec):
+    """Encodes and decodes JSON with orjson."""
+
+    name = 'orjson'
+
+    @staticmethod
+    def is_available():
+        """Returns True if the codec backend is installed."""
+        return orjson is not None
+
+    def loads(self, data):
+        """Decodes JSON data."""
+        return orjson.loads(data)
+
+    def dumps(self, obj):
+        """Encodes an object to JSON bytes."""
+        return orjson.dumps(obj)
+
+
+class UjsonCodec(JSONCodec):
+    """Encodes and decodes JSON with ujson."""
+
+    name = 'ujson'
+
+    @staticmethod
+    def is_available():
+        """Returns True if the codec backend is installed."""
+        return ujson is not None
+
+    def loads(self, data):
+        """Decodes JSON data."""
+        return ujson.loads(data)
+
+    def dumps(self, obj):
+        """Encodes an object to JSON."""
+        return ujson.dumps(obj, escape_forward_slashes=False)
+
+
+# Codecs in order of preference
+CODECS = [OrjsonCodec, UjsonCodec, JSONCodec]
+
+
+def get_codec(codec=None):
+    """Gets a JSON codec.
+
+    Args:
+        codec: Name of the codec (json, orjson or ujson), a codec object
+          or None to get the fastest installed codec.
+
+    Returns:
+        JSONCodec object
+
+    Raises:
+        HPESimpliVityException: if the codec is unknown or not installed.
+    """
+    if isinstance(codec, JSONCodec):
+        return codec
+
+    if codec is None:
+        for codec_cls in CODECS:
+            if codec_cls.is_available():
+                return codec_cls()
+
+    names = [codec_cls.name for codec_cls in CODECS]
+    for codec_cls in CODECS:
+        if codec_cls.name == codec:
+            if not codec_cls.is_available():
+                raise exceptions.HPESimpliVityException(CODEC_NOT_INSTALLED.format(codec))
+            return codec_cls()
+
+    raise exceptions.HPESimpliVityException(UNKNOWN_CODEC.format(codec, ", ".join(names)))
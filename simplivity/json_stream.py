@@ -0,0 +1,218 @@
+###
+# (C) Copyright [2019] Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##
+
+"""Implements incremental parsing of the members of a listing response.
+
+A listing response is a JSON object with the resources in an array field,
+for example {"offset": 0, "count": 2, "virtual_machines": [{...}, {...}]}.
+The parser is fed with the response body in chunks and returns the members of
+the array as soon as they are complete, so only one member at a time is kept
+in memory in its encoded form.
+"""
+
+import codecs
+import json
+
+from simplivity import exceptions
+
+MSG_INVALID_DOCUMENT = "Invalid listing response: unexpected {!r} at position {}"
+MSG_INCOMPLETE_DOCUMENT = "Invalid listing response: unexpected end of the document"
+
+WHITESPACE = ' \t\n\r'
+
+# Parser states
+START = 'start'
+KEY = 'key'
+KEY_OR_END = 'key_or_end'
+COLON = 'colon'
+VALUE = 'value'
+AFTER_VALUE = 'after_value'
+MEMBERS_START = 'members_start'
+MEMBER = 'member'
+MEMBER_OR_END = 'member_or_end'
+AFTER_MEMBER = 'after_member'
+DONE = 'done'
+
+# Characters which move the parser from a state to another one
+TRANSITIONS = {(KEY_OR_END, '}'): DONE,
+               (MEMBERS_START, '['): MEMBER_OR_END,
+               (MEMBER_OR_END, ']'): AFTER_VALUE}
+
+# Separators expected in a state and the states they move the parser to
+SEPARATORS = {START: ('{', [KEY_OR_END]),
+              AFTER_VALUE: (',}', [KEY, DONE]),
+              AFTER_MEMBER: (',]', [MEMBER, AFTER_VALUE])}
+
+
+class MembersParser(object):
+    """Incremental parser of the members of a listing response.
+
+    Attributes:
+        document (dict): Top level fields of the response other than the members field.
+    """
+
+    def __init__(self, members_field):
+        """Initializes with the name of the members field."""
+        self._members_field = members_field
+        self._json_decoder = json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self._buffer = ''
+        self._pos = 0
+        self._state = START
+        self._consumed = 0
+        self._key = None
+        self.document = {}
+
+    def feed(self, chunk, final=False):
+        """Parses a chunk of the response body.
+
+        Args:
+            chunk: Chunk of the response body (bytes).
+            final: True if the chunk is the last one.
+
+        Returns:
+            list: Members completed by the chunk.
+
+        Raises:
+            HPESimpliVityException: if the response is not a valid listing document.
+        """
+        self._buffer += self._text_decoder.decode(chunk, final)
+        members = self.__parse(final)
+
+        # Drops the parsed part of the buffer
+        self._consumed += self._pos
+        self._buffer = self._buffer[self._pos:]
+        self._pos = 0
+
+        if final and self._state not in (DONE, START):
+            raise exceptions.HPESimpliVityException(MSG_INCOMPLETE_DOCUMENT)
+
+        return members
+
+    def __parse(self, final):
+        """Parses the buffer until the end or an incomplete value."""
+        members = []
+        buffer = self._buffer
+
+        while True:
+            while self._pos < len(buffer) and buffer[self._pos] in WHITESPACE:
+                self._pos += 1
+
+            if self._pos >= len(buffer) or not self.__step(buffer[self._pos], final, members):
+                break
+
+        return members
+
+    def __step(self, char, final, members):
+        """Parses the next token according to the state.
+
+        Returns:
+            boolean: False if more data is needed to parse the token.
+        """
+        state = self._state
+
+        if (state, char) in TRANSITIONS:
+            self.__advance(TRANSITIONS[(state, char)])
+        elif state in SEPARATORS:
+            self.__expect(char, *SEPARATORS[state])
+        elif state == COLON:
+            self.__expect(char, ':', [MEMBERS_START if self._key == self._members_field else VALUE])
+        elif state == DONE:
+            self.__invalid(char)
+        else:
+            return self.__decode_token(char, final, members)
+
+        return True
+
+    def __decode_token(self, char, final, members):
+        """Decodes a key, a value or a member according to the state.
+
+        Returns:
+            boolean: False if more data is needed to decode the token.
+        """
+        state = self._state
+        if state in (KEY, KEY_OR_END) and char != '"':
+            self.__invalid(char)
+
+        complete, value = self.__decode(final)
+        if not complete:
+            return False
+
+        if state in (KEY, KEY_OR_END):
+            self._key = value
+            self._state = COLON
+        elif state in (MEMBER, MEMBER_OR_END):
+            members.append(value)
+            self._state = AFTER_MEMBER
+        else:
+            self.document[self._key] = value
+            self._state = AFTER_VALUE
+
+        return True
+
+    def __advance(self, state):
+        """Consumes one character and moves to the state."""
+        self._pos += 1
+        self._state = state
+
+    def __expect(self, char, expected, states):
+        """Consumes one of the expected characters and moves to the matching state."""
+        index = expected.find(char)
+        if index < 0:
+            self.__invalid(char)
+        self.__advance(states[index])
+
+    def __invalid(self, char):
+        raise exceptions.HPESimpliVityException(MSG_INVALID_DOCUMENT.format(char, self._consumed + self._pos))
+
+    def __decode(self, final):
+        """Decodes the value at the current position.
+
+        Returns:
+            tuple: (True, value) if the value is complete or (False, None) if more data is needed.
+        """
+        try:
+            value, end = self._json_decoder.raw_decode(self._buffer, self._pos)
+        except json.JSONDecodeError:
+            if final:
+                self.__invalid(self._buffer[self._pos])
+            return False, None
+
+        # A number at the end of the buffer may continue in the next chunk
+        if end == len(self._buffer) and not final and isinstance(value, (int, float)):
+            return False, None
+
+        self._pos = end
+        return True, value
+
+
+def iter_members(chunks, members_field):
+    """Yields the members of a listing response.
+
+    Args:
+        chunks: Iterable of the response body chunks (bytes).
+        members_field: Name of the members field.
+
+    Yields:
+        Members of the listing.
+    """
+    parser = MembersParser(members_field)
+    for chunk in chunks:
+        for member in parser.feed(chunk):
+            yield member
+
+    for member in parser.feed(b'', final=True):
+        yield member
@@ -17,20 +17,36 @@
 """
 This module implements a common client for HPE SimpliVity resources.
 """
+import importlib
 import json
 import os
+import threading
 
+from simplivity import batching
 from simplivity import exceptions
+from simplivity import identity_map
+from simplivity import retry
+from simplivity import throttling
+from simplivity import token_cache
 from simplivity.connection import Connection
-from simplivity.resources.backups import Backups
-from simplivity.resources.cluster_groups import ClusterGroups
-from simplivity.resources.datastores import Datastores
-from simplivity.resources.hosts import Hosts
-from simplivity.resources.omnistack_clusters import OmnistackClusters
-from simplivity.resources.policies import Policies
-from simplivity.resources.virtual_machines import VirtualMachines
-from simplivity.resources.external_stores import ExternalStores
-from simplivity.resources.certificates import Certificates
+from simplivity.connection import POOL_SIZE
+from simplivity.executor import Executor
+from simplivity.executor import MAX_IN_FLIGHT
+
+# Resource clients by property name, with the module and the class implementing them.
+# The modules are imported on first access to the property, so importing the client
+# does not load the resource modules a script does not use.
+RESOURCE_CLIENTS = {
+    'virtual_machines': ('simplivity.resources.virtual_machines', 'VirtualMachines'),
+    'policies': ('simplivity.resources.policies', 'Policies'),
+    'datastores': ('simplivity.resources.datastores', 'Datastores'),
+    'omnistack_clusters': ('simplivity.resources.omnistack_clusters', 'OmnistackClusters'),
+    'backups': ('simplivity.resources.backups', 'Backups'),
+    'hosts': ('simplivity.resources.hosts', 'Hosts'),
+    'cluster_groups': ('simplivity.resources.cluster_groups', 'ClusterGroups'),
+    'external_stores': ('simplivity.resources.external_stores', 'ExternalStores'),
+    'certificates': ('simplivity.resources.certificates', 'Certificates'),
+}
 
 
 class OVC(object):
@@ -38,7 +54,7 @@ class OVC(object):
 
     def __init__(self, config):
         """Initialize OVC class."""
-        self.__connection = Connection(config["ip"], config.get('ssl_certificate', False), config.get('timeout'))
+        self.__connection = self._create_connection(config)
         if config.get("credentials"):
             username = config["credentials"].get("username")
             password = config["credentials"].get("password")
@@ -46,15 +62,112 @@ class OVC(object):
         else:
             raise exceptions.HPESimpliVityException("Credentials not provided")
 
-        self.__virtual_machines = None
-        self.__policies = None
-        self.__datastores = None
-        self.__omnistack_clusters = None
-        self.__backups = None
-        self.__hosts = None
-        self.__cluster_groups = None
-        self.__external_stores = None
-        self.__certificates = None
+        self.__executor = Executor(config.get('max_in_flight', MAX_IN_FLIGHT))
+
+        self.__resource_clients = {}
+        self.__resource_clients_lock = threading.Lock()
+
+    def _create_connection(self, config):
+        """Creates the connection to the OVC from the configuration.
+
+        Args:
+            config: Client configuration.
+
+        Returns:
+            Connection object
+        """
+        return Connection(config["ip"], config.get('ssl_certificate', False), config.get('timeout'),
+                          json_codec=config.get('json_codec'),
+                          accept_encoding=config.get('accept_encoding', True),
+                          pool_size=config.get('pool_size', POOL_SIZE),
+                          rate_limiter=self.__get_rate_limiter(config),
+                          concurrency_limiter=self.__get_concurrency_limiter(config),
+                          retry_policy=self.__get_retry_policy(config),
+                          hooks=config.get('hooks'),
+                          cassette=config.get('cassette'),
+                          token_cache=self.__get_token_cache(config),
+                          inventory_store=self.__get_inventory_store(config),
+                          coalesce_requests=config.get('coalesce_requests', True),
+                          identity_map=self.__get_identity_map(config))
+
+    @staticmethod
+    def __get_rate_limiter(config):
+        """Creates the rate limiter of the requests from the rate_limit configuration (requests per second)."""
+        rate_limit = config.get('rate_limit')
+        return throttling.RateLimiter(rate_limit) if rate_limit else None
+
+    @staticmethod
+    def __get_concurrency_limiter(config):
+        """Creates the adaptive concurrency limiter from the adaptive_concurrency configuration.
+
+        The configuration is either true for the default settings or a dictionary
+        with the AdaptiveConcurrencyLimiter arguments.
+        """
+        settings = config.get('adaptive_concurrency')
+        if not settings:
+            return None
+
+        return throttling.AdaptiveConcurrencyLimiter(**(settings if isinstance(settings, dict) else {}))
+
+    @staticmethod
+    def __get_retry_policy(config):
+        """Creates the retry policy from the retry configuration.
+
+        The configuration is either true for the default settings or a dictionary
+        with the RetryPolicy arguments.
+        """
+        settings = config.get('retry')
+        if not settings:
+            return None
+
+        return retry.RetryPolicy(**(settings if isinstance(settings, dict) else {}))
+
+    @staticmethod
+    def __get_token_cache(config):
+        """Creates the token cache from the token_cache configuration.
+
+        The configuration is either true for the default cache file, the path of
+        the cache file or a TokenCache object.
+        """
+        settings = config.get('token_cache')
+        if not settings:
+            return None
+        if isinstance(settings, token_cache.TokenCache):
+            return settings
+
+        return token_cache.TokenCache(settings if isinstance(settings, str) else None)
+
+    @staticmethod
+    def __get_inventory_store(config):
+        """Creates the inventory store from the inventory configuration.
+
+        The configuration is either true for the default file, the path of the
+        file, a dictionary with the InventoryStore arguments or an InventoryStore
+        object. The snapshots are kept apart by OVC IP address.
+        """
+        settings = config.get('inventory')
+        if not settings:
+            return None
+
+        from simplivity.inventory_store import InventoryStore
+        if isinstance(settings, InventoryStore):
+            return settings
+        if isinstance(settings, str):
+            settings = {'path': settings}
+
+        return InventoryStore(scope=config['ip'], **(settings if isinstance(settings, dict) else {}))
+
+    @staticmethod
+    def __get_identity_map(config):
+        """Creates the identity map of the resource objects from the identity_map configuration.
+
+        The configuration is either true for a new map or an IdentityMap object.
+        """
+        settings = config.get('identity_map')
+        if isinstance(settings, identity_map.IdentityMap):
+            return settings
+
+        return identity_map.IdentityMap() if settings else None
 
     @classmethod
     def from_json_file(cls, file_name):
@@ -85,6 +198,7 @@ class OVC(object):
         password = os.environ.get('SIMPLIVITYSDK_PASSWORD', '')
         ssl_certificate = os.environ.get('SIMPLIVITYSDK_SSL_CERTIFICATE', '')
         timeout = os.environ.get('SIMPLIVITYSDK_CONNECTION_TIMEOUT')
+        token_cache_path = os.environ.get('SIMPLIVITYSDK_TOKEN_CACHE')
 
         if not ip or not username or not password:
             raise exceptions.HPESimpliVityException("Make sure you have set mandatory env variables \
@@ -94,6 +208,8 @@ class OVC(object):
                       ssl_certificate=ssl_certificate,
                       credentials=dict(username=username, password=password),
                       timeout=timeout)
+        if token_cache_path:
+            config['token_cache'] = token_cache_path
 
         return cls(config)
 
@@ -107,6 +223,129 @@ class OVC(object):
         """
         return self.__connection
 
+    @property
+    def task_stats(self):
+        """
+        Gets the polling statistics of the task waits by operation.
+
+        Returns:
+            TaskStatsCollector object
+        """
+        return self.__connection.task_stats
+
+    def refresh_inventory(self, *resource_types):
+        """Loads again the inventory snapshots from the OVC.
+
+        Args:
+            resource_types: Resource types to refresh, like virtual_machines. Default: all
+              the types with a snapshot.
+        """
+        store = self.__connection.inventory_store
+        if store is None:
+            raise exceptions.HPESimpliVityException("The inventory store is not configured")
+
+        resource_types = resource_types or [name for name in RESOURCE_CLIENTS if store.get_loaded_at(name)]
+        resource_types = [name for name in resource_types if store.is_stored(name)]
+        store.invalidate(resource_types)
+        for resource_type in resource_types:
+            getattr(self, resource_type).get_all(limit=1)
+
+    def batch(self, max_size=batching.MAX_BATCH_SIZE, timeout=-1):
+        """
+        Opens a batch merging the single-resource operations into bulk requests.
+
+        Within the with block, VirtualMachine.set_policy and Backup.delete are queued
+        and return a concurrent.futures.Future; when the block ends, they are sent as
+        bulk requests grouped by policy and the futures get their results.
+
+        Args:
+            max_size: Maximum number of resources in one bulk request.
+            timeout: Timeout of the tasks of the bulk requests in seconds.
+
+        Returns:
+            Batch object, to be used as a context manager.
+        """
+        return batching.Batch(self.__connection, max_size, timeout)
+
+    def journal(self, path, timeout=-1):
+        """
+        Opens a journaling executor, recording the post requests of a long-running job in a file.
+
+        Run again with the same file, the job skips the operations already completed
+        and waits for the tasks still running instead of submitting them again.
+
+        Args:
+            path: Path of the journal file.
+            timeout: Default timeout of the tasks in seconds.
+
+        Returns:
+            JournalingExecutor object, to be used as a context manager.
+        """
+        from simplivity.journal import JournalingExecutor
+        return JournalingExecutor(self.__connection, path, timeout)
+
+    def logout(self):
+        """
+        Stops the background calls and removes the access token of the connection.
+
+        Returns:
+            boolean: Returns True
+        """
+        self.__executor.shutdown()
+        return self.__connection.logout()
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Runs an SDK call in the background, within the limit of calls in flight of the OVC.
+
+        Args:
+            fn: Function to call, for example vm.create_backup
+            args: Positional arguments of the function.
+            kwargs: Keyword arguments of the function.
+
+        Returns:
+            concurrent.futures.Future object of the call.
+        """
+        return self.__executor.submit(fn, *args, **kwargs)
+
+    def map(self, fn, items, max_workers=None, rate_limit=None, progress=None):
+        """
+        Calls a function for each item concurrently, within the limit of calls in flight of the OVC.
+
+        Errors are isolated per item: an exception raised for one item is returned
+        in its result and does not stop the other calls.
+
+        Args:
+            fn: Function called with each item, for example lambda vm: vm.create_backup("backup")
+            items: Iterable of items.
+            max_workers: Number of worker threads. Default: the limit of calls in flight.
+            rate_limit: Maximum number of calls started per second. Default: no limit.
+            progress: Function called as each item completes, with the number of
+              completed items, the total number of items and the ItemResult object.
+
+        Returns:
+            list: ItemResult objects (item, result, error) in the order of the items.
+        """
+        return self.__executor.map(fn, items, max_workers=max_workers, rate_limit=rate_limit, progress=progress)
+
+    def __get_resource_client(self, name):
+        """Gets a resource client, importing its module and creating it on first access.
+
+        Args:
+            name: Name of the property, like virtual_machines.
+
+        Returns:
+            ResourceBase object
+        """
+        client = self.__resource_clients.get(name)
+        if client is None:
+            module_name, class_name = RESOURCE_CLIENTS[name]
+            client_class = getattr(importlib.import_module(module_name), class_name)
+            with self.__resource_clients_lock:
+                client = self.__resource_clients.setdefault(name, client_class(self.__connection))
+
+        return client
+
     @property
     def virtual_machines(self):
         """
@@ -115,9 +354,7 @@ class OVC(object):
         Returns:
             VirtualMachines object
         """
-        if not self.__virtual_machines:
-            self.__virtual_machines = VirtualMachines(self.__connection)
-        return self.__virtual_machines
+        return self.__get_resource_client('virtual_machines')
 
     @property
     def policies(self):
@@ -127,9 +364,7 @@ class OVC(object):
         Returns:
             Policies object
         """
-        if not self.__policies:
-            self.__policies = Policies(self.__connection)
-        return self.__policies
+        return self.__get_resource_client('policies')
 
     @property
     def datastores(self):
@@ -139,9 +374,7 @@ class OVC(object):
         Returns:
             Datastores object
         """
-        if not self.__datastores:
-            self.__datastores = Datastores(self.__connection)
-        return self.__datastores
+        return self.__get_resource_client('datastores')
 
     @property
     def omnistack_clusters(self):
@@ -151,9 +384,7 @@ class OVC(object):
         Returns:
             OmnistackClusters object
         """
-        if not self.__omnistack_clusters:
-            self.__omnistack_clusters = OmnistackClusters(self.__connection)
-        return self.__omnistack_clusters
+        return self.__get_resource_client('omnistack_clusters')
 
     @property
     def backups(self):
@@ -163,9 +394,7 @@ class OVC(object):
         Returns:
             Backups object
         """
-        if not self.__backups:
-            self.__backups = Backups(self.__connection)
-        return self.__backups
+        return self.__get_resource_client('backups')
 
     @property
     def hosts(self):
@@ -175,9 +404,7 @@ class OVC(object):
         Returns:
             Hosts object
         """
-        if not self.__hosts:
-            self.__hosts = Hosts(self.__connection)
-        return self.__hosts
+        return self.__get_resource_client('hosts')
 
     @property
     def cluster_groups(self):
@@ -187,9 +414,7 @@ class OVC(object):
         Returns:
             ClusterGroups object
         """
-        if not self.__cluster_groups:
-            self.__cluster_groups = ClusterGroups(self.__connection)
-        return self.__cluster_groups
+        return self.__get_resource_client('cluster_groups')
 
     @property
     def external_stores(self):
@@ -199,9 +424,7 @@ class OVC(object):
         Returns:
             External stores object
         """
-        if not self.__external_stores:
-            self.__external_stores = ExternalStores(self.__connection)
-        return self.__external_stores
+        return self.__get_resource_client('external_stores')
 
     @property
     def certificates(self):
@@ -211,6 +434,4 @@ class OVC(object):
         Returns:
             Certificates object
         """
-        if not self.__certificates:
-            self.__certificates = Certificates(self.__connection)
-        return self.__certificates
+        return self.__get_resource_client('certificates')
@@ -14,11 +14,10 @@
 # limitations under the License.
 ##
 
+from simplivity import batching
+from simplivity.resources.resource import Resource
 from simplivity.resources.resource import ResourceBase
-from simplivity.resources import datastores
-from simplivity.resources import virtual_machines
-from simplivity.resources import omnistack_clusters
-from simplivity.resources import cluster_groups
+from simplivity.resources.resource import is_resource
 
 URL = '/backups'
 DATA_FIELD = 'backups'
@@ -32,7 +31,7 @@ class Backups(ResourceBase):
 
     def get_all(self, pagination=False, page_size=0, limit=500, offset=0,
                 sort=None, order='descending', filters=None, fields=None,
-                case_sensitive=True):
+                case_sensitive=True, stream=False):
         """Gets all backups.
 
         Args:
@@ -102,6 +101,8 @@ class Backups(ResourceBase):
                 completed, expressed in ISO-8601 form, based on Coordinated Universal Time (UTC)
               sent_completion_after: The earliest time after the replication of backups to return was
                 completed, expressed in ISO-8601 form, based on Coordinated Universal Time (UTC)
+            stream: Set to True to get a generator which yields the resources as they are
+              parsed from the response. Ignored if pagination is on.
 
         Returns:
           list: list of resources
@@ -116,7 +117,8 @@ class Backups(ResourceBase):
                                     order=order,
                                     filters=filters,
                                     fields=fields,
-                                    case_sensitive=case_sensitive)
+                                    case_sensitive=case_sensitive,
+                                    stream=stream)
 
     def get_by_data(self, data):
         """Gets Backup object from backup data.
@@ -161,14 +163,16 @@ class Backups(ResourceBase):
         Returns:
           list: List of backup objects.
         """
+        from simplivity.resources import cluster_groups
+
         method_url = "{}/set_retention".format(URL)
         backup_ids = [backup.data["id"] for backup in backups]
         data = {"backup_id": backup_ids, "retention": retention, "force": force}
 
         if cluster_group:
-            if not isinstance(cluster_group, cluster_groups.ClusterGroup):
+            if not is_resource(cluster_group, cluster_groups.ClusterGroup):
                 # if passed by cluster_group name
-                cluster_group = cluster_groups.ClusterGroups(self._connection).get_by_name(cluster_group)
+                cluster_group = cluster_groups.ClusterGroups(self._connection).get_reference_by_name(cluster_group)
             cluster_group_id = cluster_group.data["id"]
             data["cluster_group_id"] = cluster_group_id
         self._client.do_post(method_url, data, timeout)
@@ -177,25 +181,28 @@ class Backups(ResourceBase):
         return self.get_all(filters={'id': comma_separated_ids})
 
 
-class Backup(object):
+class Backup(Resource):
     """Implements features available for a single Backup resources."""
-
-    def __init__(self, connection, resource_client, data):
-        self.data = data
-        self._connection = connection
-        self._client = resource_client
-        self._backups = Backups(self._connection)
+    __slots__ = ()
 
     def __refresh(self):
         """Updates the backup data."""
-        resource_object = self._backups.get_by_id(self.data["id"])
+        resource_object = self._resources.get_by_id(self.data["id"])
         self.data = resource_object.data
 
     def reload_data(self):
         self.__refresh()
 
     def delete(self, timeout=-1):
-        """Deletes the specified backup"""
+        """Deletes the specified backup.
+
+        Returns:
+            concurrent.futures.Future: Future of the deletion if a batch is open on the connection, else None.
+        """
+        batch = batching.get_batch(self._connection)
+        if batch is not None:
+            return batch.delete_backup(self)
+
         resource_uri = "{}/{}".format(URL, self.data["id"])
         self._client.do_delete(resource_uri, timeout, None)
         self.data = None
@@ -214,15 +221,18 @@ class Backup(object):
               Virtual machine object
 
         """
+        from simplivity.resources import datastores
+        from simplivity.resources import virtual_machines
+
         resource_uri = "{}/{}/restore".format(URL, self.data["id"])
         data = {}
         if not restore_original:
             data["virtual_machine_name"] = virtual_machine_name
             if datastore:
-                if not isinstance(datastore, datastores.Datastore):
+                if not is_resource(datastore, datastores.Datastore):
                     # if passed by datastore name
                     datastore_obj = datastores.Datastores(self._connection)
-                    datastore = datastore_obj.get_by_name(datastore)
+                    datastore = datastore_obj.get_reference_by_name(datastore)
                 data["datastore_id"] = datastore.data["id"]
 
         flags = {"restore_original": restore_original}
@@ -277,21 +287,22 @@ class Backup(object):
         Returns:
             object: Returns the new backup object.
         """
+        from simplivity.resources import omnistack_clusters
 
         resource_uri = "{}/{}/copy".format(URL, self.data["id"])
         data = {}
         if cluster:
-            if not isinstance(cluster, omnistack_clusters.OmnistackCluster):
+            if not is_resource(cluster, omnistack_clusters.OmnistackCluster):
                 # if passed name of the cluster
                 clusters_obj = omnistack_clusters.OmnistackClusters(self._connection)
-                cluster = clusters_obj.get_by_name(cluster)
+                cluster = clusters_obj.get_reference_by_name(cluster)
             data['destination_id'] = cluster.data['id']
 
         if external_store_name:
             data['external_store_name'] = external_store_name
 
         affected_object = self._client.do_post(resource_uri, data, timeout)[0]
-        return self._backups.get_by_id(affected_object["object_id"])
+        return self._resources.get_by_id(affected_object["object_id"])
 
     def get_virtual_disk_partitions(self, virtual_disk):
         """Retrieves partition information for the virtual disk associated with the backup
@@ -13,6 +13,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 ##
+from simplivity.resources.resource import Resource
 from simplivity.resources.resource import ResourceBase
 from simplivity import exceptions
 
@@ -66,10 +67,6 @@ class Certificates(ResourceBase):
         return self._client.do_post(URL, data, timeout)
 
 
-class Certificate(object):
+class Certificate(Resource):
     """Implements features available for single Certificate resource."""
-
-    def __init__(self, connection, resource_client, data):
-        self.data = data
-        self._connection = connection
-        self._client = resource_client
+    __slots__ = ()
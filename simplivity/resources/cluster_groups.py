@@ -14,6 +14,7 @@
 # limitations under the License.
 ##
 
+from simplivity.resources.resource import Resource
 from simplivity.resources.resource import ResourceBase
 
 URL = '/cluster_groups'
@@ -28,7 +29,7 @@ class ClusterGroups(ResourceBase):
 
     def get_all(self, pagination=False, page_size=0, limit=500, offset=0,
                 sort=None, order='descending', filters=None, fields=None,
-                case_sensitive=True, show_optional_fields=False):
+                case_sensitive=True, show_optional_fields=False, stream=False):
         """Gets all cluster groups.
 
         Args:
@@ -45,6 +46,8 @@ class ClusterGroups(ResourceBase):
               name: The name of the omnistack_clusters to return
                 Accepts: Single value, comma-separated list, pattern using one or more
                 asterisk characters as a wildcard
+            stream: Set to True to get a generator which yields the resources as they are
+              parsed from the response. Ignored if pagination is on.
 
         Returns:
           list: list of OmnistackCluster
@@ -60,7 +63,8 @@ class ClusterGroups(ResourceBase):
                                     filters=filters,
                                     fields=fields,
                                     case_sensitive=case_sensitive,
-                                    show_optional_fields=show_optional_fields)
+                                    show_optional_fields=show_optional_fields,
+                                    stream=stream)
 
     def get_by_data(self, data):
         """Gets ClusterGroup object from data.
@@ -75,20 +79,15 @@ class ClusterGroups(ResourceBase):
         return ClusterGroup(self._connection, self._client, data)
 
 
-class ClusterGroup(object):
+class ClusterGroup(Resource):
     """Implements features available for single cluster group resource."""
+    __slots__ = ()
 
     OBJECT_TYPE = 'cluster_group'
 
-    def __init__(self, connection, resource_client, data):
-        self.data = data
-        self._connection = connection
-        self._client = resource_client
-        self._cluster_groups = ClusterGroups(self._connection)
-
     def __refresh(self):
         """Updates the cluster_group data."""
-        resource_object = self._cluster_groups.get_by_id(self.data["id"])
+        resource_object = self._resources.get_by_id(self.data["id"])
         self.data = resource_object.data
 
     def reload_data(self):
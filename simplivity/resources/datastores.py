@@ -14,9 +14,9 @@
 # limitations under the License.
 ##
 
+from simplivity.resources.resource import Resource
 from simplivity.resources.resource import ResourceBase
-from simplivity.resources import omnistack_clusters
-from simplivity.resources import policies
+from simplivity.resources.resource import is_resource
 
 URL = '/datastores'
 DATA_FIELD = 'datastores'
@@ -30,7 +30,7 @@ class Datastores(ResourceBase):
 
     def get_all(self, pagination=False, page_size=0, limit=500, offset=0,
                 sort=None, order='descending', filters=None, fields=None,
-                case_sensitive=True, show_optional_fields=False):
+                case_sensitive=True, show_optional_fields=False, stream=False):
         """Gets all datastores.
 
         Args:
@@ -79,6 +79,8 @@ class Datastores(ResourceBase):
                 Accepts: Single value, comma-separated list
               mount_directory: A comma-separated list of fields to include in the returned objects
                 Default: Returns all fields
+            stream: Set to True to get a generator which yields the resources as they are
+              parsed from the response. Ignored if pagination is on.
 
         Returns:
           list: list of Datastore objects.
@@ -94,7 +96,8 @@ class Datastores(ResourceBase):
                                     filters=filters,
                                     fields=fields,
                                     case_sensitive=case_sensitive,
-                                    show_optional_fields=show_optional_fields)
+                                    show_optional_fields=show_optional_fields,
+                                    stream=stream)
 
     def get_by_data(self, data):
         """Gets Datastore object from data.
@@ -120,17 +123,20 @@ class Datastores(ResourceBase):
         Returns:
             object: Datastore object.
         """
+        from simplivity.resources import omnistack_clusters
+        from simplivity.resources import policies
+
         method_url = "{}".format(URL)
 
-        if not isinstance(cluster, omnistack_clusters.OmnistackCluster):
+        if not is_resource(cluster, omnistack_clusters.OmnistackCluster):
             # if passed name of the cluster
             clusters_obj = omnistack_clusters.OmnistackClusters(self._connection)
-            cluster = clusters_obj.get_by_name(cluster)
+            cluster = clusters_obj.get_reference_by_name(cluster)
 
-        if not isinstance(policy, policies.Policy):
+        if not is_resource(policy, policies.Policy):
             # if passed name of the policy
             policies_obj = policies.Policies(self._connection)
-            policy = policies_obj.get_by_name(policy)
+            policy = policies_obj.get_reference_by_name(policy)
 
         data = {
             "name": datastore_name,
@@ -143,13 +149,9 @@ class Datastores(ResourceBase):
         return self.get_by_id(out[0]["object_id"])
 
 
-class Datastore(object):
+class Datastore(Resource):
     """Implements features available for single Datastore resource."""
-
-    def __init__(self, connection, resource_client, data):
-        self.data = data
-        self._connection = connection
-        self._client = resource_client
+    __slots__ = ()
 
     def __refresh(self):
         """Updates the datastore data."""
@@ -179,8 +181,7 @@ class Datastore(object):
         resource_uri = "{}/{}/resize".format(URL, self.data["id"])
         data = {"size": size}
         out = self._client.do_post(resource_uri, data, timeout, None)
-        datastore = Datastores(self._connection)
-        datastore_obj = datastore.get_by_id(out[0]["object_id"])
+        datastore_obj = self._resources.get_by_id(out[0]["object_id"])
         self.data = datastore_obj.data
 
         return self
@@ -196,10 +197,12 @@ class Datastore(object):
             object: Datastore object.
 
         """
+        from simplivity.resources import policies
+
         resource_uri = "{}/{}/set_policy".format(URL, self.data["id"])
-        if not isinstance(policy, policies.Policy):
+        if not is_resource(policy, policies.Policy):
             # if passed name of the policy
-            policy = policies.Policies(self._connection).get_by_name(policy)
+            policy = policies.Policies(self._connection).get_reference_by_name(policy)
 
         data = {"policy_id": policy.data['id']}
         self._client.do_post(resource_uri, data, timeout, None)
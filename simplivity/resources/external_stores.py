@@ -14,8 +14,9 @@
 # limitations under the License.
 ##
 
+from simplivity.resources.resource import Resource
 from simplivity.resources.resource import ResourceBase
-from simplivity.resources import omnistack_clusters
+from simplivity.resources.resource import is_resource
 
 URL = '/external_stores'
 DATA_FIELD = 'external_stores'
@@ -29,7 +30,7 @@ class ExternalStores(ResourceBase):
 
     def get_all(self, pagination=False, page_size=0, limit=500, offset=0,
                 sort=None, order='descending', filters=None, fields=None,
-                case_sensitive=True):
+                case_sensitive=True, stream=False):
         """
         Get all external stores
         Args:
@@ -50,6 +51,8 @@ class ExternalStores(ResourceBase):
                     Accepts: Single value, comma-separated list, pattern using one or more asterisk characters as a wildcard
                 type: The type of external store
                     Default: StoreOnceOnPrem
+            stream: Set to True to get a generator which yields the resources as they are
+              parsed from the response. Ignored if pagination is on.
 
         Returns:
             list: list of resources
@@ -64,7 +67,8 @@ class ExternalStores(ResourceBase):
                                     order=order,
                                     filters=filters,
                                     fields=fields,
-                                    case_sensitive=case_sensitive)
+                                    case_sensitive=case_sensitive,
+                                    stream=stream)
 
     def get_by_data(self, data):
         """Gets ExternalStore object from data.
@@ -95,15 +99,16 @@ class ExternalStores(ResourceBase):
         Returns:
             object: External store object.
         """
+        from simplivity.resources import omnistack_clusters
 
         data = {'management_ip': management_ip, 'management_port': management_port, 'name': name,
                 'username': username, 'password': password, 'storage_port': storage_port,
                 'type': external_store_type}
 
-        if not isinstance(cluster, omnistack_clusters.OmnistackCluster):
+        if not is_resource(cluster, omnistack_clusters.OmnistackCluster):
             # if passed name of the cluster
             clusters_obj = omnistack_clusters.OmnistackClusters(self._connection)
-            cluster = clusters_obj.get_by_name(cluster)
+            cluster = clusters_obj.get_reference_by_name(cluster)
 
         data['omnistack_cluster_id'] = cluster.data['id']
         custom_headers = {'Content-type': 'application/vnd.simplivity.v1.11+json'}
@@ -134,13 +139,9 @@ class ExternalStores(ResourceBase):
         self._client.do_post(resource_uri, data, timeout, custom_headers)
 
 
-class ExternalStore(object):
+class ExternalStore(Resource):
     """Implements features available for a single External store resources."""
-
-    def __init__(self, connection, resource_client, data):
-        self.data = data
-        self._connection = connection
-        self._client = resource_client
+    __slots__ = ()
 
     def unregister_external_store(self, cluster, timeout=-1):
         """ Removes the external store as a backup destination for the cluster.
@@ -152,13 +153,14 @@ class ExternalStore(object):
         Returns:
             None
         """
+        from simplivity.resources import omnistack_clusters
 
         resource_uri = "{}/unregister".format(URL)
         data = {'name': self.data["name"]}
-        if not isinstance(cluster, omnistack_clusters.OmnistackCluster):
+        if not is_resource(cluster, omnistack_clusters.OmnistackCluster):
             # if passed name of the cluster
             clusters_obj = omnistack_clusters.OmnistackClusters(self._connection)
-            cluster = clusters_obj.get_by_name(cluster)
+            cluster = clusters_obj.get_reference_by_name(cluster)
 
         data['omnistack_cluster_id'] = cluster.data['id']
         custom_headers = {'Content-type': 'application/vnd.simplivity.v1.15+json'}
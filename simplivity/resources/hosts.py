@@ -14,6 +14,7 @@
 # limitations under the License.
 ##
 
+from simplivity.resources.resource import Resource
 from simplivity.resources.resource import ResourceBase
 
 URL = '/hosts'
@@ -28,7 +29,7 @@ class Hosts(ResourceBase):
 
     def get_all(self, pagination=False, page_size=0, limit=500, offset=0,
                 sort=None, order='descending', filters=None, fields=None,
-                case_sensitive=True, show_optional_fields=False):
+                case_sensitive=True, show_optional_fields=False, stream=False):
         """Gets all hosts.
 
         Args:
@@ -115,6 +116,8 @@ class Hosts(ResourceBase):
                 Valid values:
                 True: The current HPE OmniStack software for the host can roll back to the previous version.
                 False: The current HPE OmniStack software for the host cannot roll back to the previous version.
+            stream: Set to True to get a generator which yields the resources as they are
+              parsed from the response. Ignored if pagination is on.
 
         Returns:
           list: list of Host objects
@@ -130,7 +133,8 @@ class Hosts(ResourceBase):
                                     filters=filters,
                                     fields=fields,
                                     case_sensitive=case_sensitive,
-                                    show_optional_fields=show_optional_fields)
+                                    show_optional_fields=show_optional_fields,
+                                    stream=stream)
 
     def get_by_data(self, data):
         """Gets Host object from host data.
@@ -144,17 +148,12 @@ class Hosts(ResourceBase):
         return Host(self._connection, self._client, data)
 
 
-class Host(object):
+class Host(Resource):
     """Implements features available for single Host resource."""
+    __slots__ = ()
 
     OBJECT_TYPE = 'host'
 
-    def __init__(self, connection, resource_client, data):
-        self.data = data
-        self._connection = connection
-        self._client = resource_client
-        self._hosts = Hosts(self._connection)
-
     def __refresh(self):
         """Updates the host data."""
         resource_uri = "{}/{}".format(URL, self.data["id"])
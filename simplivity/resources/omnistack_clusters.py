@@ -14,6 +14,7 @@
 # limitations under the License.
 ##
 
+from simplivity.resources.resource import Resource
 from simplivity.resources.resource import ResourceBase
 
 URL = '/omnistack_clusters'
@@ -28,7 +29,7 @@ class OmnistackClusters(ResourceBase):
 
     def get_all(self, pagination=False, page_size=0, limit=500, offset=0,
                 sort=None, order='descending', filters=None, fields=None,
-                case_sensitive=True, show_optional_fields=False):
+                case_sensitive=True, show_optional_fields=False, stream=False):
         """Gets all omnistack clusters.
 
         Args:
@@ -73,6 +74,8 @@ class OmnistackClusters(ResourceBase):
                   in arbiter_address
                 False: Only returns omnistack_clusters not connected to Arbiters that you identified
                   in arbiter_address
+            stream: Set to True to get a generator which yields the resources as they are
+              parsed from the response. Ignored if pagination is on.
 
         Returns:
           list: list of OmnistackCluster
@@ -88,7 +91,8 @@ class OmnistackClusters(ResourceBase):
                                     filters=filters,
                                     fields=fields,
                                     case_sensitive=case_sensitive,
-                                    show_optional_fields=show_optional_fields)
+                                    show_optional_fields=show_optional_fields,
+                                    stream=stream)
 
     def get_by_data(self, data):
         """Gets OmnistackCluster object from data.
@@ -109,17 +113,12 @@ class OmnistackClusters(ResourceBase):
         return self._client.do_get(resource_uri)
 
 
-class OmnistackCluster(object):
+class OmnistackCluster(Resource):
     """Implements features available for single OmniStack cluster resource."""
+    __slots__ = ()
 
     OBJECT_TYPE = "omnistack_cluster"
 
-    def __init__(self, connection, resource_client, data):
-        self.data = data
-        self._connection = connection
-        self._client = resource_client
-        self._clusters = OmnistackClusters(self._connection)
-
     def get_connected_clusters(self):
         """Retrieves directly connected omnistack_clusters.
 
@@ -129,7 +128,7 @@ class OmnistackCluster(object):
         method_url = "{}/{}/connected_clusters".format(URL, self.data["id"])
         connected_clusters = self._client.do_get(method_url).get("omnistack_clusters", [])
 
-        clusters = [self._clusters.get_by_id(cluster["id"]) for cluster in connected_clusters]
+        clusters = [self._resources.get_by_id(cluster["id"]) for cluster in connected_clusters]
 
         return clusters
 
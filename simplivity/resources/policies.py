@@ -16,16 +16,25 @@
 
 """Implements operations for policies."""
 
+from simplivity.resources.resource import Resource
 from simplivity.resources.resource import ResourceBase
-from simplivity.resources import virtual_machines
-from simplivity.resources.hosts import Host
-from simplivity.resources.omnistack_clusters import OmnistackCluster
-from simplivity.resources.cluster_groups import ClusterGroup
+from simplivity.resources.resource import build_resource_objects
 
 URL = '/policies'
 DATA_FIELD = 'policies'
 
 
+def _get_target_classes():
+    """Gets the classes of the objects whose policy-based backups can be suspended or resumed.
+
+    The resource modules are imported on first use, not when this module is imported.
+    """
+    from simplivity.resources.hosts import Host
+    from simplivity.resources.omnistack_clusters import OmnistackCluster
+    from simplivity.resources.cluster_groups import ClusterGroup
+    return Host, OmnistackCluster, ClusterGroup
+
+
 class Policies(ResourceBase):
     """Implements features for SimpliVity Policy resources."""
 
@@ -34,7 +43,7 @@ class Policies(ResourceBase):
 
     def get_all(self, pagination=False, page_size=0, limit=500, offset=0,
                 sort=None, order='descending', filters=None, fields=None,
-                case_sensitive=True):
+                case_sensitive=True, stream=False):
         """Gets all policies.
 
         Args:
@@ -50,6 +59,8 @@ class Policies(ResourceBase):
                 Accepts: Single value, comma-separated list
               name:The name of the policy
                 Accepts: Single value, comma-separated list
+            stream: Set to True to get a generator which yields the resources as they are
+              parsed from the response. Ignored if pagination is on.
         Returns:
           list: list of Policy objects
         """
@@ -63,7 +74,8 @@ class Policies(ResourceBase):
                                     order=order,
                                     filters=filters,
                                     fields=fields,
-                                    case_sensitive=case_sensitive)
+                                    case_sensitive=case_sensitive,
+                                    stream=stream)
 
     def get_by_data(self, data):
         """Gets Policy object from data.
@@ -103,7 +115,7 @@ class Policies(ResourceBase):
                 None
         """
         data = {}
-        if isinstance(target, (Host, OmnistackCluster, ClusterGroup)):
+        if isinstance(target, _get_target_classes()):
             data["target_object_type"] = target.OBJECT_TYPE
             data["target_object_id"] = target.data["id"]
         else:
@@ -123,7 +135,7 @@ class Policies(ResourceBase):
                 None
         """
         data = {}
-        if isinstance(target, (Host, OmnistackCluster, ClusterGroup)):
+        if isinstance(target, _get_target_classes()):
             data["target_object_type"] = target.OBJECT_TYPE
             data["target_object_id"] = target.data["id"]
         else:
@@ -133,16 +145,12 @@ class Policies(ResourceBase):
         self._client.do_post(method_url, data, timeout)
 
 
-class Policy(object):
+class Policy(Resource):
     """Implements features available for a single Policy resource."""
+    __slots__ = ()
 
     OBJECT_TYPE = "policy"
 
-    def __init__(self, connection, resource_client, data):
-        self.data = data
-        self._connection = connection
-        self._client = resource_client
-
     def __refresh(self):
         """Updates the policy data."""
         resource_uri = "{}/{}".format(URL, self.data["id"])
@@ -157,16 +165,14 @@ class Policy(object):
         Returns:
           list: List of vms.
         """
+        from simplivity.resources import virtual_machines
+
         method_url = "{}/{}/virtual_machines".format(URL, self.data["id"])
         vm_data = self._client.do_get(method_url).get("virtual_machines", [])
 
         vms_obj = virtual_machines.VirtualMachines(self._connection)
-        vms = []
-
-        for vm in vm_data:
-            vms.append(vms_obj.get_by_data(vm))
 
-        return vms
+        return build_resource_objects(vms_obj, vm_data)
 
     def delete(self, timeout=-1):
         """Removes a policy"""
@@ -17,13 +17,31 @@
 """Implements helper methods for the resource classes."""
 
 import logging
+import threading
+import weakref
+from urllib.parse import quote
 from urllib.parse import urlencode
 
 from simplivity.resources.tasks import Task
 from simplivity import exceptions
+from simplivity import tracing
+from simplivity.instrumentation import get_path_template
 
 PAGE_SIZE_NOT_SET = "page_size param should be set when pagination is on"
 PAGINATION_NO_MORE_PAGES = "No more pages"
+WRONG_REFERENCE_TYPE = "Reference to a {} was passed where a {} is expected"
+
+# Fields requested when only a reference to a resource is needed
+REFERENCE_FIELDS = "id,name"
+
+# Maximum number of resources loaded with one request
+LOAD_BATCH_SIZE = 100
+
+# Maximum length of the encoded id filter of a load request, keeps the URL under the usual 8 KB limits
+LOAD_QUERY_MAX_LENGTH = 4096
+
+# Number of resources per request when the snapshot of a type is loaded in the inventory store
+INVENTORY_PAGE_SIZE = 5000
 
 logger = logging.getLogger(__name__)
 
@@ -43,6 +61,235 @@ def build_uri_with_query_string(base_url, kwargs):
     return "{}{}{}".format(base_url, symbol, query_string)
 
 
+def build_resource_objects(resource_obj, data_list, fields=None, show_optional_fields=False):
+    """Creates resource objects from the resources data.
+
+    If the data was fetched with a fields projection, the data of the objects
+    is wrapped in PartialData, so the missing fields are loaded on first access.
+
+    Args:
+        resource_obj: Resource class object used to create the objects.
+        data_list: List of resources data.
+        fields: Comma-separated list of fields the data was fetched with.
+        show_optional_fields: True if the data was fetched with the optional fields.
+
+    Returns:
+        list: List of resource objects.
+    """
+    return list(iter_resource_objects(resource_obj, data_list, fields, show_optional_fields))
+
+
+def iter_resource_objects(resource_obj, data_iter, fields=None, show_optional_fields=False):
+    """Yields resource objects created from the resources data.
+
+    Args:
+        resource_obj: Resource class object used to create the objects.
+        data_iter: Iterable of resources data.
+        fields: Comma-separated list of fields the data was fetched with.
+        show_optional_fields: True if the data was fetched with the optional fields.
+
+    Yields:
+        Resource objects.
+    """
+    loader = PartialDataLoader(resource_obj, show_optional_fields) if fields else None
+    identity_map = getattr(getattr(resource_obj, '_connection', None), 'identity_map', None)
+
+    for data in data_iter:
+        if identity_map is not None and isinstance(data, dict) and "id" in data:
+            yield identity_map.get_or_create(type(resource_obj), data["id"],
+                                             lambda: _create_resource_object(resource_obj, data, loader),
+                                             lambda resource: _update_resource_object(resource, data, loader))
+        else:
+            yield _create_resource_object(resource_obj, data, loader)
+
+
+def _create_resource_object(resource_obj, data, loader):
+    if loader and isinstance(data, dict) and "id" in data:
+        data = loader.add(data)
+
+    return resource_obj.get_by_data(data)
+
+
+def _update_resource_object(resource, data, loader):
+    """Updates the data of a live resource object with the data of a listing."""
+    if loader and isinstance(resource.data, dict):
+        # Only the fetched fields are refreshed, the fields already known are kept and not loaded again
+        dict.update(resource.data, data)
+    else:
+        resource.data = loader.add(data) if loader else data
+
+
+class PartialData(dict):
+    """Resource data holding a subset of the resource fields.
+
+    Reading a field which was not fetched, testing a key with `in`, iterating,
+    listing the keys, values or items and copying the data load the full data
+    of the resource first. The truth value, the comparison with == and the repr
+    use the fetched fields only, without loading.
+    """
+    __slots__ = ('_loader', '__weakref__')
+
+    def __init__(self, data=None, loader=None):
+        """Initializes with the partial data and the loader of the full data."""
+        super(PartialData, self).__init__(data or {})
+        self._loader = loader
+
+    @property
+    def is_partial(self):
+        """True if the full data of the resource is not loaded yet."""
+        return self._loader is not None
+
+    def load(self):
+        """Loads the full data of the resource."""
+        if self._loader is not None:
+            self._loader.load(self)
+
+    def __missing__(self, key):
+        if self._loader is None:
+            raise KeyError(key)
+
+        self.load()
+        if not dict.__contains__(self, key):
+            # The field does not exist, or the data was not loaded
+            raise KeyError(key)
+
+        return dict.__getitem__(self, key)
+
+    def __contains__(self, key):
+        if not dict.__contains__(self, key):
+            self.load()
+
+        return dict.__contains__(self, key)
+
+    def get(self, key, default=None):
+        if key not in self:
+            return default
+
+        return dict.__getitem__(self, key)
+
+    def __iter__(self):
+        self.load()
+        return dict.__iter__(self)
+
+    def __len__(self):
+        self.load()
+        return dict.__len__(self)
+
+    def __bool__(self):
+        return dict.__len__(self) > 0
+
+    def keys(self):
+        self.load()
+        return dict.keys(self)
+
+    def values(self):
+        self.load()
+        return dict.values(self)
+
+    def items(self):
+        self.load()
+        return dict.items(self)
+
+    def copy(self):
+        """Returns a dict with the full data of the resource."""
+        self.load()
+        return dict(dict.items(self))
+
+
+class PartialDataLoader(object):
+    """Loads the full data of partially fetched resources.
+
+    All the resources of one listing share a loader, so the full data of all of
+    them is loaded together when the first missing field is accessed. The
+    loader references the data weakly, so the resources of a streamed listing
+    are not kept in memory once the caller drops them.
+    """
+
+    def __init__(self, resource_obj, show_optional_fields=False):
+        """Initializes with the resource class object."""
+        self._resource_obj = resource_obj
+        self._show_optional_fields = show_optional_fields
+        self._pending = []
+        self._prune_size = LOAD_BATCH_SIZE
+        self._lock = threading.Lock()
+
+    def add(self, data):
+        """Wraps resource data to be loaded by this loader.
+
+        Args:
+            data: Partial data of a resource.
+
+        Returns:
+            PartialData: Wrapped data.
+        """
+        partial = PartialData(data, self)
+
+        with self._lock:
+            self._pending.append(weakref.ref(partial))
+            if len(self._pending) >= self._prune_size:
+                # Drops the references to the data released by the caller
+                self._pending = [ref for ref in self._pending if ref() is not None]
+                self._prune_size = max(LOAD_BATCH_SIZE, 2 * len(self._pending))
+
+        return partial
+
+    def load(self, partial):
+        """Loads the full data of all the pending resources.
+
+        Args:
+            partial: PartialData object that requested the load.
+        """
+        with self._lock:
+            if partial._loader is None:
+                # Already loaded by another thread
+                return
+
+            pending = [ref() for ref in self._pending]
+            self._pending = []
+            try:
+                for batch in self.__batches([data for data in pending if data is not None]):
+                    self.__load_batch(batch)
+            except Exception:
+                # The resources not loaded stay pending, a later access loads them again
+                self._pending = [weakref.ref(data) for data in pending
+                                 if data is not None and data._loader is not None] + self._pending
+                raise
+
+    @staticmethod
+    def __batches(pending):
+        """Splits the resources in batches whose id filter fits in a URL."""
+        batch = []
+        length = 0
+        for partial in pending:
+            # Encoded id followed by an encoded comma
+            id_length = len(quote(dict.__getitem__(partial, "id"), safe='')) + 3
+            if batch and (len(batch) == LOAD_BATCH_SIZE or length + id_length > LOAD_QUERY_MAX_LENGTH):
+                yield batch
+                batch = []
+                length = 0
+
+            batch.append(partial)
+            length += id_length
+
+        if batch:
+            yield batch
+
+    def __load_batch(self, batch):
+        """Loads the full data of a batch of resources with one request."""
+        ids = [dict.__getitem__(partial, "id") for partial in batch]
+        kwargs = {"filters": {"id": ",".join(ids)}, "limit": len(ids)}
+        if self._show_optional_fields:
+            kwargs["show_optional_fields"] = self._show_optional_fields
+
+        full_data = {}
+        for resource in self._resource_obj.get_all(**kwargs):
+            full_data[dict.__getitem__(resource.data, "id")] = resource.data
+
+        for partial, resource_id in zip(batch, ids):
+            partial.update(full_data.get(resource_id, {}))
+            partial._loader = None
+
+
 class Pagination(object):
     """Implements pagination features for get_all method."""
 
@@ -126,25 +373,35 @@ class Pagination(object):
         if not len(resources):
             raise exceptions.HPESimpliVityException(PAGINATION_NO_MORE_PAGES)
 
-        for index, resource in enumerate(resources):
-            resources[index] = self._resource_obj.get_by_data(resource)
+        resources = build_resource_objects(self._resource_obj, resources,
+                                           self._params.get("fields"),
+                                           self._params.get("show_optional_fields", False))
 
         self.data["resources"] = resources
         self.data["size"] = len(resources)
 
 
 class ResourceClient(object):
-    """Implements helper methods for resource classes."""
+    """Implements helper methods for resource classes.
+
+    A ResourceClient keeps no state of its own besides the connection, so it can
+    be used by several threads at once.
+    """
 
     def __init__(self, connection, resource_obj):
         """Initializes with a resource object and connection."""
         self._resource_obj = resource_obj
         self._connection = connection
 
+    @property
+    def resource_obj(self):
+        """Gets the resource class object served by this client."""
+        return self._resource_obj
+
     def get_all(self, resource_url, members_field=None, pagination=False,
                 page_size=0, limit=500, offset=0, sort=None, order='descending',
                 filters=None, fields=None, case_sensitive=True,
-                show_optional_fields=False):
+                show_optional_fields=False, stream=False):
         """Gets all resources.
 
         Args:
@@ -157,13 +414,17 @@ class ResourceClient(object):
             order: The sort order preference, valid values: ascending or descending
             filters: Dictionary of filers, example: {'name': 'name'}
             fields: A comma-separated list of fields to include in the returned objects. Default: all
+              The fields which are not included are loaded on first access.
             case_sensitive: An indicator that specifies if the filter and sort results
               use a case-sensitive or insensitive manner. Default: True
             show_optional_fields: An indicator to show or not show the ha_status,
               ha_resynchronization_progress, hypervisor_virtual_machine_power_state, and hypervisor_is_template
+            stream: Set to True to parse the response incrementally and get a generator
+              which yields the resources as they are parsed. Ignored if pagination is on.
 
         Returns:
-             list/pagination object: Pagination object if pagination is on or list of resources
+             list/pagination object/generator: Pagination object if pagination is on,
+               generator of resources if stream is on or list of resources
         """
         query_params = {"limit": limit,
                         "offset": offset,
@@ -181,37 +442,139 @@ class ResourceClient(object):
         query_params["sort"] = sort if sort else 'name'
         query_params["case"] = "sensitive" if case_sensitive else "insensitive"
 
+        store = getattr(self._connection, 'inventory_store', None)
+        if store is not None and not pagination and store.can_serve(members_field, filters or {}):
+            data_list = self.__get_from_inventory(store, resource_url, members_field, query_params)
+            if fields:
+                names = fields.split(',')
+                data_list = [{name: data[name] for name in names if name in data} for data in data_list]
+            if stream:
+                return iter_resource_objects(self._resource_obj, iter(data_list), fields, show_optional_fields)
+            return build_resource_objects(self._resource_obj, data_list, fields, show_optional_fields)
+
         if pagination:
             if not page_size:
                 raise exceptions.HPESimpliVityException(PAGE_SIZE_NOT_SET)
 
             out = Pagination(self._connection, resource_url, self._resource_obj,
                              query_params, members_field, page_size)
+        elif stream:
+            url = build_uri_with_query_string(resource_url, query_params)
+            members = self._connection.get_members(url, members_field)
+            out = iter_resource_objects(self._resource_obj, members, fields, show_optional_fields)
         else:
             url = build_uri_with_query_string(resource_url, query_params)
             response = self._connection.get(url)
             data_list = response.get(members_field, [])
-            out = []
-            for data in data_list:
-                out.append(self._resource_obj.get_by_data(data))
+            out = build_resource_objects(self._resource_obj, data_list, fields, show_optional_fields)
 
         return out
 
-    def task_affected_resources(self, task, timeout):
+    def __get_from_inventory(self, store, resource_url, members_field, query_params):
+        """Lists resources from the inventory store, loading the snapshot of the type if it is stale.
+
+        Returns:
+            list: Data of the resources.
+        """
+        from simplivity.inventory_store import INDEXED_FILTERS
+        from simplivity.inventory_store import OPTIONAL_FIELDS
+        from simplivity.inventory_store import OPTIONAL_FIELDS_TYPES
+
+        if not store.is_fresh(members_field):
+            self.__load_inventory(store, resource_url, members_field)
+
+        filters = {field: value for field, value in query_params.items() if field in INDEXED_FILTERS}
+        data_list = store.select(members_field, filters, query_params["sort"], query_params["order"],
+                                 query_params["case"] == "sensitive", query_params["offset"], query_params["limit"])
+
+        # The resource may have been created after the snapshot, the OVC is asked
+        if not data_list and ('id' in filters or 'name' in filters):
+            data_list = self.__look_up_missing(store, resource_url, members_field, query_params)
+
+        # The snapshot holds the optional fields, they are served only to the callers asking for them
+        if members_field in OPTIONAL_FIELDS_TYPES and not query_params.get("show_optional_fields"):
+            data_list = [{name: value for name, value in data.items() if name not in OPTIONAL_FIELDS}
+                         for data in data_list]
+
+        return data_list
+
+    def __look_up_missing(self, store, resource_url, members_field, query_params):
+        """Lists resources missing from the store from the OVC, with all the fields of the snapshot, and adds them."""
+        from simplivity.inventory_store import OPTIONAL_FIELDS_TYPES
+
+        query_params = dict(query_params)
+        query_params.pop("fields", None)
+        if members_field in OPTIONAL_FIELDS_TYPES:
+            query_params["show_optional_fields"] = True
+
+        url = build_uri_with_query_string(resource_url, query_params)
+        data_list = self._connection.get(url).get(members_field, [])
+        store.upsert(members_field, data_list)
+        return data_list
+
+    def __load_inventory(self, store, resource_url, members_field):
+        """Lists all the resources of a type from the OVC and replaces their snapshot in the store."""
+        from simplivity.inventory_store import OPTIONAL_FIELDS_TYPES
+
+        query_params = {"limit": INVENTORY_PAGE_SIZE, "sort": "id", "order": "ascending"}
+        if members_field in OPTIONAL_FIELDS_TYPES:
+            query_params["show_optional_fields"] = True
+
+        data_list = []
+        while True:
+            query_params["offset"] = len(data_list)
+            url = build_uri_with_query_string(resource_url, query_params)
+            page = self._connection.get(url).get(members_field, [])
+            data_list.extend(page)
+            if len(page) < INVENTORY_PAGE_SIZE:
+                break
+
+        store.replace(members_field, data_list)
+
+    def task_affected_resources(self, task, timeout, operation=None):
         """Handles asynchronous calls.
 
         Args:
             task: Task data retunrned by a REST call
             timeout: Timeout value
+            operation: Request which started the task, like POST /virtual_machines/{id}/clone
 
         Returns:
             list: Returns ids of affected resources
         """
-        task_obj = Task(self._connection, task)
+        task_obj = Task(self._connection, task, operation)
         affected_resources = task_obj.wait_for_task(timeout)
 
+        store = getattr(self._connection, 'inventory_store', None)
+        if store is not None:
+            self.__update_inventory(store, affected_resources)
+
         return affected_resources
 
+    def __update_inventory(self, store, affected_resources):
+        """Gets the resources affected by a task from the OVC and writes them through to the inventory store.
+
+        The resources of a type are fetched with one request, the ones the OVC no longer lists are removed.
+        """
+        from simplivity.inventory_store import OBJECT_TYPES
+        from simplivity.inventory_store import OPTIONAL_FIELDS_TYPES
+
+        resource_ids = {}
+        for affected in affected_resources or ():
+            resource_type = OBJECT_TYPES.get(affected.get('object_type'))
+            if resource_type and store.is_stored(resource_type) and affected.get('object_id'):
+                resource_ids.setdefault(resource_type, []).append(affected['object_id'])
+
+        for resource_type, ids in resource_ids.items():
+            query_params = {"id": ",".join(ids), "limit": len(ids)}
+            if resource_type in OPTIONAL_FIELDS_TYPES:
+                query_params["show_optional_fields"] = True
+
+            url = build_uri_with_query_string("/" + resource_type, query_params)
+            data_list = self._connection.get(url).get(resource_type, [])
+            store.upsert(resource_type, data_list)
+            store.remove(resource_type, set(ids) - set(data["id"] for data in data_list))
+
     def do_get(self, uri, filters=None):
         """Makes get requests
 
@@ -248,7 +611,7 @@ class ResourceClient(object):
         if not task:
             return entity
 
-        return self.task_affected_resources(task, timeout)
+        return self.task_affected_resources(task, timeout, "POST " + get_path_template(uri))
 
     def do_put(self, uri, data, timeout, custom_headers=None):
         """Makes put requests.
@@ -267,7 +630,7 @@ class ResourceClient(object):
         if not task:
             return body
 
-        return self.task_affected_resources(task, timeout)
+        return self.task_affected_resources(task, timeout, "PUT " + get_path_template(uri))
 
     def do_delete(self, uri, timeout, custom_headers=None):
         """Makes delete requests.
@@ -285,17 +648,87 @@ class ResourceClient(object):
         if not task:
             return body
 
-        return self.task_affected_resources(task, timeout)
+        return self.task_affected_resources(task, timeout, "DELETE " + get_path_template(uri))
+
+
+class ResourceReference(object):
+    """Lightweight reference to a resource.
+
+    Holds only the id and the name of the resource, it can be passed wherever
+    a resource object of the same class is accepted to identify the resource.
+    """
+
+    def __init__(self, data, resource_cls):
+        """Initializes with the resource data (id and name) and the class of the resource objects."""
+        self.data = data
+        self.resource_cls = resource_cls
+
+
+def is_resource(obj, resource_cls):
+    """Checks if an object is a resource object or a reference of the resource class.
+
+    Args:
+        obj: Object passed to identify a resource (resource object, reference or name).
+        resource_cls: Class of the expected resource objects.
+
+    Returns:
+        boolean: True if the object identifies the resource, False if it is a name.
+
+    Raises:
+        HPESimpliVityException: if the object is a reference to another type of resource.
+    """
+    if isinstance(obj, ResourceReference):
+        if not issubclass(obj.resource_cls, resource_cls):
+            message = WRONG_REFERENCE_TYPE.format(obj.resource_cls.__name__, resource_cls.__name__)
+            raise exceptions.HPESimpliVityException(message)
+        return True
+
+    return isinstance(obj, resource_cls)
+
+
+class Resource(object):
+    """Implements base class for single resource objects.
+
+    The objects share the connection and the resource client of the resource
+    class object which created them, so creating an object allocates nothing
+    but the object itself. The objects can be referenced weakly, for the
+    identity map of the client. The public methods of the subclasses are traced
+    when the tracing is enabled.
+    """
+    __slots__ = ('data', '_connection', '_client', '__weakref__')
+
+    def __init__(self, connection, resource_client, data):
+        """Initializes with connection object, resource client and resource data."""
+        self.data = data
+        self._connection = connection
+        self._client = resource_client
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        tracing.trace_methods(cls)
+
+    @property
+    def _resources(self):
+        """Gets the resource class object which created this object."""
+        return self._client.resource_obj
 
 
 class ResourceBase(object):
-    """Implements base class for resource classes."""
+    """Implements base class for resource classes.
+
+    The public methods of the subclasses are traced when the tracing is enabled.
+    """
 
     def __init__(self, connection):
         """Initializes class with connection and resource client."""
         self._connection = connection
         self._client = ResourceClient(self._connection, self)
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        tracing.trace_methods(cls)
+
+    @tracing.traced
     def get_by_name(self, name):
         """Gets resource by name.
 
@@ -314,6 +747,7 @@ class ResourceBase(object):
 
         return resources[0]
 
+    @tracing.traced
     def get_by_id(self, resource_id):
         """Gets resource by id.
 
@@ -331,3 +765,47 @@ class ResourceBase(object):
             raise exceptions.HPESimpliVityResourceNotFound("Resource not found with the id {}".format(resource_id))
 
         return resources[0]
+
+    @tracing.traced
+    def get_reference_by_name(self, name):
+        """Gets a lightweight reference to the resource by name.
+
+        Only the id and the name of the resource are requested from the OVC.
+
+        Args:
+            name: Name of the resource
+
+        Returns:
+            ResourceReference: Reference to the resource
+
+        Raises:
+            HPESimpliVityResourceNotFound: if resource doesn't exist with the name passed.
+        """
+        resources = self.get_all(filters={'name': name}, fields=REFERENCE_FIELDS, limit=1)
+        if not len(resources):
+            raise exceptions.HPESimpliVityResourceNotFound("Resource not found with the name {}".format(name))
+
+        # Keeps only the fetched fields, a reference never loads the full data
+        return ResourceReference(dict(dict.items(resources[0].data)), type(resources[0]))
+
+    @tracing.traced
+    def get_reference_by_id(self, resource_id):
+        """Gets a lightweight reference to the resource by id.
+
+        Only the id and the name of the resource are requested from the OVC.
+
+        Args:
+            resource_id: ID of the resource
+
+        Returns:
+            ResourceReference: Reference to the resource
+
+        Raises:
+            HPESimpliVityResourceNotFound: if resource doesn't exist with the id passed.
+        """
+        resources = self.get_all(filters={'id': resource_id}, fields=REFERENCE_FIELDS, limit=1)
+        if not len(resources):
+            raise exceptions.HPESimpliVityResourceNotFound("Resource not found with the id {}".format(resource_id))
+
+        # Keeps only the fetched fields, a reference never loads the full data
+        return ResourceReference(dict(dict.items(resources[0].data)), type(resources[0]))
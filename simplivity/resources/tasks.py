@@ -20,6 +20,8 @@ import logging
 import time
 
 from simplivity import exceptions
+from simplivity import task_stats
+from simplivity import tracing
 
 TASK_PENDING_STATES = ['IN_PROGRESS']
 TASK_ERROR_STATES = ['ERROR']
@@ -35,11 +37,33 @@ URL = '/tasks'
 logger = logging.getLogger(__name__)
 
 
+class TaskResult(list):
+    """Affected resources of a task, with the polling statistics of the wait.
+
+    Attributes:
+        stats: TaskWaitStats object.
+    """
+
+    def __init__(self, affected_resources, stats):
+        super(TaskResult, self).__init__(affected_resources)
+        self.stats = stats
+
+
 class Task(object):
-    """Implements operations for task."""
+    """Implements operations for task.
 
-    def __init__(self, con, data):
-        """Initializes Task with connection and data."""
+    Each wait records its polling statistics in the stats attribute and in the
+    task_stats collector of the connection.
+    """
+
+    def __init__(self, con, data, operation=None):
+        """Initializes Task with connection and data.
+
+        Args:
+            con: Connection object.
+            data: Task data.
+            operation: Request which started the task, like POST /virtual_machines/{id}/clone.
+        """
         self._connection = con
         if 'task' in data:
             self.data = data["task"]
@@ -47,6 +71,9 @@ class Task(object):
             self.data = data
 
         self.state = self.data["state"]
+        self.operation = operation
+        self.poll_count = 0
+        self.stats = None
 
     @staticmethod
     def get_current_seconds():
@@ -60,21 +87,42 @@ class Task(object):
             timeout: timeout in seconds
 
         Returns:
-            list: Affected resources when creating or updating
+            TaskResult: Affected resources when creating or updating, with the polling statistics
         """
-        self.__wait_task_completion(timeout)
+        self.stats = stats = task_stats.TaskWaitStats(self.data.get('id'), self.operation)
+        started = time.monotonic()
+        first_poll = self.poll_count
 
-        self.update_status()
+        with tracing.span('Task.wait_for_task', {tracing.TASK_ID: stats.task_id}) as span:
+            try:
+                self.__wait_task_completion(timeout, stats)
+
+                self.update_status()
+
+                logger.debug("Waiting for task. Task state: " + str(self.data.get('state')))
+
+                return TaskResult(self.get_affected_resources(), stats)
+            finally:
+                stats.state = self.data.get('state')
+                stats.polls = self.poll_count - first_poll
+                stats.wait_time = time.monotonic() - started
+                span.set_attribute(tracing.TASK_POLL_COUNT, stats.polls)
+                self.__record_stats(stats)
 
-        logger.debug("Waiting for task. Task state: " + str(self.data.get('state')))
+    def __record_stats(self, stats):
+        """Adds the statistics of the wait to the collector of the connection."""
+        logger.debug("Task %s of %s: %s", stats.task_id, stats.operation, stats)
 
-        return self.get_affected_resources()
+        collector = getattr(self._connection, 'task_stats', None)
+        if collector is not None:
+            collector.add(stats)
 
-    def __wait_task_completion(self, timeout):
+    def __wait_task_completion(self, timeout, stats):
         """Wait for task completion.
 
         Args:
           timeout: timeout in seconds
+          stats: TaskWaitStats object recording the sleeps and the completion
         """
         if not self.data:
             raise exceptions.HPESimpliVityUnknownType(MSG_INVALID_TASK)
@@ -94,9 +142,24 @@ class Task(object):
             logger.debug("Waiting for task. Task state: " + str(self.data.get('state')))
 
             time.sleep(i)
+            stats.sleep_time += i
             if (timeout != UNLIMITED_TIMEOUT) and (start_time + timeout < self.get_current_seconds()):
                 raise exceptions.HPESimpliVityTimeout(MSG_TIMEOUT % str(timeout))
 
+        self.__record_completion(stats, i)
+
+    def __record_completion(self, stats, last_sleep):
+        """Records the task duration and the time slept after the completion, from the task times."""
+        observed_at = time.time()
+
+        task_start = task_stats.parse_task_time(self.data.get('start_time'))
+        if task_start is not None:
+            stats.task_duration = max(0.0, observed_at - task_start)
+
+        task_end = task_stats.parse_task_time(self.data.get('end_time'))
+        if task_end is not None:
+            stats.wasted_sleep = min(float(last_sleep), max(0.0, observed_at - task_end))
+
     def is_task_running(self):
         """
         Check if a task is running according to: TASK_PENDING_STATES
@@ -118,6 +181,7 @@ class Task(object):
             task dict
         """
         task = self._connection.get("{}/{}".format(URL, self.data["id"]))
+        self.poll_count += 1
         self.data = task["task"]
         self.state = self.data["state"]
 
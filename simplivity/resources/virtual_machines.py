@@ -16,11 +16,10 @@
 
 """Implements features available for Virtual Machine resource."""
 
+from simplivity import batching
+from simplivity.resources.resource import Resource
 from simplivity.resources.resource import ResourceBase
-from simplivity.resources import datastores
-from simplivity.resources import omnistack_clusters
-from simplivity.resources import backups
-from simplivity.resources import policies
+from simplivity.resources.resource import is_resource
 
 URL = '/virtual_machines'
 DATA_FIELD = 'virtual_machines'
@@ -35,7 +34,7 @@ class VirtualMachines(ResourceBase):
 
     def get_all(self, pagination=False, page_size=0, limit=500, offset=0,
                 sort=None, order='descending', filters=None, fields=None,
-                case_sensitive=True, show_optional_fields=False):
+                case_sensitive=True, show_optional_fields=False, stream=False):
         """Get all vms.
 
         Args:
@@ -104,6 +103,8 @@ class VirtualMachines(ResourceBase):
             show_optional_fields: An indicator to show or not show the ha_status,
               ha_resynchronization_progress, hypervisor_virtual_machine_power_state,
               and hypervisor_is_template.
+            stream: Set to True to get a generator which yields the resources as they are
+              parsed from the response. Ignored if pagination is on.
 
         Returns:
             list/pagination object: list of VirtualMachine objects/ Pagination object
@@ -119,7 +120,8 @@ class VirtualMachines(ResourceBase):
                                     filters=filters,
                                     fields=fields,
                                     case_sensitive=case_sensitive,
-                                    show_optional_fields=show_optional_fields)
+                                    show_optional_fields=show_optional_fields,
+                                    stream=stream)
 
     def get_by_data(self, data):
         """Gets VM object from VM data.
@@ -164,13 +166,15 @@ class VirtualMachines(ResourceBase):
         Returns:
             dict: Returns the dictionary for impact report of policy applied on virtual machines.
         """
+        from simplivity.resources import policies
+
         method_url = "{}/policy_impact_report/apply_policy".format(URL)
         custom_headers = {'Content-type': 'application/vnd.simplivity.v1.14+json'}
 
         vm_ids = [vm.data["id"] for vm in vms]
-        if not isinstance(policy, policies.Policy):
+        if not is_resource(policy, policies.Policy):
             # if passed name of the policy
-            policy = policies.Policies(self._connection).get_by_name(policy)
+            policy = policies.Policies(self._connection).get_reference_by_name(policy)
 
         data = {"virtual_machine_id": vm_ids,
                 "policy_id": policy.data["id"]}
@@ -178,15 +182,9 @@ class VirtualMachines(ResourceBase):
         return self._client.do_post(method_url, data, timeout, custom_headers)
 
 
-class VirtualMachine(object):
+class VirtualMachine(Resource):
     """Implements features available for a single VM."""
-
-    def __init__(self, connection, resource_client, data):
-        """Initialize with connection object, resource client and VM data"""
-        self.data = data
-        self._connection = connection
-        self._client = resource_client
-        self._vms = VirtualMachines(self._connection)
+    __slots__ = ()
 
     def __refresh(self):
         """Updates the VM data."""
@@ -215,7 +213,7 @@ class VirtualMachine(object):
                 "app_consistent": app_consistent}
 
         out = self._client.do_post(method_url, data, timeout, None)
-        vm = self._vms.get_by_id(out[0]["object_id"])
+        vm = self._resources.get_by_id(out[0]["object_id"])
 
         if datastore:
             return vm.move(new_vm_name, datastore)
@@ -233,18 +231,20 @@ class VirtualMachine(object):
         Returns:
             VirtualMachine object: Object of the moved VM
         """
+        from simplivity.resources import datastores
+
         method_url = "{}/{}/move".format(URL, self.data["id"])
 
-        if not isinstance(datastore, datastores.Datastore):
+        if not is_resource(datastore, datastores.Datastore):
             # if passed name of the datastore
             datastores_obj = datastores.Datastores(self._connection)
-            datastore = datastores_obj.get_by_name(datastore)
+            datastore = datastores_obj.get_reference_by_name(datastore)
 
         data = {"virtual_machine_name": new_vm_name,
                 "destination_datastore_id": datastore.data["id"]}
 
         affected_object = self._client.do_post(method_url, data, timeout, None)[0]
-        vm_obj = self._vms.get_by_id(affected_object["object_id"])
+        vm_obj = self._resources.get_by_id(affected_object["object_id"])
         self.data = vm_obj.data
 
         return self
@@ -265,12 +265,15 @@ class VirtualMachine(object):
         Returns:
             Backup object: object of the newly created backup.
         """
+        from simplivity.resources import omnistack_clusters
+        from simplivity.resources import backups
+
         method_url = "{}/{}/backup".format(URL, self.data["id"])
 
-        if cluster and not isinstance(cluster, omnistack_clusters.OmnistackCluster):
+        if cluster and not is_resource(cluster, omnistack_clusters.OmnistackCluster):
             # if passed name of the omnistack cluster
             clusters_obj = omnistack_clusters.OmnistackClusters(self._connection)
-            cluster = clusters_obj.get_by_name(cluster)
+            cluster = clusters_obj.get_reference_by_name(cluster)
 
         data = {"backup_name": backup_name,
                 "app_consistent": app_consistent,
@@ -289,12 +292,15 @@ class VirtualMachine(object):
         Returns:
             list: List of backup objects
         """
+        from simplivity.resources import backups
+
         method_url = "{}/{}/backups".format(URL, self.data["id"])
         backup_data = self._client.do_get(method_url).get("backups", [])
 
+        backups_obj = backups.Backups(self._connection)
         backup_objs = []
         for backup in backup_data:
-            obj = backups.Backups(self._connection).get_by_id(backup["id"])
+            obj = backups_obj.get_by_id(backup["id"])
             backup_objs.append(obj)
 
         return backup_objs
@@ -336,13 +342,19 @@ class VirtualMachine(object):
             timeout: Time out for the request in seconds.
 
         Returns:
-            self: Returns the same object.
+            self: Returns the same object, or its Future if a batch is open on the connection.
         """
+        from simplivity.resources import policies
+
         method_url = "{}/{}/set_policy".format(URL, self.data["id"])
 
-        if not isinstance(policy, policies.Policy):
+        if not is_resource(policy, policies.Policy):
             # if passed name of the policy
-            policy = policies.Policies(self._connection).get_by_name(policy)
+            policy = policies.Policies(self._connection).get_reference_by_name(policy)
+
+        batch = batching.get_batch(self._connection)
+        if batch is not None:
+            return batch.set_policy(self, policy)
 
         data = {"policy_id": policy.data["id"]}
 
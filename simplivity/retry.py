@@ -0,0 +1,158 @@
+###
+# (C) Copyright [2019] Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##
+
+"""Implements the retry policy of the requests failed with transient errors."""
+
+import http.client
+import random
+import socket
+import ssl
+import threading
+
+from simplivity import exceptions
+
+# Response statuses retried by default
+RETRY_STATUSES = (429, 502, 503, 504)
+
+# Methods retried by default, POST requests are retried only if the policy allows it
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS')
+
+# Network errors considered transient
+TRANSIENT_ERRORS = (socket.timeout, ConnectionError, ssl.SSLError, http.client.HTTPException)
+
+
+class RetryStats(object):
+    """Counters of a retry policy.
+
+    Attributes:
+        retries (int): Requests sent again.
+        recovered (int): Requests which succeeded after at least one retry.
+        exhausted (int): Requests given up because of the attempts or elapsed time limits.
+    """
+
+    def __init__(self):
+        self.retries = 0
+        self.recovered = 0
+        self.exhausted = 0
+        self._lock = threading.Lock()
+
+    def add(self, counter):
+        """Increments a counter by one."""
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def __repr__(self):
+        return "RetryStats(retries={}, recovered={}, exhausted={})".format(self.retries, self.recovered,
+                                                                           self.exhausted)
+
+
+class RetryPolicy(object):
+    """Retries requests failed with network errors or transient server errors.
+
+    The delay before an attempt grows exponentially from `backoff` up to
+    `max_backoff` seconds, with full jitter so that concurrent clients do not
+    retry in step. A Retry-After header sent by the OVC is honored.
+    """
+
+    def __init__(self, max_attempts=3, backoff=0.5, max_backoff=30, max_elapsed=120, jitter=True,
+                 retry_statuses=RETRY_STATUSES, retry_post=False):
+        """Initializes the policy.
+
+        Args:
+            max_attempts: Maximum number of attempts of a request, including the first one.
+            backoff: Delay in seconds before the first retry.
+            max_backoff: Maximum delay in seconds between two attempts.
+            max_elapsed: Maximum time in seconds spent on a request, retries included.
+            jitter: True to randomize the delays.
+            retry_statuses: Response statuses which are retried.
+            retry_post: True to retry POST requests too. A POST request may run an
+              operation twice if the OVC received it before the error.
+        """
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_elapsed = max_elapsed
+        self.jitter = jitter
+        self.retry_statuses = tuple(retry_statuses)
+        self.retry_post = retry_post
+        self.stats = RetryStats()
+
+    def is_retryable_method(self, method):
+        """Checks if the requests of a method can be sent again."""
+        return method in IDEMPOTENT_METHODS or (self.retry_post and method == 'POST')
+
+    @staticmethod
+    def is_transient_error(error):
+        """Checks if an exception is a transient network error.
+
+        HPESimpliVityException errors are checked by the network error they were raised from.
+        """
+        if isinstance(error, exceptions.HPESimpliVityException):
+            error = error.__cause__
+
+        if isinstance(error, getattr(ssl, 'SSLCertVerificationError', ())):
+            return False
+
+        return isinstance(error, TRANSIENT_ERRORS)
+
+    def get_delay(self, method, attempt, elapsed, resp=None, error=None):
+        """Gets the delay before the next attempt of a request.
+
+        Args:
+            method: HTTP method of the request.
+            attempt: Number of attempts made.
+            elapsed: Seconds elapsed since the first attempt.
+            resp: HTTP response object of the attempt, None if it failed with an error.
+            error: Exception raised by the attempt.
+
+        Returns:
+            float: Seconds to wait before the next attempt, None if the request is not retried.
+        """
+        if error is not None:
+            retryable = self.is_transient_error(error)
+        else:
+            retryable = resp.status in self.retry_statuses
+
+        if not retryable or not self.is_retryable_method(method):
+            if attempt > 1 and error is None and resp.status < 400:
+                self.stats.add('recovered')
+            return None
+
+        delay = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+
+        retry_after = self.__get_retry_after(resp)
+        if retry_after is not None:
+            delay = min(self.max_backoff, max(delay, retry_after))
+
+        if attempt >= self.max_attempts or elapsed + delay > self.max_elapsed:
+            self.stats.add('exhausted')
+            return None
+
+        self.stats.add('retries')
+        return delay
+
+    @staticmethod
+    def __get_retry_after(resp):
+        """Gets the delay in seconds of the Retry-After header."""
+        if resp is None:
+            return None
+
+        try:
+            return max(0.0, float(resp.getheader('Retry-After')))
+        except (TypeError, ValueError):
+            return None
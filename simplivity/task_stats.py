@@ -0,0 +1,182 @@
+###
+# (C) Copyright [2019] Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##
+
+"""Statistics of the task waits, to tune the polling and find the slow operations."""
+
+import datetime
+import threading
+
+# Formats of the start_time and end_time fields of a task
+TIME_FORMATS = ('%Y-%m-%dT%H:%M:%S.%fZ', '%Y-%m-%dT%H:%M:%SZ')
+
+
+def parse_task_time(value):
+    """Parses a UTC time of a task.
+
+    Args:
+        value: Time like 2019-05-29T07:15:34Z.
+
+    Returns:
+        float: Seconds since the epoch, None if the time is missing or unknown.
+    """
+    if not isinstance(value, str):
+        return None
+
+    for time_format in TIME_FORMATS:
+        try:
+            parsed = datetime.datetime.strptime(value, time_format)
+        except ValueError:
+            continue
+        return parsed.replace(tzinfo=datetime.timezone.utc).timestamp()
+
+    return None
+
+
+class TaskWaitStats(object):
+    """Polling statistics of one task wait.
+
+    Attributes:
+        task_id: Id of the task.
+        operation: Request which started the task, like POST /virtual_machines/{id}/clone.
+        state: Last state of the task.
+        polls (int): Requests made to get the state of the task.
+        wait_time (float): Seconds spent waiting for the task.
+        sleep_time (float): Seconds slept between the polls.
+        task_duration (float): Seconds from the start of the task on the OVC to the
+          poll which saw it complete, None if the OVC did not send the start time.
+        wasted_sleep (float): Seconds slept after the task completed, None if the
+          OVC did not send the end time.
+    """
+
+    def __init__(self, task_id, operation=None):
+        self.task_id = task_id
+        self.operation = operation
+        self.state = None
+        self.polls = 0
+        self.wait_time = 0.0
+        self.sleep_time = 0.0
+        self.task_duration = None
+        self.wasted_sleep = None
+
+    def __repr__(self):
+        return ("TaskWaitStats(task_id={!r}, operation={!r}, state={!r}, polls={}, wait_time={:.2f}, "
+                "task_duration={!r}, wasted_sleep={!r})").format(self.task_id, self.operation, self.state,
+                                                                 self.polls, self.wait_time,
+                                                                 self.task_duration, self.wasted_sleep)
+
+
+class OperationTaskStats(object):
+    """Aggregated statistics of the task waits of one operation.
+
+    Attributes:
+        count (int): Task waits.
+        failed (int): Tasks which did not complete successfully.
+        polls (int): Polls of all the waits.
+        wait_time (float): Seconds spent in all the waits.
+        max_wait_time (float): Longest wait in seconds.
+        sleep_time (float): Seconds slept in all the waits.
+        wasted_sleep (float): Seconds slept after the tasks completed.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.failed = 0
+        self.polls = 0
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.sleep_time = 0.0
+        self.wasted_sleep = 0.0
+        self._task_duration = 0.0
+        self._timed_tasks = 0
+
+    def add(self, stats):
+        """Adds the statistics of a task wait."""
+        self.count += 1
+        if stats.state != 'COMPLETED':
+            self.failed += 1
+        self.polls += stats.polls
+        self.wait_time += stats.wait_time
+        self.max_wait_time = max(self.max_wait_time, stats.wait_time)
+        self.sleep_time += stats.sleep_time
+        if stats.wasted_sleep is not None:
+            self.wasted_sleep += stats.wasted_sleep
+        if stats.task_duration is not None:
+            self._task_duration += stats.task_duration
+            self._timed_tasks += 1
+
+    @property
+    def mean_polls(self):
+        """Mean number of polls per wait."""
+        return self.polls / self.count if self.count else 0.0
+
+    @property
+    def mean_wait_time(self):
+        """Mean seconds per wait."""
+        return self.wait_time / self.count if self.count else 0.0
+
+    @property
+    def mean_task_duration(self):
+        """Mean seconds from the start of the tasks on the OVC to their observed completion, None if unknown."""
+        return self._task_duration / self._timed_tasks if self._timed_tasks else None
+
+    def __repr__(self):
+        return "OperationTaskStats(count={}, failed={}, mean_polls={:.1f}, mean_wait_time={:.2f}, " \
+               "wasted_sleep={:.2f})".format(self.count, self.failed, self.mean_polls, self.mean_wait_time,
+                                             self.wasted_sleep)
+
+
+class TaskStatsCollector(object):
+    """Aggregates the statistics of the task waits by operation."""
+
+    def __init__(self):
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def add(self, stats):
+        """Adds the statistics of a task wait.
+
+        Args:
+            stats: TaskWaitStats object.
+        """
+        with self._lock:
+            operation_stats = self._stats.get(stats.operation)
+            if operation_stats is None:
+                operation_stats = self._stats[stats.operation] = OperationTaskStats()
+            operation_stats.add(stats)
+
+    def get(self, operation):
+        """Gets the statistics of an operation.
+
+        Returns:
+            OperationTaskStats object, None if no task of the operation was waited for.
+        """
+        return self._stats.get(operation)
+
+    def summary(self):
+        """Gets the statistics of all the operations.
+
+        Returns:
+            dict: OperationTaskStats objects keyed by operation, longest mean wait first.
+        """
+        with self._lock:
+            items = sorted(self._stats.items(), key=lambda item: item[1].mean_wait_time, reverse=True)
+
+        return dict(items)
+
+    def reset(self):
+        """Removes the statistics."""
+        with self._lock:
+            self._stats.clear()
@@ -0,0 +1,495 @@
+###
+# (C) Copyright [2019] Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##
+
+"""Local HTTPS server standing in for an OVC, to test and benchmark the SDK offline.
+
+The server serves the OAuth login, the listings with the limit, offset, sort and
+filter semantics of the OVC, the single resources, and the mutations, which
+start tasks completing after a configurable duration. Latency and server errors
+can be injected.
+"""
+
+import collections
+import fnmatch
+import gzip
+import http.server
+import json
+import logging
+import os
+import random
+import socketserver
+import ssl
+import threading
+import time
+import urllib.parse
+import uuid
+
+from simplivity.instrumentation import get_path_template
+from simplivity.testing import inventory
+
+# Self-signed certificate of the server, for 127.0.0.1 and localhost
+CERT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fake_ovc.crt')
+KEY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fake_ovc.key')
+
+USERNAME = 'administrator@vsphere.local'
+PASSWORD = 'password'
+
+# Collections served, keyed by URL path, with the field of the single resource responses
+COLLECTIONS = {
+    'virtual_machines': 'virtual_machine',
+    'backups': 'backup',
+    'datastores': 'datastore',
+    'omnistack_clusters': 'omnistack_cluster',
+    'hosts': 'host',
+    'policies': 'policy',
+    'cluster_groups': 'cluster_group',
+    'external_stores': 'external_store',
+    'security/certificates': 'certificate',
+}
+
+# Actions creating a resource, with the collection of the new resource and the field of its name
+CREATING_ACTIONS = {
+    ('virtual_machines', 'clone'): ('virtual_machines', 'virtual_machine_name'),
+    ('virtual_machines', 'backup'): ('backups', 'backup_name'),
+    ('backups', 'restore'): ('virtual_machines', 'virtual_machine_name'),
+    ('backups', 'copy'): ('backups', None),
+}
+
+# Request fields holding the new name of a resource
+NAME_FIELDS = ('name', 'virtual_machine_name', 'backup_name', 'datastore_name', 'policy_name')
+
+# Query parameters which are not filters
+LISTING_PARAMETERS = ('limit', 'offset', 'sort', 'order', 'case', 'fields', 'show_optional_fields')
+
+DEFAULT_LIMIT = 500
+
+TIME_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+logger = logging.getLogger(__name__)
+
+
+class FakeOVC(object):
+    """Fake OVC serving a synthetic federation over HTTPS on the loopback interface.
+
+    Use it as a context manager, or call start and stop:
+
+        with FakeOVC(inventory.build_federation(virtual_machines=1000), latency=0.01) as fake:
+            ovc = OVC(fake.config())
+
+    Attributes:
+        requests (collections.Counter): Requests served, keyed by method and path template.
+    """
+
+    def __init__(self, federation=None, latency=0.0, latency_jitter=0.0, error_rate=0.0, error_status=503,
+                 task_duration=0.0, token_lifetime=3600, seed=None):
+        """Initializes the server, it listens only once started.
+
+        Args:
+            federation: Inventory built by inventory.build_federation. Default: a small federation.
+            latency: Seconds added to each response.
+            latency_jitter: Maximum random seconds added to the latency.
+            error_rate: Fraction of the authenticated requests answered with the error status.
+            error_status: HTTP status of the injected errors.
+            task_duration: Seconds before a task completes.
+            token_lifetime: Lifetime in seconds of the access tokens (expires_in).
+            seed: Seed of the random latency and errors.
+        """
+        federation = federation if federation is not None else inventory.build_federation()
+        self._data = {path: collections.OrderedDict((self.__key(item), dict(item))
+                                                    for item in federation.get(path.split('/')[-1], []))
+                      for path in COLLECTIONS}
+        self._tasks = {}
+        self._tokens = set()
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+        self._server = None
+        self._thread = None
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.task_duration = task_duration
+        self.token_lifetime = token_lifetime
+        self.requests = collections.Counter()
+
+    @staticmethod
+    def __key(item):
+        # External stores are identified by their name
+        return item.get('id') or item['name']
+
+    @property
+    def address(self):
+        """Address of the server, host:port, passed as the OVC IP address to the SDK."""
+        host, port = self._server.server_address[:2]
+        return "{}:{}".format(host, port)
+
+    def config(self, **kwargs):
+        """Gets an OVC client configuration for the server.
+
+        Args:
+            kwargs: Other configuration keys.
+
+        Returns:
+            dict: Configuration with the address, the certificate and the credentials.
+        """
+        config = {"ip": self.address, "ssl_certificate": CERT_FILE,
+                  "credentials": {"username": USERNAME, "password": PASSWORD}}
+        config.update(kwargs)
+        return config
+
+    def start(self):
+        """Starts serving on a free port of 127.0.0.1 in a background thread."""
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(CERT_FILE, KEY_FILE)
+        self._server = _HTTPSServer(('127.0.0.1', 0), _RequestHandler, context, self)
+        self._thread = threading.Thread(target=self._server.serve_forever, name='fake-ovc', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stops the server."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def get_resources(self, collection):
+        """Gets a copy of the resources of a collection, like virtual_machines."""
+        with self._lock:
+            return [dict(item) for item in self._data[collection].values()]
+
+    def handle(self, method, url, headers, body):
+        """Handles a request.
+
+        Args:
+            method: HTTP method.
+            url: Request URL, starting with /api.
+            headers: Request headers.
+            body: Request body (bytes).
+
+        Returns:
+            tuple: Tuple with two members (HTTP status and the response document).
+        """
+        split_url = urllib.parse.urlsplit(url)
+        path = split_url.path[len('/api'):] if split_url.path.startswith('/api/') else None
+        if path is None:
+            return 404, {"message": "Not found"}
+
+        self.requests["{} {}".format(method, get_path_template(path))] += 1
+
+        if path == '/oauth/token' and method == 'POST':
+            return self.__login(urllib.parse.parse_qs(body.decode('utf-8')))
+
+        if not self.__is_authorized(headers.get('Authorization', '')):
+            return 401, {"error": "invalid_token", "error_description": "Invalid access token"}
+
+        injected_error = self.__inject_faults()
+        if injected_error:
+            return injected_error
+
+        query = {key: values[-1] for key, values in urllib.parse.parse_qs(split_url.query).items()}
+        if method == 'GET':
+            return self.__get(path.strip('/'), query)
+
+        data = json.loads(body.decode('utf-8')) if body else {}
+        with self._lock:
+            return self.__mutate(method, path.strip('/'), query, data if isinstance(data, dict) else {})
+
+    def __login(self, form):
+        if form.get('username') != [USERNAME] or form.get('password') != [PASSWORD]:
+            return 400, {"error": "invalid_grant", "error_description": "Bad credentials"}
+
+        token = str(uuid.uuid4())
+        with self._lock:
+            self._tokens.add(token)
+
+        return 200, {"access_token": token, "token_type": "bearer", "expires_in": self.token_lifetime,
+                     "scope": "read write"}
+
+    def __is_authorized(self, authorization):
+        scheme, _, token = authorization.partition(' ')
+        return scheme == 'Bearer' and token in self._tokens
+
+    def revoke_tokens(self):
+        """Invalidates the access tokens, the next requests get an invalid token error."""
+        with self._lock:
+            self._tokens.clear()
+
+    def __inject_faults(self):
+        with self._lock:
+            delay = self.latency + self._random.uniform(0, self.latency_jitter) if self.latency_jitter else self.latency
+            failed = self.error_rate and self._random.random() < self.error_rate
+
+        if delay:
+            time.sleep(delay)
+
+        if failed:
+            return self.error_status, {"message": "Injected error"}
+
+        return None
+
+    def __get(self, path, query):
+        collection, resource_id, action = self.__split_path(path)
+        if collection == 'tasks' and resource_id:
+            with self._lock:
+                task = self._tasks.get(resource_id)
+                return (200, {"task": self.__task_view(task)}) if task else self.__not_found(path)
+
+        if collection not in COLLECTIONS:
+            return self.__not_found(path)
+
+        with self._lock:
+            if resource_id is None:
+                return 200, self.__list(collection, query)
+
+            item = self._data[collection].get(resource_id)
+            if item is None:
+                return self.__not_found(path)
+
+            if action is None:
+                return 200, {COLLECTIONS[collection]: dict(item)}
+
+            if collection == 'virtual_machines' and action == 'backups':
+                backups = [dict(backup) for backup in self._data['backups'].values()
+                           if backup.get('virtual_machine_id') == resource_id]
+                return 200, {"backups": backups}
+
+        # The other reports of a resource are not simulated
+        return 200, {}
+
+    @staticmethod
+    def __split_path(path):
+        """Splits a path into the collection, the resource id and the action."""
+        for collection in (COLLECTIONS if path.startswith('security/') else ()):
+            if path == collection or path.startswith(collection + '/'):
+                rest = path[len(collection) + 1:].split('/', 1) if path != collection else []
+                break
+        else:
+            collection, _, rest = path.partition('/')
+            rest = rest.split('/', 1) if rest else []
+
+        resource_id = rest[0] if rest else None
+        action = rest[1] if len(rest) > 1 else None
+        return collection, resource_id, action
+
+    @staticmethod
+    def __not_found(path):
+        return 404, {"message": "Resource not found: {}".format(path)}
+
+    def __list(self, collection, query):
+        """Lists a collection with the filter, sort, offset, limit and fields semantics of the OVC."""
+        case_sensitive = query.get('case', 'sensitive') != 'insensitive'
+        filters = {field: self.__compile_filter(value, case_sensitive)
+                   for field, value in query.items() if field not in LISTING_PARAMETERS}
+
+        items = [item for item in self._data[collection].values()
+                 if all(self.__matches(item.get(field), patterns, case_sensitive) for field, patterns in filters.items())]
+
+        sort = query.get('sort', 'name')
+        items.sort(key=lambda item: self.__sort_key(item.get(sort), case_sensitive),
+                   reverse=query.get('order', 'descending') == 'descending')
+
+        offset = int(query.get('offset', 0))
+        limit = int(query.get('limit', DEFAULT_LIMIT))
+        page = items[offset:offset + limit]
+
+        fields = query.get('fields')
+        if fields:
+            names = fields.split(',')
+            page = [{name: item[name] for name in names if name in item} for item in page]
+        else:
+            page = [dict(item) for item in page]
+
+        return {collection.split('/')[-1]: page, "count": len(items), "limit": limit, "offset": offset}
+
+    @staticmethod
+    def __matches(value, patterns, case_sensitive):
+        if value is None:
+            return False
+
+        value = str(value) if case_sensitive else str(value).lower()
+        exact, wildcards = patterns
+        return value in exact or any(fnmatch.fnmatchcase(value, pattern) for pattern in wildcards)
+
+    @staticmethod
+    def __compile_filter(value, case_sensitive):
+        """Splits the values of a filter into the exact values and the patterns with wildcards."""
+        values = value.split(',') if case_sensitive else value.lower().split(',')
+        return ({item for item in values if '*' not in item}, [item for item in values if '*' in item])
+
+    @staticmethod
+    def __sort_key(value, case_sensitive):
+        if isinstance(value, str) and not case_sensitive:
+            value = value.lower()
+
+        # Resources without the field are sorted first
+        return (value is not None, str(value) if value is not None else '')
+
+    def __mutate(self, method, path, query, data):
+        """Applies a mutation and starts the task reporting it."""
+        collection, resource_id, action = self.__split_path(path)
+        if collection not in COLLECTIONS:
+            return self.__not_found(path)
+
+        items = self._data[collection]
+        if resource_id is not None and resource_id not in items and action is not None or \
+                method == 'DELETE' and resource_id not in items:
+            return self.__not_found(path)
+
+        if method == 'DELETE':
+            del items[resource_id]
+            return 202, {"task": self.__start_task([resource_id], collection)}
+
+        if resource_id is None:
+            return 202, {"task": self.__start_task([self.__create(collection, None, data)], collection)}
+
+        if resource_id not in items:
+            # Bulk action on the collection, like /virtual_machines/set_policy
+            return self.__bulk_action(collection, resource_id, data)
+
+        creating = CREATING_ACTIONS.get((collection, action))
+        if creating and not (action == 'restore' and query.get('restore_original') == 'True'):
+            target, name_field = creating
+            new_id = self.__create(target, items[resource_id], data, name_field)
+            return 202, {"task": self.__start_task([new_id], target)}
+
+        self.__update(items[resource_id], data)
+        return 202, {"task": self.__start_task([resource_id], collection)}
+
+    def __bulk_action(self, collection, action, data):
+        id_field = "{}_id".format(COLLECTIONS[collection])
+        ids = data.get(id_field) or []
+        ids = ids if isinstance(ids, list) else [ids]
+        items = self._data[collection]
+        changes = {key: value for key, value in data.items() if key != id_field}
+
+        affected = []
+        for resource_id in ids:
+            if resource_id not in items:
+                continue
+            if action == 'delete':
+                del items[resource_id]
+            else:
+                self.__update(items[resource_id], changes)
+            affected.append(resource_id)
+
+        return 202, {"task": self.__start_task(affected, collection)}
+
+    def __create(self, collection, source, data, name_field='name'):
+        item = dict(source or {})
+        if collection == 'backups' and source is not None and 'virtual_machine_id' not in source:
+            item.update(virtual_machine_id=source['id'], virtual_machine_name=source['name'], state='PROTECTED')
+
+        item.update({key: value for key, value in data.items() if key not in NAME_FIELDS})
+        item['id'] = str(uuid.uuid4())
+        item['name'] = data.get(name_field) or data.get('name') or "{}-copy".format(item.get('name', 'resource'))
+        item['created_at'] = time.strftime(TIME_FORMAT, time.gmtime())
+        self._data[collection][item['id']] = item
+        return item['id']
+
+    @staticmethod
+    def __update(item, data):
+        for key, value in data.items():
+            if key in NAME_FIELDS:
+                item['name'] = value
+            elif key in item or key.endswith('_id'):
+                item[key] = value
+
+    def __start_task(self, object_ids, collection):
+        task_id = str(uuid.uuid4())
+        self._tasks[task_id] = {
+            "id": task_id,
+            "state": "IN_PROGRESS",
+            "affected_objects": [{"object_id": object_id, "object_type": COLLECTIONS[collection]}
+                                 for object_id in object_ids],
+            "error_code": 0,
+            "start_time": time.strftime(TIME_FORMAT, time.gmtime()),
+            "_done_at": time.monotonic() + self.task_duration,
+        }
+        return self.__task_view(self._tasks[task_id])
+
+    @staticmethod
+    def __task_view(task):
+        """Gets the state of a task as the OVC reports it."""
+        if task["state"] == "IN_PROGRESS" and time.monotonic() >= task["_done_at"]:
+            task["state"] = "COMPLETED"
+            task["end_time"] = time.strftime(TIME_FORMAT, time.gmtime())
+
+        return {key: value for key, value in task.items() if not key.startswith('_')}
+
+
+class _HTTPSServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    """HTTP server handling each connection in a thread, the TLS handshake included."""
+
+    daemon_threads = True
+    # Concurrent clients open many connections at once, a short backlog delays them by a SYN retransmission
+    request_queue_size = 128
+
+    def __init__(self, address, handler_class, context, fake_ovc):
+        self.ssl_context = context
+        self.fake_ovc = fake_ovc
+        http.server.HTTPServer.__init__(self, address, handler_class)
+
+    def finish_request(self, request, client_address):
+        with self.ssl_context.wrap_socket(request, server_side=True) as tls_request:
+            self.RequestHandlerClass(tls_request, client_address, self)
+
+    def handle_error(self, request, client_address):
+        logger.debug("Fake OVC connection from %s failed", client_address, exc_info=True)
+
+
+class _RequestHandler(http.server.BaseHTTPRequestHandler):
+    """Serves the requests of a keep-alive connection with the fake OVC."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.__handle('GET')
+
+    def do_POST(self):
+        self.__handle('POST')
+
+    def do_PUT(self):
+        self.__handle('PUT')
+
+    def do_DELETE(self):
+        self.__handle('DELETE')
+
+    def __handle(self, method):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+
+        status, document = self.server.fake_ovc.handle(method, self.path, self.headers, body)
+
+        payload = json.dumps(document).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        if 'gzip' in self.headers.get('Accept-Encoding', ''):
+            payload = gzip.compress(payload)
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, message_format, *args):
+        logger.debug("Fake OVC: " + message_format, *args)
@@ -0,0 +1,144 @@
+###
+# (C) Copyright [2019] Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##
+
+"""Builds the inventory of a synthetic federation served by the fake OVC.
+
+The ids are derived from the kind and the index of the resources, so the same
+sizes always build the same inventory.
+"""
+
+import uuid
+
+CREATED_AT = "2020-05-11T10:24:12Z"
+
+# Namespace of the synthetic ids
+ID_NAMESPACE = uuid.UUID('5c1e3a56-3f0a-4b4e-9d5a-2f6f0c6d7e01')
+
+
+def make_id(kind, index):
+    """Gets the id of a synthetic resource."""
+    return str(uuid.uuid5(ID_NAMESPACE, "{}-{}".format(kind, index)))
+
+
+def build_federation(clusters=2, hosts_per_cluster=3, datastores_per_cluster=2, policies=4,
+                     virtual_machines=100, backups_per_vm=2, external_stores=1):
+    """Builds the inventory of a federation.
+
+    Args:
+        clusters: Number of omnistack clusters, all in one cluster group.
+        hosts_per_cluster: Number of hosts in each cluster.
+        datastores_per_cluster: Number of datastores in each cluster.
+        policies: Number of backup policies.
+        virtual_machines: Number of VMs, spread over the datastores.
+        backups_per_vm: Number of backups of each VM.
+        external_stores: Number of external stores.
+
+    Returns:
+        dict: Lists of resource data keyed by collection name, like virtual_machines.
+    """
+    inventory = {
+        'cluster_groups': [_cluster_group(clusters)],
+        'omnistack_clusters': [_cluster(index, hosts_per_cluster) for index in range(clusters)],
+        'hosts': [_host(index, hosts_per_cluster) for index in range(clusters * hosts_per_cluster)],
+        'policies': [_policy(index) for index in range(policies)],
+        'external_stores': [_external_store(index, clusters) for index in range(external_stores)],
+        'certificates': [],
+    }
+    inventory['datastores'] = [_datastore(index, datastores_per_cluster, policies)
+                               for index in range(clusters * datastores_per_cluster)]
+    inventory['virtual_machines'] = [_virtual_machine(index, clusters * datastores_per_cluster, datastores_per_cluster,
+                                                      hosts_per_cluster, policies)
+                                     for index in range(virtual_machines)]
+    inventory['backups'] = [_backup(vm, index) for vm in inventory['virtual_machines'] for index in range(backups_per_vm)]
+
+    return inventory
+
+
+def _cluster_group(clusters):
+    return {"id": make_id("cluster_group", 0), "name": "cluster-group-0",
+            "omnistack_cluster_ids": [make_id("cluster", index) for index in range(clusters)]}
+
+
+def _cluster(index, hosts_per_cluster):
+    return {"id": make_id("cluster", index), "name": "cluster-{}".format(index),
+            "type": "OMNISTACK", "version": "4.1.0", "members": [
+                make_id("host", index * hosts_per_cluster + host) for host in range(hosts_per_cluster)],
+            "arbiter_connected": True, "hypervisor_type": "VSPHERE",
+            "cluster_group_ids": [make_id("cluster_group", 0)]}
+
+
+def _host(index, hosts_per_cluster):
+    cluster = index // hosts_per_cluster
+    return {"id": make_id("host", index), "name": "host-{}".format(index), "type": "OMNISTACK",
+            "state": "ALIVE", "management_ip": "10.1.{}.{}".format(cluster, index % 250 + 1),
+            "omnistack_cluster_id": make_id("cluster", cluster),
+            "hypervisor_object_id": "host-{}".format(index), "version": "4.1.0"}
+
+
+def _policy(index):
+    return {"id": make_id("policy", index), "name": "policy-{}".format(index),
+            "rules": [{"id": make_id("rule", index), "frequency": 60, "retention": 1440,
+                       "destination_id": "<local>", "destination_name": "<local>"}]}
+
+
+def _external_store(index, clusters):
+    return {"name": "external-store-{}".format(index), "management_ip": "10.2.0.{}".format(index + 1),
+            "management_port": 9387, "storage_port": 9395, "type": "STOREONCEONPREM",
+            "omnistack_cluster_id": make_id("cluster", index % clusters),
+            "cluster_group_ids": [make_id("cluster_group", 0)]}
+
+
+def _datastore(index, datastores_per_cluster, policies):
+    cluster = index // datastores_per_cluster
+    datastore = {"id": make_id("datastore", index), "name": "datastore-{}".format(index), "state": "ALIVE",
+                 "size": 1099511627776, "created_at": CREATED_AT,
+                 "omnistack_cluster_id": make_id("cluster", cluster),
+                 "omnistack_cluster_name": "cluster-{}".format(cluster), "hypervisor_object_id": "datastore-{}".format(index),
+                 "shares": []}
+    if policies:
+        datastore["policy_id"] = make_id("policy", index % policies)
+        datastore["policy_name"] = "policy-{}".format(index % policies)
+
+    return datastore
+
+
+def _virtual_machine(index, datastores, datastores_per_cluster, hosts_per_cluster, policies):
+    datastore = index % datastores
+    cluster = datastore // datastores_per_cluster
+    vm = {"id": make_id("vm", index), "name": "vm-{:06d}".format(index), "state": "ALIVE",
+          "created_at": CREATED_AT, "datastore_id": make_id("datastore", datastore),
+          "datastore_name": "datastore-{}".format(datastore), "omnistack_cluster_id": make_id("cluster", cluster),
+          "omnistack_cluster_name": "cluster-{}".format(cluster),
+          "hypervisor_object_id": "vm-{}".format(index), "hypervisor_type": "VSPHERE",
+          "hypervisor_virtual_machine_power_state": "ON", "hypervisor_is_template": False,
+          "app_aware_vm_status": "VALID", "ha_status": "SAFE", "ha_resynchronization_progress": 100,
+          "host_id": make_id("host", cluster * hosts_per_cluster + index % hosts_per_cluster)}
+    if policies:
+        vm["policy_id"] = make_id("policy", datastore % policies)
+        vm["policy_name"] = "policy-{}".format(datastore % policies)
+
+    return vm
+
+
+def _backup(vm, index):
+    vm_index = int(vm["name"].split("-")[1])
+    return {"id": make_id("backup", "{}-{}".format(vm_index, index)),
+            "name": "backup-{:06d}-{}".format(vm_index, index), "state": "PROTECTED", "type": "POLICY",
+            "created_at": CREATED_AT, "expiration_time": "2020-06-11T10:24:12Z", "application_consistent": False,
+            "consistency_type": "NONE", "virtual_machine_id": vm["id"], "virtual_machine_name": vm["name"],
+            "virtual_machine_state": "ALIVE", "datastore_id": vm["datastore_id"], "datastore_name": vm["datastore_name"],
+            "omnistack_cluster_id": vm["omnistack_cluster_id"], "omnistack_cluster_name": vm["omnistack_cluster_name"],
+            "size": 53687091200, "sent": 1073741824, "unique_size_bytes": 1073741824, "locked": False}
@@ -0,0 +1,201 @@
+###
+# (C) Copyright [2019] Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##
+
+"""Implements the limits protecting the OVC from too many requests."""
+
+import threading
+import time
+
+TOKEN_EPSILON = 1e-9
+
+
+class RateLimiter(object):
+    """Token bucket limiting the rate of operations.
+
+    The bucket holds up to `burst` tokens and is refilled at `rate` tokens per
+    second. Each operation takes one token and waits if the bucket is empty.
+    """
+
+    def __init__(self, rate, burst=1):
+        """Initializes a full bucket.
+
+        Args:
+            rate: Operations per second.
+            burst: Maximum number of operations started at once after an idle period.
+        """
+        if rate <= 0:
+            raise ValueError("rate must be a positive number")
+
+        self._rate = float(rate)
+        self._burst = max(1, burst)
+        self._tokens = float(self._burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def rate(self):
+        """Operations per second."""
+        return self._rate
+
+    def acquire(self):
+        """Takes a token, waits until one is available."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self._burst, self._tokens + (now - self._updated) * self._rate)
+                self._updated = now
+
+                # Tolerates the rounding of the refill computation
+                if self._tokens >= 1 - TOKEN_EPSILON:
+                    self._tokens = max(0.0, self._tokens - 1)
+                    return
+
+                wait = (1 - self._tokens) / self._rate
+
+            time.sleep(wait)
+
+
+class AdaptiveConcurrencyLimiter(object):
+    """Limit of requests in flight adapted with additive increase, multiplicative decrease (AIMD).
+
+    A request which fails with a server error, a network error or a latency
+    above the threshold multiplies the limit by the back-off ratio. The limit
+    is decreased at most once per window of requests started at the previous
+    limit, so a burst of errors from the same overload counts once. Each
+    healthy request increases the limit by 1 / limit, which adds about one
+    request in flight per window.
+    """
+
+    def __init__(self, initial_limit=8, min_limit=1, max_limit=64, latency_threshold=None, backoff_ratio=0.5):
+        """Initializes the limiter.
+
+        Args:
+            initial_limit: Requests in flight allowed at start.
+            min_limit: Lowest limit.
+            max_limit: Highest limit.
+            latency_threshold: Latency in seconds above which the OVC is considered
+              overloaded, None to react to errors only.
+            backoff_ratio: Factor applied to the limit when the OVC is overloaded.
+        """
+        if not 0 < backoff_ratio < 1:
+            raise ValueError("backoff_ratio must be between 0 and 1")
+
+        self._min_limit = max(1, min_limit)
+        self._max_limit = max(self._min_limit, max_limit)
+        self._limit = float(min(max(initial_limit, self._min_limit), self._max_limit))
+        self._latency_threshold = latency_threshold
+        self._backoff_ratio = backoff_ratio
+        self._in_flight = 0
+        self._started = 0
+        self._recovered_at = 0
+        self._condition = threading.Condition()
+        self.decrease_count = 0
+
+    @property
+    def limit(self):
+        """Current number of requests in flight allowed."""
+        return int(self._limit)
+
+    @property
+    def in_flight(self):
+        """Number of requests in flight."""
+        return self._in_flight
+
+    def acquire(self):
+        """Waits until a request can be started.
+
+        Returns:
+            int: Sequence number of the request, passed to release.
+        """
+        with self._condition:
+            while self._in_flight >= int(self._limit):
+                self._condition.wait()
+
+            self._in_flight += 1
+            self._started += 1
+            return self._started
+
+    def release(self, sequence, latency, failed=False):
+        """Records the outcome of a request and adapts the limit.
+
+        Args:
+            sequence: Sequence number returned by acquire.
+            latency: Duration of the request in seconds.
+            failed: True if the request failed because the OVC is overloaded or unreachable.
+        """
+        overloaded = failed or (self._latency_threshold is not None and latency > self._latency_threshold)
+
+        with self._condition:
+            self._in_flight -= 1
+
+            if overloaded:
+                # Requests started before the last decrease saw the old limit
+                if sequence > self._recovered_at:
+                    self._limit = max(self._min_limit, self._limit * self._backoff_ratio)
+                    self._recovered_at = self._started
+                    self.decrease_count += 1
+            else:
+                self._limit = min(self._max_limit, self._limit + 1.0 / self._limit)
+
+            self._condition.notify_all()
+
+
+class Throttle(object):
+    """Applies a rate limiter and an adaptive concurrency limiter to the requests of a connection.
+
+    Responses with a 5xx or 429 status and requests which got no response
+    count as failures for the concurrency limiter.
+    """
+
+    def __init__(self, rate_limiter=None, concurrency_limiter=None):
+        """Initializes with the optional limiters.
+
+        Args:
+            rate_limiter: RateLimiter object or None.
+            concurrency_limiter: AdaptiveConcurrencyLimiter object or None.
+        """
+        self.rate_limiter = rate_limiter
+        self.concurrency_limiter = concurrency_limiter
+
+    def start(self):
+        """Waits until a request can be sent.
+
+        Returns:
+            tuple: Ticket of the request, passed to finish.
+        """
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+
+        sequence = self.concurrency_limiter.acquire() if self.concurrency_limiter else None
+        return sequence, time.monotonic()
+
+    def finish(self, ticket, status, latency=None):
+        """Records the end of a request.
+
+        Args:
+            ticket: Ticket returned by start.
+            status: HTTP status of the response, None if no response was received.
+            latency: Latency of the request in seconds. Default: time elapsed since start.
+        """
+        if not self.concurrency_limiter:
+            return
+
+        sequence, started = ticket
+        if latency is None:
+            latency = time.monotonic() - started
+
+        failed = status is None or status >= 500 or status == 429
+        self.concurrency_limiter.release(sequence, latency, failed)
@@ -0,0 +1,150 @@
+###
+# (C) Copyright [2019] Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##
+
+"""File cache of the OAuth access tokens, shared by short-lived processes.
+
+The tokens are kept in a JSON file readable only by its owner, keyed by OVC IP
+address and user, with their expiry time. A new connection reuses a cached token
+which has not expired instead of logging in; the connection logs in again if the
+OVC rejects it.
+"""
+
+import json
+import logging
+import os
+import stat
+import tempfile
+import threading
+import time
+
+from simplivity import token_manager
+
+# Default path of the cache file
+DEFAULT_PATH = os.path.join(os.path.expanduser('~'), '.simplivity', 'tokens.json')
+
+# Permissions of the cache file and of the directory created for it
+FILE_MODE = 0o600
+DIRECTORY_MODE = 0o700
+
+logger = logging.getLogger(__name__)
+
+
+class TokenCache(object):
+    """Access tokens saved in a file, keyed by OVC IP address and user.
+
+    The file is replaced atomically on each change, so concurrent processes never
+    read a partial file; the last process writing a token wins. A file readable by
+    other users is ignored.
+    """
+
+    def __init__(self, path=None, refresh_margin=token_manager.REFRESH_MARGIN):
+        """Initializes the cache, the file is read on each lookup.
+
+        Args:
+            path: Path of the cache file. Default: ~/.simplivity/tokens.json
+            refresh_margin: Seconds before the expiry when a cached token is no longer reused.
+        """
+        self.path = path or DEFAULT_PATH
+        self._refresh_margin = refresh_margin
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_key(ovc_ip, username):
+        """Gets the key of the token of a user on an OVC."""
+        return "{}@{}".format(username, ovc_ip)
+
+    def get(self, ovc_ip, username):
+        """Gets a cached token which does not expire within the refresh margin.
+
+        Args:
+            ovc_ip: IP address of the OVC.
+            username: User of the token.
+
+        Returns:
+            tuple: Tuple with two members (access token and its remaining lifetime in
+              seconds, None if unknown), None if no valid token is cached.
+        """
+        entry = self.__read().get(self.get_key(ovc_ip, username))
+        if not isinstance(entry, dict) or not entry.get('access_token'):
+            return None
+
+        expires_at = entry.get('expires_at')
+        if expires_at is None:
+            return entry['access_token'], None
+
+        expires_in = expires_at - time.time()
+        if expires_in <= self._refresh_margin:
+            return None
+
+        return entry['access_token'], expires_in
+
+    def set(self, ovc_ip, username, token, expires_in=None):
+        """Saves the token of a user.
+
+        Args:
+            ovc_ip: IP address of the OVC.
+            username: User of the token.
+            token: Access token.
+            expires_in: Lifetime of the token in seconds, None if unknown.
+        """
+        entry = {'access_token': token, 'expires_at': time.time() + expires_in if expires_in else None}
+        self.__update(self.get_key(ovc_ip, username), entry)
+
+    def remove(self, ovc_ip, username):
+        """Removes the token of a user."""
+        self.__update(self.get_key(ovc_ip, username), None)
+
+    def __read(self):
+        """Reads the tokens, an unreadable or unsafe file is ignored."""
+        try:
+            with open(self.path) as cache_file:
+                if os.fstat(cache_file.fileno()).st_mode & (stat.S_IRWXG | stat.S_IRWXO):
+                    logger.warning("Ignoring the token cache %s, it is accessible by other users", self.path)
+                    return {}
+                tokens = json.load(cache_file)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as error:
+            logger.warning("Ignoring the token cache %s: %s", self.path, error)
+            return {}
+
+        return tokens if isinstance(tokens, dict) else {}
+
+    def __update(self, key, entry):
+        """Sets or removes an entry and replaces the file."""
+        with self._lock:
+            tokens = self.__read()
+            if entry is None:
+                if tokens.pop(key, None) is None:
+                    return
+            else:
+                tokens[key] = entry
+            self.__write(tokens)
+
+    def __write(self, tokens):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, mode=DIRECTORY_MODE, exist_ok=True)
+
+        # mkstemp creates the file with the 0600 permissions
+        fd, temp_path = tempfile.mkstemp(prefix='.tokens', dir=directory)
+        try:
+            with os.fdopen(fd, 'w') as temp_file:
+                json.dump(tokens, temp_file)
+            os.chmod(temp_path, FILE_MODE)
+            os.replace(temp_path, self.path)
+        except Exception:
+            os.unlink(temp_path)
+            raise
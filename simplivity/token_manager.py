@@ -0,0 +1,108 @@
+###
+# (C) Copyright [2019] Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##
+
+"""Keeps track of the OAuth access token of a connection."""
+
+import threading
+import time
+
+# Seconds before the expiry when the token is refreshed
+REFRESH_MARGIN = 30
+
+# Seconds of inactivity after which the OVC invalidates a token
+IDLE_TIMEOUT = 600
+
+
+class TokenManager(object):
+    """Tracks the expiry of the access token and collapses concurrent refreshes into one login.
+
+    The token is considered expiring when its lifetime from the OAuth response
+    or the idle timeout of the OVC ends within the refresh margin.
+    """
+
+    def __init__(self, refresh_margin=REFRESH_MARGIN, idle_timeout=IDLE_TIMEOUT):
+        """Initializes without a token.
+
+        Args:
+            refresh_margin: Seconds before the expiry when the token is refreshed.
+            idle_timeout: Seconds of inactivity after which the token expires, None to ignore it.
+        """
+        self._refresh_margin = refresh_margin
+        self._idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        self._token = None
+        self._expires_at = None
+        self._last_used = None
+        self.refresh_count = 0
+
+    @property
+    def token(self):
+        """Current access token, None if there is no session."""
+        return self._token
+
+    @property
+    def expires_at(self):
+        """Monotonic time when the token expires, None if unknown."""
+        return self._expires_at
+
+    def set_token(self, token, expires_in=None):
+        """Sets a new token.
+
+        Args:
+            token: Access token.
+            expires_in: Lifetime of the token in seconds from the OAuth response.
+        """
+        now = time.monotonic()
+        self._expires_at = now + expires_in if expires_in else None
+        self._last_used = now
+        self._token = token
+
+    def clear(self):
+        """Removes the token."""
+        self.set_token(None)
+
+    def touch(self):
+        """Records the use of the token, which postpones the idle expiry."""
+        self._last_used = time.monotonic()
+
+    def is_expiring(self):
+        """Returns True if the token expires within the refresh margin."""
+        if self._token is None:
+            return False
+
+        deadline = time.monotonic() + self._refresh_margin
+        if self._expires_at is not None and deadline >= self._expires_at:
+            return True
+
+        return self._idle_timeout is not None and deadline >= self._last_used + self._idle_timeout
+
+    def refresh(self, login, stale_token):
+        """Gets a new token unless another thread already replaced the stale one.
+
+        Args:
+            login: Function which logs in and sets the new token.
+            stale_token: Token the caller found expired.
+
+        Returns:
+            boolean: True if this call logged in.
+        """
+        with self._lock:
+            if self._token != stale_token:
+                return False
+
+            login()
+            self.refresh_count += 1
+            return True
@@ -0,0 +1,219 @@
+###
+# (C) Copyright [2019] Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##
+
+"""Traces the resource methods, HTTP requests and task waits with OpenTelemetry spans.
+
+Tracing is disabled until enable is called. opentelemetry-api is an optional
+dependency, any tracer with the start_as_current_span method of the
+OpenTelemetry API can be used, like the RecordingTracer of this module.
+"""
+
+import contextlib
+import functools
+import inspect
+import threading
+import time
+import types
+
+from simplivity import exceptions
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:
+    otel_trace = None
+
+TRACER_NAME = 'simplivity'
+
+# Span attributes
+RESOURCE_TYPE = 'simplivity.resource.type'
+RESOURCE_ID = 'simplivity.resource.id'
+TASK_ID = 'simplivity.task.id'
+TASK_POLL_COUNT = 'simplivity.task.poll_count'
+HTTP_METHOD = 'http.method'
+HTTP_TARGET = 'http.target'
+HTTP_STATUS_CODE = 'http.status_code'
+NET_PEER_NAME = 'net.peer.name'
+
+# Public methods which are not traced: factories called for each resource of a listing
+UNTRACED_METHODS = ('get_by_data',)
+
+OTEL_NOT_INSTALLED = "opentelemetry-api is not installed, pass a tracer to enable tracing"
+
+_tracer = None
+
+
+def enable(tracer=None):
+    """Enables the tracing.
+
+    Args:
+        tracer: Tracer creating the spans. Default: the OpenTelemetry tracer of
+          the global tracer provider.
+    """
+    global _tracer
+
+    if tracer is None:
+        if otel_trace is None:
+            raise exceptions.HPESimpliVityException(OTEL_NOT_INSTALLED)
+        tracer = otel_trace.get_tracer(TRACER_NAME)
+
+    _tracer = tracer
+
+
+def disable():
+    """Disables the tracing."""
+    global _tracer
+    _tracer = None
+
+
+def is_enabled():
+    """Returns True if the spans are recorded."""
+    return _tracer is not None
+
+
+class _NoopSpan(object):
+    """Span used when the tracing is disabled."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+    def set_attribute(self, key, value):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def span(name, attributes=None):
+    """Starts a span, as a context manager yielding the span.
+
+    Args:
+        name: Name of the span.
+        attributes: Attributes of the span.
+    """
+    tracer = _tracer
+    if tracer is None:
+        return _NOOP_SPAN
+
+    return tracer.start_as_current_span(name, attributes=attributes)
+
+
+def traced(method):
+    """Decorates a resource method so that each call is wrapped in a span.
+
+    The span is named after the class of the object and the method, like
+    VirtualMachine.clone, and has the type and the id of the resource as attributes.
+    """
+    if getattr(method, '_traced', False):
+        return method
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if _tracer is None:
+            return method(self, *args, **kwargs)
+
+        name = "{}.{}".format(type(self).__name__, method.__name__)
+        with _tracer.start_as_current_span(name, attributes=_get_resource_attributes(self)):
+            return method(self, *args, **kwargs)
+
+    wrapper._traced = True
+    return wrapper
+
+
+def trace_methods(cls):
+    """Wraps the public methods defined by a class in spans.
+
+    The factories of UNTRACED_METHODS are left out, and so are the generator
+    methods, whose body runs after the call returns.
+    """
+    for name, value in list(vars(cls).items()):
+        if name.startswith('_') or name in UNTRACED_METHODS or not isinstance(value, types.FunctionType):
+            continue
+        if not inspect.isgeneratorfunction(value):
+            setattr(cls, name, traced(value))
+
+
+def _get_resource_attributes(obj):
+    attributes = {RESOURCE_TYPE: type(obj).__name__}
+    data = getattr(obj, 'data', None)
+    if isinstance(data, dict):
+        # Reads the stored field, a partial resource must not be loaded by the tracing
+        resource_id = dict.get(data, 'id')
+        if resource_id is not None:
+            attributes[RESOURCE_ID] = resource_id
+
+    return attributes
+
+
+class RecordedSpan(object):
+    """Span recorded by a RecordingTracer.
+
+    Attributes:
+        name: Name of the span.
+        attributes: Attributes of the span.
+        parent: Parent RecordedSpan object, None for a root span.
+        error: Exception raised in the span, None if it succeeded.
+        duration: Seconds between the start and the end of the span.
+    """
+
+    def __init__(self, name, attributes, parent):
+        self.name = name
+        self.attributes = dict(attributes or {})
+        self.parent = parent
+        self.error = None
+        self.duration = None
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def __repr__(self):
+        return "RecordedSpan(name={!r}, attributes={!r})".format(self.name, self.attributes)
+
+
+class RecordingTracer(object):
+    """Tracer keeping the spans in memory, to check the tracing without an OpenTelemetry exporter.
+
+    Attributes:
+        spans (list): RecordedSpan objects in the order they ended.
+    """
+
+    def __init__(self):
+        self.spans = []
+        self._current = threading.local()
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def start_as_current_span(self, name, attributes=None, **kwargs):
+        parent = getattr(self._current, 'span', None)
+        recorded = RecordedSpan(name, attributes, parent)
+        self._current.span = recorded
+        started = time.monotonic()
+        try:
+            yield recorded
+        except Exception as error:
+            recorded.error = error
+            raise
+        finally:
+            recorded.duration = time.monotonic() - started
+            self._current.span = parent
+            with self._lock:
+                self.spans.append(recorded)
+
+    def get_spans(self, name):
+        """Gets the recorded spans with a name."""
+        return [recorded for recorded in self.spans if recorded.name == name]
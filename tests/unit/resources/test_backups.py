@@ -25,6 +25,8 @@ from simplivity.resources import datastores
 from simplivity.resources import virtual_machines
 from simplivity.resources import omnistack_clusters
 from simplivity.resources import cluster_groups
+from simplivity.resources import policies
+from simplivity.resources.resource import ResourceReference
 
 
 class BackupTest(unittest.TestCase):
@@ -151,6 +153,8 @@ class BackupTest(unittest.TestCase):
         self.assertEqual(vm.data, vm_data)
         data = {'virtual_machine_name': 'vm1', 'datastore_id': 'abcdef'}
         mock_post.assert_called_once_with('/backups/12345/restore?restore_original=False', data, custom_headers=None)
+        mock_get.assert_any_call('/datastores?case=sensitive&fields=id%2Cname&limit=1&name=ds1'
+                                 '&offset=0&order=descending&sort=name')
 
     @mock.patch.object(Connection, "post")
     @mock.patch.object(Connection, "get")
@@ -170,6 +174,17 @@ class BackupTest(unittest.TestCase):
         data = {'virtual_machine_name': 'vm1', 'datastore_id': 'abcdef'}
         mock_post.assert_called_once_with('/backups/12345/restore?restore_original=False', data, custom_headers=None)
 
+    @mock.patch.object(Connection, "post")
+    def test_restore_with_reference_of_other_type(self, mock_post):
+        policy_ref = ResourceReference({'id': 'abcdef', 'name': 'policy1'}, policies.Policy)
+        backup = self.backups.get_by_data({'name': 'name1', 'id': '12345'})
+
+        with self.assertRaises(exceptions.HPESimpliVityException) as error:
+            backup.restore(False, "vm1", policy_ref)
+
+        self.assertEqual(error.exception.msg, "Reference to a Policy was passed where a Datastore is expected")
+        mock_post.assert_not_called()
+
     @mock.patch.object(Connection, "post")
     @mock.patch.object(Connection, "get")
     def test_lock(self, mock_get, mock_post):
@@ -232,6 +247,8 @@ class BackupTest(unittest.TestCase):
         mock_post.assert_called_once_with('/backups/12345/copy',
                                           {'destination_id': '67890'},
                                           custom_headers=None)
+        mock_get.assert_any_call('/omnistack_clusters?case=sensitive&fields=id%2Cname&limit=1&name=cluster1'
+                                 '&offset=0&order=descending&sort=name')
 
     @mock.patch.object(Connection, "post")
     @mock.patch.object(Connection, "get")
@@ -304,6 +321,8 @@ class BackupTest(unittest.TestCase):
         self.assertEqual(backup_obj[0].data, backup_ret_data[0])
         data = {'backup_id': backup_ids, 'retention': 10, 'force': True, 'cluster_group_id': "12345"}
         mock_post.assert_called_once_with('/backups/set_retention', data, custom_headers=None)
+        mock_get.assert_any_call('/cluster_groups?case=sensitive&fields=id%2Cname&limit=1&name=12345'
+                                 '&offset=0&order=descending&sort=name')
 
     @mock.patch.object(Connection, "post")
     @mock.patch.object(Connection, "get")
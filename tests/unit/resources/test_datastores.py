@@ -149,6 +149,10 @@ class DatastoresTest(unittest.TestCase):
                                           },
                                           custom_headers=None
                                           )
+        mock_get.assert_any_call('/omnistack_clusters?case=sensitive&fields=id%2Cname&limit=1&name=cluster1'
+                                 '&offset=0&order=descending&sort=name')
+        mock_get.assert_any_call('/policies?case=sensitive&fields=id%2Cname&limit=1&name=policy1'
+                                 '&offset=0&order=descending&sort=name')
 
     @mock.patch.object(Connection, "delete")
     def test_delete(self, mock_delete):
@@ -190,6 +194,8 @@ class DatastoresTest(unittest.TestCase):
 
         mock_post.assert_called_once_with('/datastores/12345/set_policy', {'policy_id': '4567'},
                                           custom_headers=None)
+        mock_get.assert_any_call('/policies?case=sensitive&fields=id%2Cname&limit=1&name=policy1'
+                                 '&offset=0&order=descending&sort=name')
 
     @mock.patch.object(Connection, "post")
     @mock.patch.object(Connection, "get")
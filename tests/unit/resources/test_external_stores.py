@@ -109,6 +109,8 @@ class ExternalStoresTest(unittest.TestCase):
                 'type': 'StoreOnceOnPrem'}
         mock_post.assert_called_once_with(external_stores.URL, data,
                                           custom_headers={'Content-type': 'application/vnd.simplivity.v1.11+json'})
+        mock_get.assert_any_call('/omnistack_clusters?case=sensitive&fields=id%2Cname&limit=1&name=cluster1'
+                                 '&offset=0&order=descending&sort=name')
 
     @mock.patch.object(Connection, "post")
     def test_update_credential(self, mock_post):
@@ -135,6 +137,8 @@ class ExternalStoresTest(unittest.TestCase):
         data = {'name': 'storeonce_cat1', 'omnistack_cluster_id': '12345'}
         mock_post.assert_called_once_with('/external_stores/unregister', data,
                                           custom_headers={'Content-type': 'application/vnd.simplivity.v1.15+json'})
+        mock_get.assert_any_call('/omnistack_clusters?case=sensitive&fields=id%2Cname&limit=1&name=cluster1'
+                                 '&offset=0&order=descending&sort=name')
 
     @mock.patch.object(Connection, "post")
     @mock.patch.object(Connection, "get")
@@ -15,12 +15,16 @@
 ##
 
 import unittest
+import weakref
 from unittest import mock
 
 from simplivity.connection import Connection
 from simplivity import exceptions
 from simplivity.resources.resource import ResourceClient, Pagination
 from simplivity.resources.resource import PAGE_SIZE_NOT_SET
+from simplivity.resources.resource import PartialData
+from simplivity.resources import resource
+from simplivity.resources import virtual_machines as machines
 
 
 class ResourceStub():
@@ -79,6 +83,17 @@ class ResourceTest(unittest.TestCase):
         result = self.resource_client.get_all('/api/resource', pagination=True, page_size=10)
         self.assertIsInstance(result, Pagination)
 
+    @mock.patch.object(Connection, "get_members")
+    def test_get_all_with_stream(self, mock_get_members):
+        mock_get_members.return_value = iter([{'name': 'testname', 'id': '1234567'}])
+
+        result = self.resource_client.get_all('/api/resource', 'member_field', stream=True)
+
+        self.assertIsInstance(next(result), ResourceStub)
+        self.assertEqual(list(result), [])
+        mock_get_members.assert_called_once_with('/api/resource?case=sensitive&limit=500&offset=0&order=descending'
+                                                 '&sort=name', 'member_field')
+
     @mock.patch.object(Connection, "get")
     def test_get_all_with_paginatin_without_page_size(self, mock_get):
         with self.assertRaises(exceptions.HPESimpliVityException) as error:
@@ -172,6 +187,124 @@ class ResourceTest(unittest.TestCase):
         mock_delete.assert_called_once_with(url, custom_headers=None)
         self.assertEqual(result, affected_objects)
 
+    @mock.patch.object(Connection, "post")
+    @mock.patch.object(Connection, "get")
+    def test_task_stats_keyed_by_operation(self, mock_get, mock_post):
+        mock_post.return_value = {'id': '12345', 'state': 'IN_PROGRESS'}, {}
+        mock_get.return_value = {'task': {'id': '12345', 'state': 'COMPLETED', 'affected_objects': []}}
+
+        result = self.resource_client.do_post("/virtual_machines/4230-a8c1/clone?app_consistent=false", {}, -1)
+
+        self.assertEqual(result.stats.operation, "POST /virtual_machines/{id}/clone")
+        self.assertEqual(self.Connection.task_stats.get("POST /virtual_machines/{id}/clone").count, 1)
+
+
+class PartialDataTest(unittest.TestCase):
+
+    def setUp(self):
+        self.connection = Connection('127.0.0.1')
+        self.machines = machines.VirtualMachines(self.connection)
+
+    @mock.patch.object(Connection, "get")
+    def test_get_all_with_fields_returns_partial_data(self, mock_get):
+        mock_get.return_value = {machines.DATA_FIELD: [{'id': '1', 'name': 'vm1'}]}
+
+        vms = self.machines.get_all(fields='id,name')
+
+        self.assertIsInstance(vms[0].data, PartialData)
+        self.assertTrue(vms[0].data.is_partial)
+        self.assertEqual(vms[0].data["name"], 'vm1')
+        mock_get.assert_called_once()
+
+    @mock.patch.object(Connection, "get")
+    def test_get_all_without_fields_returns_plain_data(self, mock_get):
+        mock_get.return_value = {machines.DATA_FIELD: [{'id': '1', 'name': 'vm1'}]}
+
+        vms = self.machines.get_all()
+
+        self.assertNotIsInstance(vms[0].data, PartialData)
+
+    @mock.patch.object(Connection, "get")
+    def test_missing_field_loads_all_resources_of_the_listing(self, mock_get):
+        mock_get.side_effect = [{machines.DATA_FIELD: [{'id': '1'}, {'id': '2'}]},
+                                {machines.DATA_FIELD: [{'id': '1', 'state': 'ALIVE'},
+                                                       {'id': '2', 'state': 'DELETED'}]}]
+
+        vms = self.machines.get_all(fields='id')
+
+        self.assertEqual(vms[0].data["state"], 'ALIVE')
+        self.assertEqual(vms[1].data.get("state"), 'DELETED')
+        self.assertFalse(vms[1].data.is_partial)
+        mock_get.assert_called_with('/virtual_machines?case=sensitive&id=1%2C2&limit=2&offset=0&order=descending&sort=name')
+        self.assertEqual(mock_get.call_count, 2)
+
+    @mock.patch.object(Connection, "get")
+    def test_missing_field_raises_key_error_after_load(self, mock_get):
+        mock_get.side_effect = [{machines.DATA_FIELD: [{'id': '1'}]},
+                                {machines.DATA_FIELD: [{'id': '1', 'name': 'vm1'}]}]
+
+        vms = self.machines.get_all(fields='id')
+
+        with self.assertRaises(KeyError):
+            vms[0].data["unknown"]
+        self.assertIsNone(vms[0].data.get("unknown"))
+        self.assertEqual(mock_get.call_count, 2)
+
+    @mock.patch.object(Connection, "get")
+    def test_failed_load_is_retried_on_next_access(self, mock_get):
+        mock_get.side_effect = [{machines.DATA_FIELD: [{'id': '1'}, {'id': '2'}]},
+                                exceptions.HPESimpliVityException("Service unavailable"),
+                                {machines.DATA_FIELD: [{'id': '1', 'state': 'ALIVE'},
+                                                       {'id': '2', 'state': 'DELETED'}]}]
+
+        vms = self.machines.get_all(fields='id')
+
+        with self.assertRaises(exceptions.HPESimpliVityException):
+            vms[0].data["state"]
+        self.assertTrue(vms[1].data.is_partial)
+        self.assertEqual(vms[1].data["state"], 'DELETED')
+        self.assertEqual(vms[0].data["state"], 'ALIVE')
+        self.assertEqual(mock_get.call_count, 3)
+
+    @mock.patch.object(Connection, "get")
+    def test_dict_accessors_load_full_data(self, mock_get):
+        full_data = {'id': '1', 'name': 'vm1', 'state': 'ALIVE'}
+        mock_get.side_effect = [{machines.DATA_FIELD: [{'id': '1'}]}, {machines.DATA_FIELD: [full_data]}]
+
+        data = self.machines.get_all(fields='id')[0].data
+
+        self.assertTrue(data)
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertIn('state', data)
+        self.assertEqual(sorted(data.keys()), ['id', 'name', 'state'])
+        self.assertEqual(data.copy(), full_data)
+        self.assertEqual(mock_get.call_count, 2)
+
+    @mock.patch.object(Connection, "get")
+    def test_load_batches_fit_in_url(self, mock_get):
+        ids = ['{:08d}-1111-2222-3333-444444444444'.format(index) for index in range(250)]
+        mock_get.side_effect = [{machines.DATA_FIELD: [{'id': resource_id} for resource_id in ids]}] + \
+            [{machines.DATA_FIELD: []}] * 3
+
+        vms = self.machines.get_all(fields='id', limit=250)
+        vms[0].data.load()
+
+        self.assertEqual(mock_get.call_count, 4)
+        for load_call in mock_get.call_args_list[1:]:
+            self.assertLess(len(load_call[0][0]), resource.LOAD_QUERY_MAX_LENGTH + 200)
+
+    @mock.patch.object(Connection, "get")
+    def test_loader_does_not_keep_released_data(self, mock_get):
+        mock_get.return_value = {machines.DATA_FIELD: [{'id': str(index)} for index in range(300)]}
+
+        vms = self.machines.get_all(fields='id', limit=300)
+        loader = vms[0].data._loader
+        data_ref = weakref.ref(vms[299].data)
+        del vms
+
+        self.assertIsNone(data_ref())
+        self.assertIsNotNone(loader)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -94,6 +94,42 @@ class TaskTest(unittest.TestCase):
         ret_entity = self.task.wait_for_task()
         self.assertEqual(ret_entity, affected_objects)
 
+    @mock.patch('simplivity.resources.tasks.time.time')
+    @mock.patch('simplivity.resources.tasks.time.sleep')
+    @mock.patch.object(Connection, 'get')
+    def test_wait_for_task_records_stats(self, mock_get, mock_sleep, mock_time):
+        running = {'task': dict(self.task_data, start_time='2019-05-29T07:15:30Z')}
+        completed = {'task': dict(self.task_data, state='COMPLETED', affected_objects=[],
+                                  start_time='2019-05-29T07:15:30Z', end_time='2019-05-29T07:15:32.500Z')}
+        mock_get.side_effect = [running, running, completed, completed]
+        mock_time.return_value = 1559114136.0  # 2019-05-29T07:15:36Z
+        task = Task(self.connection, self.task_data, 'POST /virtual_machines/{id}/clone')
+
+        result = task.wait_for_task()
+
+        self.assertEqual(result, [])
+        self.assertIs(result.stats, task.stats)
+        self.assertEqual(result.stats.polls, 4)
+        self.assertEqual(result.stats.sleep_time, 3)
+        self.assertEqual(result.stats.task_duration, 6)
+        self.assertEqual(result.stats.wasted_sleep, 2)
+        operation_stats = self.connection.task_stats.get('POST /virtual_machines/{id}/clone')
+        self.assertEqual(operation_stats.count, 1)
+        self.assertEqual(operation_stats.polls, 4)
+
+    @mock.patch('simplivity.resources.tasks.time.sleep')
+    @mock.patch.object(Connection, 'get')
+    def test_failed_task_stats_recorded(self, mock_get, mock_sleep):
+        failed = {'task': dict(self.task_data, state='FAILED', message=ERR_MSG)}
+        mock_get.return_value = failed
+
+        with self.assertRaises(exceptions.HPESimpliVityException):
+            self.task.wait_for_task()
+
+        self.assertEqual(self.task.stats.state, 'FAILED')
+        self.assertIsNone(self.task.stats.task_duration)
+        self.assertEqual(self.connection.task_stats.get(None).failed, 1)
+
 
 if __name__ == '__main__':
     unittest.main()
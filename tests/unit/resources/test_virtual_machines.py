@@ -24,6 +24,7 @@ from simplivity.resources import virtual_machines as machines
 from simplivity.resources import policies
 from simplivity.resources import datastores
 from simplivity.resources import omnistack_clusters
+from simplivity.resources.resource import ResourceReference
 
 
 class VirtualMachinesTest(unittest.TestCase):
@@ -90,6 +91,30 @@ class VirtualMachinesTest(unittest.TestCase):
 
         self.assertEqual(error.exception.msg, "Resource not found with the id {}".format(vm_id))
 
+    @mock.patch.object(Connection, "get")
+    def test_get_reference_by_name_found(self, mock_get):
+        vm_name = "testname"
+        url = "{}?case=sensitive&fields=id%2Cname&limit=1&name={}" \
+              "&offset=0&order=descending&sort=name".format(machines.URL, vm_name)
+        resource_data = [{'id': '12345', 'name': vm_name}]
+        mock_get.return_value = {machines.DATA_FIELD: resource_data}
+
+        vm_ref = self.machines.get_reference_by_name(vm_name)
+        self.assertIsInstance(vm_ref, ResourceReference)
+        self.assertIs(vm_ref.resource_cls, machines.VirtualMachine)
+        self.assertEqual(vm_ref.data, resource_data[0])
+        mock_get.assert_called_once_with(url)
+
+    @mock.patch.object(Connection, "get")
+    def test_get_reference_by_id_not_found(self, mock_get):
+        vm_id = "12345"
+        mock_get.return_value = {machines.DATA_FIELD: []}
+
+        with self.assertRaises(exceptions.HPESimpliVityResourceNotFound) as error:
+            self.machines.get_reference_by_id(vm_id)
+
+        self.assertEqual(error.exception.msg, "Resource not found with the id {}".format(vm_id))
+
     def test_get_by_data(self):
         resource_data = {'id': '12345'}
 
@@ -97,6 +122,14 @@ class VirtualMachinesTest(unittest.TestCase):
         self.assertIsInstance(vm_obj, machines.VirtualMachine)
         self.assertEqual(vm_obj.data, resource_data)
 
+    def test_get_by_data_shares_resource_client(self):
+        vm1 = self.machines.get_by_data({'id': '12345'})
+        vm2 = self.machines.get_by_data({'id': '67890'})
+
+        self.assertIs(vm1._client, vm2._client)
+        self.assertIs(vm1._resources, self.machines)
+        self.assertFalse(hasattr(vm1, '__dict__'))
+
     @mock.patch.object(Connection, "post")
     @mock.patch.object(Connection, "get")
     def test_set_policy_for_multiple_vms(self, mock_get, mock_post):
@@ -163,6 +196,33 @@ class VirtualMachinesTest(unittest.TestCase):
         mock_post.assert_called_once_with('/virtual_machines/12345/move',
                                           {'destination_datastore_id': '12345', 'virtual_machine_name': new_vm_name},
                                           custom_headers=None)
+        mock_get.assert_any_call('/datastores?case=sensitive&fields=id%2Cname&limit=1&name=datastorename'
+                                 '&offset=0&order=descending&sort=name')
+
+    @mock.patch.object(Connection, "post")
+    @mock.patch.object(Connection, "get")
+    def test_move_with_datastore_reference(self, mock_get, mock_post):
+        mock_post.return_value = None, [{'object_id': '12345'}]
+        mock_get.return_value = {'virtual_machines': {'id': '12345'}}
+        datastore_ref = ResourceReference({'id': 'ds12345', 'name': 'name'}, datastores.Datastore)
+
+        vm = self.machines.get_by_data({'name': 'name1', 'id': '12345'})
+        vm.move("new_vm_name", datastore_ref)
+
+        mock_post.assert_called_once_with('/virtual_machines/12345/move',
+                                          {'destination_datastore_id': 'ds12345', 'virtual_machine_name': 'new_vm_name'},
+                                          custom_headers=None)
+
+    @mock.patch.object(Connection, "post")
+    def test_move_with_reference_of_other_type(self, mock_post):
+        policy_ref = ResourceReference({'id': 'p12345', 'name': 'name'}, policies.Policy)
+        vm = self.machines.get_by_data({'name': 'name1', 'id': '12345'})
+
+        with self.assertRaises(exceptions.HPESimpliVityException) as error:
+            vm.move("new_vm_name", policy_ref)
+
+        self.assertEqual(error.exception.msg, "Reference to a Policy was passed where a Datastore is expected")
+        mock_post.assert_not_called()
 
     @mock.patch.object(Connection, "post")
     @mock.patch.object(Connection, "get")
@@ -0,0 +1,114 @@
+###
+# (C) Copyright [2019] Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##
+
+import threading
+import unittest
+
+from simplivity import exceptions
+from simplivity.ovc_client import OVC
+from simplivity.testing import inventory
+from simplivity.testing.fake_ovc import FakeOVC
+
+
+class BatchTest(unittest.TestCase):
+    def setUp(self):
+        self.fake = FakeOVC(inventory.build_federation(virtual_machines=20, backups_per_vm=2)).start()
+        self.addCleanup(self.fake.stop)
+        self.ovc = OVC(self.fake.config())
+        self.machines = self.ovc.virtual_machines.get_all()
+
+    def __single_requests(self, operation):
+        return sum(count for request, count in self.fake.requests.items()
+                   if request.startswith("POST /virtual_machines/{") and request.endswith(operation))
+
+    def test_set_policy_calls_are_grouped_by_policy(self):
+        with self.ovc.batch() as batch:
+            futures = [vm.set_policy("policy-{}".format(index % 2)) for index, vm in enumerate(self.machines)]
+
+        self.assertEqual(self.fake.requests["POST /virtual_machines/set_policy"], 2)
+        self.assertEqual(self.__single_requests("/set_policy"), 0)
+        self.assertEqual((batch.operations, batch.requests), (20, 2))
+        for index, (vm, future) in enumerate(zip(self.machines, futures)):
+            self.assertIs(future.result(), vm)
+            self.assertEqual(vm.data["policy_id"], inventory.make_id("policy", index % 2))
+
+    def test_groups_are_split_by_max_size(self):
+        with self.ovc.batch(max_size=8) as batch:
+            for vm in self.machines:
+                vm.set_policy("policy-1")
+
+        self.assertEqual(batch.requests, 3)
+        self.assertEqual({vm.data["policy_id"] for vm in self.machines}, {inventory.make_id("policy", 1)})
+
+    def test_backup_deletions_are_merged(self):
+        backups = self.ovc.backups.get_all(filters={"name": "backup-00000*-0"})
+
+        with self.ovc.batch():
+            futures = [backup.delete() for backup in backups]
+
+        self.assertEqual(self.fake.requests["POST /backups/delete"], 1)
+        self.assertEqual(self.fake.requests.get("DELETE /backups/{id}", 0), 0)
+        self.assertEqual([future.result() for future in futures], [None] * 10)
+        self.assertEqual([backup.data for backup in backups], [None] * 10)
+        self.assertEqual(len(self.fake.get_resources("backups")), 30)
+
+    def test_failed_bulk_request_fails_each_operation(self):
+        with self.ovc.batch():
+            futures = [vm.set_policy("policy-1") for vm in self.machines[:3]]
+            self.fake.error_status = 400
+            self.fake.error_rate = 1.0
+
+        for future in futures:
+            self.assertIsInstance(future.exception(), exceptions.HPESimpliVityException)
+
+    def test_operations_are_cancelled_if_the_block_fails(self):
+        with self.assertRaises(ValueError):
+            with self.ovc.batch():
+                future = self.machines[0].set_policy("policy-1")
+                raise ValueError("failed")
+
+        self.assertTrue(future.cancelled())
+        self.assertEqual(self.fake.requests["POST /virtual_machines/set_policy"], 0)
+
+    def test_operations_outside_a_batch_are_sent(self):
+        with self.ovc.batch():
+            pass
+
+        vm = self.machines[0].set_policy("policy-1")
+
+        self.assertIs(vm, self.machines[0])
+        self.assertEqual(self.__single_requests("/set_policy"), 1)
+
+    def test_operations_of_other_threads_are_sent(self):
+        results = []
+
+        with self.ovc.batch() as batch:
+            thread = threading.Thread(target=lambda: results.append(self.machines[1].set_policy("policy-1")))
+            thread.start()
+            thread.join(10)
+            self.assertEqual(self.__single_requests("/set_policy"), 1)
+
+        self.assertEqual(results, [self.machines[1]])
+        self.assertEqual(batch.operations, 0)
+
+    def test_one_batch_per_connection(self):
+        with self.ovc.batch():
+            with self.assertRaises(exceptions.HPESimpliVityException):
+                self.ovc.batch().__enter__()
+
+
+if __name__ == '__main__':
+    unittest.main()
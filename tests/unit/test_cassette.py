@@ -0,0 +1,113 @@
+###
+# (C) Copyright [2019] Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##
+
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+
+from simplivity import cassette
+from simplivity import exceptions
+from simplivity.cassette import Cassette
+from simplivity.ovc_client import OVC
+from simplivity.testing import inventory
+from simplivity.testing.fake_ovc import FakeOVC, PASSWORD, USERNAME
+
+
+class ScrubTest(unittest.TestCase):
+    def test_scrub_json_body(self):
+        body = '{"access_token": "secret", "expires_in": 3600, "items": [{"guest_password": "p", "name": "vm"}]}'
+
+        self.assertEqual(cassette.scrub_body(body),
+                         '{"access_token": "scrubbed", "expires_in": 3600, "items": [{"guest_password": "scrubbed", "name": "vm"}]}')
+
+    def test_scrub_form_body(self):
+        body = "grant_type=password&username=admin&password=secret"
+
+        self.assertEqual(cassette.scrub_body(body), "grant_type=password&username=scrubbed&password=scrubbed")
+
+    def test_body_without_credentials_is_unchanged(self):
+        body = '{"name":  "vm"}'
+
+        self.assertEqual(cassette.scrub_body(body), body)
+
+
+class CassetteTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.file_name = os.path.join(self.directory, "cassette.json.gz")
+
+        recording = Cassette()
+        with FakeOVC(inventory.build_federation(virtual_machines=20)) as fake:
+            self.ovc_ip = fake.address
+            ovc = OVC(fake.config(cassette=recording))
+            self.recorded_vms = [vm.data for vm in ovc.virtual_machines.get_all(limit=20)]
+            self.recorded_backups = [backup.data for backup in ovc.backups.get_all(stream=True)]
+            ovc.virtual_machines.get_by_name("vm-000001").clone("vm-clone")
+        recording.save(self.file_name)
+
+    def __replay(self, **kwargs):
+        return OVC({"ip": self.ovc_ip, "credentials": {"username": "user", "password": "password"},
+                    "cassette": Cassette.load(self.file_name, **kwargs)})
+
+    def test_credentials_are_scrubbed(self):
+        with gzip.open(self.file_name, 'rt') as cassette_file:
+            content = cassette_file.read()
+
+        self.assertIn('"path": "/oauth/token"', content)
+        self.assertNotIn("password=" + PASSWORD, content)
+        self.assertNotIn(USERNAME, content)
+        self.assertIn('\\"access_token\\": \\"scrubbed\\"', content)
+
+    def test_replay_without_ovc(self):
+        ovc = self.__replay()
+
+        vms = ovc.virtual_machines.get_all(limit=20)
+        backups = list(ovc.backups.get_all(stream=True))
+        clone = ovc.virtual_machines.get_by_name("vm-000001").clone("vm-clone")
+
+        self.assertEqual([vm.data for vm in vms], self.recorded_vms)
+        self.assertEqual([backup.data for backup in backups], self.recorded_backups)
+        self.assertEqual(clone.data["name"], "vm-clone")
+
+    def test_replay_compressed_responses(self):
+        interactions = Cassette.load(self.file_name).interactions
+
+        self.assertTrue(any(interaction["headers"].get("Content-Encoding") == "gzip" for interaction in interactions))
+        self.assertTrue(all("Content-Length" not in interaction["headers"] for interaction in interactions))
+
+        ovc = self.__replay()
+        ovc.virtual_machines.get_all(limit=20)
+
+        self.assertGreater(ovc.connection.transfer_stats.body_bytes, ovc.connection.transfer_stats.wire_bytes)
+
+    def test_request_not_recorded(self):
+        ovc = self.__replay()
+
+        with self.assertRaises(exceptions.HPESimpliVityException):
+            ovc.datastores.get_all(limit=3)
+
+    def test_interactions_have_timings(self):
+        interactions = Cassette.load(self.file_name).interactions
+
+        self.assertTrue(all(interaction["duration"] > 0 for interaction in interactions))
+        self.assertEqual([interaction["method"] for interaction in interactions].count("POST"), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
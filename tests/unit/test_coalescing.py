@@ -0,0 +1,126 @@
+###
+# (C) Copyright [2019] Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##
+
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from simplivity.coalescing import RequestCoalescer
+from simplivity.ovc_client import OVC
+from simplivity.testing.fake_ovc import FakeOVC
+
+THREADS = 8
+
+
+class RequestCoalescerTest(unittest.TestCase):
+    def setUp(self):
+        self.coalescer = RequestCoalescer()
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.calls = []
+
+    def __request(self, result=None, error=None):
+        def request():
+            self.calls.append(1)
+            self.started.set()
+            self.release.wait(5)
+            if error:
+                raise error
+            return result
+
+        return request
+
+    def __call_concurrently(self, key, request):
+        """Makes a call in flight, then identical calls which wait for it."""
+        executor = ThreadPoolExecutor(THREADS)
+        self.addCleanup(executor.shutdown)
+        futures = [executor.submit(self.coalescer.call, key, request)]
+        self.started.wait(5)
+        futures += [executor.submit(self.coalescer.call, key, request) for _ in range(THREADS - 1)]
+        while self.coalescer.coalesced < THREADS - 1:
+            threading.Event().wait(0.001)
+        self.release.set()
+        return futures
+
+    def test_identical_calls_share_one_request(self):
+        futures = self.__call_concurrently("/policies", self.__request({"policies": [{"name": "gold"}]}))
+
+        results = [future.result() for future in futures]
+
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(results, [{"policies": [{"name": "gold"}]}] * THREADS)
+        self.assertEqual((self.coalescer.calls, self.coalescer.coalesced), (1, THREADS - 1))
+
+    def test_callers_get_their_own_copy(self):
+        futures = self.__call_concurrently("/policies", self.__request({"policies": [{"name": "gold"}]}))
+        results = [future.result() for future in futures]
+
+        results[0]["policies"][0]["name"] = "silver"
+
+        self.assertEqual(len(set(id(result) for result in results)), THREADS)
+        self.assertEqual(results[1]["policies"][0]["name"], "gold")
+
+    def test_error_is_raised_in_all_callers(self):
+        futures = self.__call_concurrently("/policies", self.__request(error=ValueError("failed")))
+
+        for future in futures:
+            with self.assertRaises(ValueError):
+                future.result()
+
+    def test_calls_in_sequence_are_all_made(self):
+        self.release.set()
+        for _ in range(3):
+            self.coalescer.call("/policies", self.__request("result"))
+
+        self.assertEqual(len(self.calls), 3)
+        self.assertEqual(self.coalescer.coalesced, 0)
+
+    def test_different_keys_are_not_coalesced(self):
+        self.release.set()
+        self.coalescer.call("/policies?name=gold", self.__request("gold"))
+        self.coalescer.call("/policies?name=silver", self.__request("silver"))
+
+        self.assertEqual(len(self.calls), 2)
+
+
+class ConnectionCoalescingTest(unittest.TestCase):
+    def setUp(self):
+        self.fake = FakeOVC(latency=0.2).start()
+        self.addCleanup(self.fake.stop)
+
+    def __get_concurrently(self, ovc):
+        with ThreadPoolExecutor(THREADS) as executor:
+            return list(executor.map(lambda _: ovc.connection.get("/policies?name=policy-1"), range(THREADS)))
+
+    def test_identical_gets_in_flight_are_coalesced(self):
+        ovc = OVC(self.fake.config())
+
+        bodies = self.__get_concurrently(ovc)
+
+        self.assertEqual(self.fake.requests["GET /policies"], 1)
+        self.assertEqual([body["policies"][0]["name"] for body in bodies], ["policy-1"] * THREADS)
+
+    def test_coalescing_can_be_disabled(self):
+        ovc = OVC(self.fake.config(coalesce_requests=False))
+
+        self.__get_concurrently(ovc)
+
+        self.assertIsNone(ovc.connection.coalescer)
+        self.assertEqual(self.fake.requests["GET /policies"], THREADS)
+
+
+if __name__ == '__main__':
+    unittest.main()
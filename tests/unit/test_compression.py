@@ -0,0 +1,89 @@
+###
+# (C) Copyright [2019] Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##
+
+import gzip
+import unittest
+import zlib
+
+from simplivity import compression
+from simplivity.exceptions import HPESimpliVityException
+
+BODY = b'{"virtual_machines": [' + b','.join([b'{"id": "%d"}' % index for index in range(200)]) + b']}'
+
+
+def chunked(data, size):
+    return [data[index:index + size] for index in range(0, len(data), size)]
+
+
+class ResponseDecoderTest(unittest.TestCase):
+    def test_identity_encoding(self):
+        decoder = compression.ResponseDecoder(None)
+
+        data = decoder.decompress(BODY) + decoder.flush()
+
+        self.assertEqual(data, BODY)
+        self.assertEqual(decoder.stats.wire_bytes, len(BODY))
+        self.assertEqual(decoder.stats.body_bytes, len(BODY))
+        self.assertEqual(decoder.stats.compression_ratio, 1.0)
+
+    def test_gzip_encoding_in_chunks(self):
+        compressed = gzip.compress(BODY)
+        decoder = compression.ResponseDecoder('GZIP')
+
+        data = b''.join(decoder.iter_decompressed(chunked(compressed, 7)))
+
+        self.assertEqual(data, BODY)
+        self.assertEqual(decoder.stats.wire_bytes, len(compressed))
+        self.assertEqual(decoder.stats.body_bytes, len(BODY))
+        self.assertEqual(decoder.stats.saved_bytes, len(BODY) - len(compressed))
+
+    def test_deflate_encoding(self):
+        decoder = compression.ResponseDecoder('deflate')
+
+        data = b''.join(decoder.iter_decompressed(chunked(zlib.compress(BODY), 16)))
+
+        self.assertEqual(data, BODY)
+
+    def test_raw_deflate_encoding(self):
+        compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+        compressed = compressor.compress(BODY) + compressor.flush()
+        decoder = compression.ResponseDecoder('deflate')
+
+        data = b''.join(decoder.iter_decompressed(chunked(compressed, 16)))
+
+        self.assertEqual(data, BODY)
+
+    def test_invalid_gzip_data(self):
+        decoder = compression.ResponseDecoder('gzip')
+
+        with self.assertRaises(HPESimpliVityException) as error:
+            decoder.decompress(b'not compressed data')
+
+        self.assertIn("Failed to decompress the gzip response body", error.exception.msg)
+
+
+class TransferStatsTest(unittest.TestCase):
+    def test_add(self):
+        stats = compression.TransferStats()
+        decoder = compression.ResponseDecoder('gzip')
+        decoder.decompress(gzip.compress(BODY))
+
+        stats.add(decoder.stats)
+        stats.add(decoder.stats)
+
+        self.assertEqual(stats.responses, 2)
+        self.assertEqual(stats.body_bytes, 2 * len(BODY))
+        self.assertGreater(stats.compression_ratio, 1)
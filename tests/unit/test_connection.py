@@ -14,14 +14,20 @@
 # limitations under the License.
 ##
 
+import gzip
 import json
+import socket
 import ssl
+import threading
 import unittest
-from http.client import HTTPException, HTTPSConnection
-from unittest.mock import ANY, Mock, call, patch
+from http.client import HTTPException, HTTPSConnection, RemoteDisconnected
+from unittest.mock import ANY, Mock, PropertyMock, call, patch
 
-from simplivity.connection import Connection
-from simplivity.exceptions import HPESimpliVityException
+from simplivity.connection import Connection, TimedHTTPSConnection
+from simplivity.instrumentation import LatencyHistogram, RequestHook
+from simplivity.retry import RetryPolicy
+from simplivity.throttling import AdaptiveConcurrencyLimiter
+from simplivity.exceptions import HPESimpliVityException, HPESimpliVityServerError
 
 
 class ConnectionTest(unittest.TestCase):
@@ -35,7 +41,8 @@ class ConnectionTest(unittest.TestCase):
         }
         self.default_headers = {'Content-type': 'application/vnd.simplivity.v1.8+json',
                                 'Authorization': 'Bearer 123456789',
-                                'Accept': 'application/json'}
+                                'Accept': 'application/json',
+                                'Accept-Encoding': 'gzip, deflate'}
 
         self.updated_headers = self.default_headers.copy()
         self.updated_headers.update(self.new_content_type)
@@ -45,7 +52,7 @@ class ConnectionTest(unittest.TestCase):
 
         self.error_response_body = {"message": "this is an error message"}
 
-        self.dumped_request_body = json.dumps(self.request_body.copy())
+        self.dumped_request_body = self.connection._json_codec.dumps(self.request_body.copy())
         self.expected_response_body = self.response_body.copy()
 
     def __make_http_response(self, status, response_body=None):
@@ -215,7 +222,7 @@ class ConnectionTest(unittest.TestCase):
 
         mock_request.assert_called_once_with('DELETE',
                                              'https://{}/api/path'.format(self.host),
-                                             json.dumps({}), self.default_headers)
+                                             self.connection._json_codec.dumps({}), self.default_headers)
 
     @patch.object(HTTPSConnection, 'request')
     @patch.object(HTTPSConnection, 'getresponse')
@@ -258,6 +265,13 @@ class ConnectionTest(unittest.TestCase):
             resp, body = self.connection.do_http('POST', '/rest/test', 'body')
         self.assertTrue('please login' in context.exception.msg)
 
+    def test_token_removed_while_building_headers(self):
+        # A logout in another thread removes the token after its first read
+        with patch.object(Connection, '_access_token', new_callable=PropertyMock, side_effect=['123', None]):
+            headers = self.connection._Connection__build_headers(None, False)
+
+        self.assertEqual(headers['Authorization'], 'Bearer 123')
+
     @patch.object(Connection, 'do_http')
     def test_login(self, mock_post):
         mock_post.return_value = (None, {'access_token': '1234567'})
@@ -295,6 +309,466 @@ class ConnectionTest(unittest.TestCase):
 
         self.assertEqual(body, self.expected_response_body)
 
+    @patch.object(Connection, 'login')
+    @patch.object(Connection, 'get_connection')
+    def test_refresh_token_before_it_expires(self, mock_connection, mock_login):
+        mock_conn = mock_connection.return_value = Mock()
+        mock_conn.getresponse.return_value = self.__make_http_response(status=200)
+        self.connection._username = 'username'
+        self.connection._password = 'password'
+
+        with patch.object(self.connection.token_manager, 'is_expiring', return_value=True):
+            self.connection.do_http('GET', '/rest/test', '')
+
+        mock_login.assert_called_once_with('username', 'password')
+        self.assertEqual(mock_conn.request.call_count, 1)
+
+    @patch.object(Connection, 'do_http')
+    def test_login_sets_token_expiry(self, mock_post):
+        mock_post.return_value = (None, {'access_token': '1234567', 'expires_in': 86400})
+
+        self.connection.login('username', 'password')
+
+        self.assertEqual(self.connection.token_manager.token, '1234567')
+        self.assertIsNotNone(self.connection.token_manager.expires_at)
+
+    @patch.object(Connection, 'get_connection')
+    def test_invalid_token_is_retried_only_once(self, mock_connection):
+        mock_conn = mock_connection.return_value = Mock()
+        mock_conn.getresponse.side_effect = [
+            self.__make_http_response(status=401, response_body={'error': 'invalid_token'}),
+            self.__make_http_response(status=401, response_body={'error': 'invalid_token'})]
+
+        with patch.object(Connection, 'login') as mock_login:
+            mock_login.side_effect = lambda username, password: setattr(self.connection, '_access_token', 'new')
+            resp, body = self.connection.do_http('GET', '/rest/test', '')
+
+        mock_login.assert_called_once_with(None, None)
+        self.assertEqual(mock_conn.request.call_count, 2)
+        self.assertEqual(body, {'error': 'invalid_token'})
+
+    @patch.object(Connection, 'get_connection')
+    def test_get_members_yields_members_from_chunks(self, mock_connection):
+        members = [{'id': '1'}, {'id': '2'}]
+        response_body = json.dumps({'count': 2, 'members': members}).encode('utf-8')
+        mock_response = Mock(status=200)
+        mock_response.read.side_effect = [response_body[:10], response_body[10:], b'']
+        mock_conn = mock_connection.return_value = Mock()
+        mock_conn.getresponse.return_value = mock_response
+
+        result = list(self.connection.get_members('/path', 'members', chunk_size=10))
+
+        self.assertEqual(result, members)
+        mock_response.read.assert_called_with(10)
+        mock_conn.close.assert_called_once_with()
+
+    @patch.object(Connection, 'get_connection')
+    def test_get_members_raises_exception_when_status_error(self, mock_connection):
+        mock_conn = mock_connection.return_value = Mock()
+        mock_conn.getresponse.return_value = self.__make_http_response(status=404,
+                                                                       response_body=self.error_response_body)
+
+        with self.assertRaises(HPESimpliVityException) as context:
+            list(self.connection.get_members('/path', 'members'))
+
+        self.assertEqual(context.exception.msg, self.error_response_body['message'])
+        self.assertNotIsInstance(context.exception, HPESimpliVityServerError)
+
+    @patch.object(Connection, 'get_connection')
+    def test_get_members_raises_server_error_when_status_5xx(self, mock_connection):
+        mock_conn = mock_connection.return_value = Mock()
+        mock_conn.getresponse.return_value = self.__make_http_response(status=503,
+                                                                       response_body=self.error_response_body)
+
+        with self.assertRaises(HPESimpliVityServerError):
+            list(self.connection.get_members('/path', 'members'))
+
+    @patch.object(Connection, 'login')
+    @patch.object(Connection, 'get_connection')
+    def test_get_members_login_again_if_token_expired(self, mock_connection, mock_login):
+        mock_invalid_token_response = self.__make_http_response(status=401, response_body={'error': 'invalid_token'})
+        mock_response = Mock(status=200)
+        mock_response.read.side_effect = [b'{"members": [{"id": "1"}]}', b'']
+        mock_conn = mock_connection.return_value = Mock()
+        mock_conn.getresponse.side_effect = [mock_invalid_token_response, mock_response]
+
+        result = list(self.connection.get_members('/path', 'members'))
+
+        self.assertEqual(result, [{'id': '1'}])
+        mock_login.assert_called_once_with(None, None)
+
+    @patch.object(Connection, 'get_connection')
+    def test_get_decompresses_gzip_response(self, mock_connection):
+        response_body = json.dumps(self.response_body).encode('utf-8')
+        compressed_body = gzip.compress(response_body)
+        mock_response = Mock(status=200)
+        mock_response.read.return_value = compressed_body
+        mock_response.getheader.return_value = 'gzip'
+        mock_connection.return_value.getresponse.return_value = mock_response
+
+        body = self.connection.get('/path')
+
+        self.assertEqual(body, self.response_body)
+        mock_response.getheader.assert_called_once_with('Content-Encoding')
+        self.assertEqual(self.connection.last_transfer.wire_bytes, len(compressed_body))
+        self.assertEqual(self.connection.last_transfer.body_bytes, len(response_body))
+        self.assertEqual(self.connection.transfer_stats.responses, 1)
+
+    @patch.object(Connection, 'get_connection')
+    def test_get_members_decompresses_gzip_response(self, mock_connection):
+        members = [{'id': str(index)} for index in range(100)]
+        response_body = json.dumps({'count': 100, 'members': members}).encode('utf-8')
+        compressed_body = gzip.compress(response_body)
+        mock_response = Mock(status=200)
+        mock_response.read.side_effect = [compressed_body[:50], compressed_body[50:], b'']
+        mock_response.getheader.return_value = 'gzip'
+        mock_connection.return_value.getresponse.return_value = mock_response
+
+        result = list(self.connection.get_members('/path', 'members', chunk_size=50))
+
+        self.assertEqual(result, members)
+        self.assertEqual(self.connection.last_transfer.wire_bytes, len(compressed_body))
+        self.assertEqual(self.connection.last_transfer.body_bytes, len(response_body))
+
+    @patch.object(HTTPSConnection, 'request')
+    @patch.object(HTTPSConnection, 'getresponse')
+    def test_post_without_accept_encoding(self, mock_response, mock_request):
+        connection = Connection(self.host, accept_encoding=False)
+        connection._access_token = "123456789"
+        mock_response.return_value = self.__make_http_response(status=200)
+
+        connection.post('/path', self.request_body)
+
+        expected_headers = self.default_headers.copy()
+        del expected_headers['Accept-Encoding']
+        mock_request.assert_called_once_with('POST', ANY, ANY, expected_headers)
+
+    def __make_keep_alive_response(self, status=200):
+        mock_response = self.__make_http_response(status)
+        mock_response.will_close = False
+        mock_response.isclosed.return_value = True
+        mock_response.getheader.return_value = None
+        return mock_response
+
+    @patch.object(Connection, 'get_connection')
+    def test_kept_alive_connection_is_reused(self, mock_connection):
+        mock_conn = mock_connection.return_value = Mock()
+        mock_conn.getresponse.side_effect = [self.__make_keep_alive_response(), self.__make_keep_alive_response()]
+
+        self.connection.get('/path')
+        self.connection.get('/path')
+
+        mock_connection.assert_called_once_with()
+        self.assertEqual(mock_conn.request.call_count, 2)
+        mock_conn.close.assert_not_called()
+
+        self.connection.close()
+        mock_conn.close.assert_called_once_with()
+
+    @patch.object(Connection, 'get_connection')
+    def test_connection_not_reused_when_response_closes_it(self, mock_connection):
+        mock_response = self.__make_keep_alive_response()
+        mock_response.will_close = True
+        mock_connection.return_value.getresponse.return_value = mock_response
+
+        self.connection.get('/path')
+        self.connection.get('/path')
+
+        self.assertEqual(mock_connection.call_count, 2)
+
+    @patch.object(Connection, 'get_connection')
+    def test_stale_connection_is_replaced(self, mock_connection):
+        stale_conn = Mock()
+        stale_conn.getresponse.side_effect = [self.__make_keep_alive_response(),
+                                              RemoteDisconnected('Remote end closed connection')]
+        new_conn = Mock()
+        new_conn.getresponse.return_value = self.__make_http_response(status=200)
+        mock_connection.side_effect = [stale_conn, new_conn]
+
+        self.connection.get('/path')
+        body = self.connection.get('/path')
+
+        self.assertEqual(body, self.response_body)
+        stale_conn.close.assert_called_once_with()
+        new_conn.request.assert_called_once_with('GET', ANY, '', ANY)
+
+    @patch.object(Connection, 'get_connection')
+    def test_stale_connection_post_is_not_sent_again(self, mock_connection):
+        stale_conn = Mock()
+        stale_conn.getresponse.side_effect = [self.__make_keep_alive_response(),
+                                              RemoteDisconnected('Remote end closed connection')]
+        mock_connection.side_effect = [stale_conn, Mock()]
+
+        self.connection.get('/path')
+        with self.assertRaises(HPESimpliVityException):
+            self.connection.post('/path', self.request_body)
+
+        self.assertEqual(mock_connection.call_count, 1)
+        stale_conn.close.assert_called_once_with()
+
+    @patch.object(Connection, 'get_connection')
+    def test_stale_connection_post_is_sent_again_when_not_sent(self, mock_connection):
+        stale_conn = Mock()
+        stale_conn.getresponse.return_value = self.__make_keep_alive_response()
+        stale_conn.request.side_effect = [None, BrokenPipeError()]
+        new_conn = Mock()
+        new_conn.getresponse.return_value = self.__make_http_response(status=200)
+        mock_connection.side_effect = [stale_conn, new_conn]
+
+        self.connection.get('/path')
+        self.connection.post('/path', self.request_body)
+
+        new_conn.request.assert_called_once_with('POST', ANY, ANY, ANY)
+
+    @patch.object(Connection, 'get_connection')
+    def test_connection_closed_on_socket_timeout(self, mock_connection):
+        mock_conn = mock_connection.return_value
+        mock_conn.getresponse.side_effect = socket.timeout('timed out')
+
+        with self.assertRaises(socket.timeout):
+            self.connection.get('/path')
+
+        mock_conn.close.assert_called_once_with()
+
+    @patch.object(Connection, 'get_connection')
+    def test_new_connection_error_is_not_retried(self, mock_connection):
+        mock_connection.return_value.getresponse.side_effect = RemoteDisconnected('Remote end closed connection')
+
+        with self.assertRaises(HPESimpliVityException):
+            self.connection.get('/path')
+
+        mock_connection.assert_called_once_with()
+
+    @patch.object(Connection, 'login')
+    @patch.object(Connection, 'get_connection')
+    def test_shared_connection_logs_in_once_for_all_threads(self, mock_connection, mock_login):
+        barrier = threading.Barrier(8)
+        self.connection._username = 'username'
+        self.connection._password = 'password'
+
+        def make_connection():
+            mock_conn = Mock()
+            mock_conn.request.side_effect = lambda method, path, body, headers: mock_conn.getresponse.configure_mock(
+                return_value=self.__make_keep_alive_response() if headers['Authorization'] == 'Bearer new token'
+                else self.__make_http_response(status=401, response_body={'error': 'invalid_token'}))
+            return mock_conn
+
+        mock_connection.side_effect = make_connection
+        mock_login.side_effect = lambda username, password: setattr(self.connection, '_access_token', 'new token')
+        results = []
+
+        def worker():
+            barrier.wait(timeout=5)
+            results.append(self.connection.get('/path'))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        mock_login.assert_called_once_with('username', 'password')
+        self.assertEqual(results, [self.response_body] * 8)
+
+    @patch.object(Connection, 'get_connection')
+    def test_server_error_shrinks_concurrency_limit(self, mock_connection):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=8)
+        connection = Connection(self.host, concurrency_limiter=limiter)
+        connection._access_token = "123456789"
+        mock_connection.return_value.getresponse.return_value = self.__make_http_response(
+            status=503, response_body=self.error_response_body)
+
+        with self.assertRaises(HPESimpliVityException):
+            connection.get('/path')
+
+        self.assertEqual(limiter.limit, 4)
+        self.assertEqual(limiter.in_flight, 0)
+
+    @patch.object(Connection, 'get_connection')
+    def test_network_error_shrinks_concurrency_limit(self, mock_connection):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=8)
+        connection = Connection(self.host, concurrency_limiter=limiter)
+        connection._access_token = "123456789"
+        mock_connection.return_value.getresponse.side_effect = HTTPException('timed out')
+
+        with self.assertRaises(HPESimpliVityException):
+            connection.get('/path')
+
+        self.assertEqual(limiter.limit, 4)
+        self.assertEqual(limiter.in_flight, 0)
+
+    @patch.object(Connection, 'get_connection')
+    def test_stream_releases_concurrency_slot(self, mock_connection):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=8)
+        connection = Connection(self.host, concurrency_limiter=limiter)
+        connection._access_token = "123456789"
+        mock_response = Mock(status=200)
+        mock_response.read.side_effect = [b'{"members": [{"id": "1"}, {"id": "2"}]}', b'']
+        mock_connection.return_value.getresponse.return_value = mock_response
+
+        members = connection.get_members('/path', 'members')
+        next(members)
+        self.assertEqual(limiter.in_flight, 0)
+        members.close()
+
+        self.assertEqual(limiter.in_flight, 0)
+        self.assertEqual(limiter.limit, 8)
+
+    @patch.object(Connection, 'get_connection')
+    def test_request_made_while_iterating_a_stream_at_limit_one(self, mock_connection):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1, max_limit=1)
+        connection = Connection(self.host, concurrency_limiter=limiter)
+        connection._access_token = "123456789"
+        stream_response = Mock(status=200)
+        stream_response.read.side_effect = [b'{"members": [{"id": "1"}, {"id": "2"}]}', b'']
+        get_response = Mock(status=200)
+        get_response.read.return_value = b'{"id": "1", "name": "vm"}'
+        mock_connection.return_value.getresponse.side_effect = [stream_response, get_response]
+        results = []
+
+        def iterate():
+            for member in connection.get_members('/path', 'members'):
+                results.append(connection.get('/path/' + member['id']) if not results else member)
+
+        thread = threading.Thread(target=iterate, daemon=True)
+        thread.start()
+        thread.join(5)
+
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(results, [{"id": "1", "name": "vm"}, {"id": "2"}])
+        self.assertEqual(limiter.in_flight, 0)
+
+    @patch('simplivity.connection.time.sleep')
+    @patch.object(Connection, 'get_connection')
+    def test_retry_policy_retries_get_on_service_unavailable(self, mock_connection, mock_sleep):
+        policy = RetryPolicy(backoff=1, jitter=False)
+        connection = Connection(self.host, retry_policy=policy)
+        connection._access_token = "123456789"
+        mock_connection.return_value.getresponse.side_effect = [
+            self.__make_http_response(status=503, response_body=self.error_response_body),
+            socket.timeout('timed out'),
+            self.__make_http_response(status=200)]
+
+        body = connection.get('/path')
+
+        self.assertEqual(body, self.response_body)
+        self.assertEqual([call[0][0] for call in mock_sleep.call_args_list], [1, 2])
+        self.assertEqual(policy.stats.retries, 2)
+        self.assertEqual(policy.stats.recovered, 1)
+
+    @patch('simplivity.connection.time.sleep')
+    @patch.object(Connection, 'get_connection')
+    def test_retry_policy_does_not_retry_post_by_default(self, mock_connection, mock_sleep):
+        connection = Connection(self.host, retry_policy=RetryPolicy())
+        connection._access_token = "123456789"
+        mock_connection.return_value.getresponse.side_effect = HTTPException('timed out')
+
+        with self.assertRaises(HPESimpliVityException):
+            connection.post('/path', self.request_body)
+
+        mock_sleep.assert_not_called()
+        self.assertEqual(mock_connection.return_value.request.call_count, 1)
+
+    @patch('simplivity.connection.time.sleep')
+    @patch.object(Connection, 'get_connection')
+    def test_retry_policy_gives_up_after_max_attempts(self, mock_connection, mock_sleep):
+        policy = RetryPolicy(max_attempts=2)
+        connection = Connection(self.host, retry_policy=policy)
+        connection._access_token = "123456789"
+        mock_connection.return_value.getresponse.side_effect = HTTPException('timed out')
+
+        with self.assertRaises(HPESimpliVityException):
+            connection.get('/path')
+
+        self.assertEqual(mock_connection.return_value.request.call_count, 2)
+        self.assertEqual(policy.stats.exhausted, 1)
+
+    @patch('simplivity.connection.time.sleep')
+    @patch.object(Connection, 'get_connection')
+    def test_retry_policy_retries_listing_stream(self, mock_connection, mock_sleep):
+        connection = Connection(self.host, retry_policy=RetryPolicy())
+        connection._access_token = "123456789"
+        mock_response = Mock(status=200)
+        mock_response.read.side_effect = [b'{"members": [{"id": "1"}]}', b'']
+        mock_connection.return_value.getresponse.side_effect = [
+            self.__make_http_response(status=502, response_body=self.error_response_body), mock_response]
+
+        self.assertEqual(list(connection.get_members('/path', 'members')), [{'id': '1'}])
+
+    @patch.object(Connection, 'get_connection')
+    def test_hooks_receive_request_timings(self, mock_connection):
+        hook = Mock(spec=RequestHook)
+        connection = Connection(self.host, hooks=[hook])
+        connection._access_token = "123456789"
+        mock_connection.return_value.getresponse.return_value = self.__make_http_response(status=200)
+
+        connection.get('/virtual_machines/4230-a8c1')
+
+        request = hook.on_request_start.call_args[0][0]
+        hook.on_response.assert_called_once_with(request, mock_connection.return_value.getresponse.return_value)
+        hook.on_error.assert_not_called()
+        self.assertEqual(request.status, 200)
+        self.assertEqual(request.template, '/virtual_machines/{id}')
+        self.assertEqual(sorted(request.timings), ['decode', 'read', 'send', 'wait'])
+
+    @patch.object(Connection, 'get_connection')
+    def test_hooks_receive_errors(self, mock_connection):
+        hook = Mock(spec=RequestHook)
+        connection = Connection(self.host, hooks=[hook])
+        connection._access_token = "123456789"
+        error = HTTPException('timed out')
+        mock_connection.return_value.getresponse.side_effect = error
+
+        with self.assertRaises(HPESimpliVityException):
+            connection.get('/path')
+
+        hook.on_response.assert_not_called()
+        self.assertIs(hook.on_error.call_args[0][1].__cause__, error)
+
+    @patch.object(Connection, 'get_connection')
+    def test_failing_hook_does_not_fail_request(self, mock_connection):
+        hook = Mock(spec=RequestHook)
+        hook.on_response.side_effect = ValueError('broken hook')
+        histogram = LatencyHistogram()
+        connection = Connection(self.host, hooks=[hook, histogram])
+        connection._access_token = "123456789"
+        mock_connection.return_value.getresponse.return_value = self.__make_http_response(status=200)
+
+        self.assertEqual(connection.get('/hosts'), self.response_body)
+        self.assertEqual(histogram.get('GET', '/hosts').count, 1)
+
+    @patch.object(Connection, 'get_connection')
+    def test_hooks_receive_listing_stream(self, mock_connection):
+        histogram = LatencyHistogram()
+        connection = Connection(self.host)
+        connection.hooks.append(histogram)
+        connection._access_token = "123456789"
+        mock_response = Mock(status=200)
+        mock_response.read.side_effect = [b'{"members": [{"id": "1"}]}', b'']
+        mock_connection.return_value.getresponse.return_value = mock_response
+
+        list(connection.get_members('/backups?offset=0', 'members'))
+
+        self.assertEqual(histogram.get('GET', '/backups').count, 1)
+
+    @patch.object(TimedHTTPSConnection, 'getresponse')
+    @patch.object(TimedHTTPSConnection, 'request')
+    def test_connect_time_recorded_for_new_connection(self, mock_request, mock_response):
+        def request(*args):
+            connection.connect_duration = 0.25
+        mock_request.side_effect = request
+        mock_response.return_value = self.__make_http_response(status=200)
+        connection = self.connection.get_connection()
+        hook = Mock(spec=RequestHook)
+        self.connection.hooks.append(hook)
+
+        with patch.object(Connection, 'get_connection', return_value=connection):
+            self.connection.get('/path')
+
+        timings = hook.on_response.call_args[0][0].timings
+        self.assertEqual(timings['connect'], 0.25)
+        self.assertEqual(connection.connect_duration, 0)
+
     def test_logout(self):
         self.connection.logout()
 
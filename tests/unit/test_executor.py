@@ -0,0 +1,85 @@
+###
+# (C) Copyright [2019] Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##
+
+import threading
+import time
+import unittest
+
+from simplivity.exceptions import HPESimpliVityException
+from simplivity.executor import Executor
+
+
+class ExecutorTest(unittest.TestCase):
+    def setUp(self):
+        self.executor = Executor(max_in_flight=2)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def test_map_isolates_errors(self):
+        def create_backup(name):
+            if name == 'vm2':
+                raise HPESimpliVityException("Backup failed")
+            return name + '-backup'
+
+        results = self.executor.map(create_backup, ['vm1', 'vm2', 'vm3'])
+
+        self.assertEqual([result.item for result in results], ['vm1', 'vm2', 'vm3'])
+        self.assertEqual([result.ok for result in results], [True, False, True])
+        self.assertEqual(results[0].result, 'vm1-backup')
+        self.assertEqual(results[1].error.msg, "Backup failed")
+
+    def test_map_reports_progress(self):
+        progress = []
+
+        self.executor.map(str, range(5), progress=lambda done, total, result: progress.append((done, total)))
+
+        self.assertEqual(progress, [(done, 5) for done in range(1, 6)])
+
+    def test_map_limits_calls_in_flight(self):
+        lock = threading.Lock()
+        running = [0]
+        peak = [0]
+
+        def call(item):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.01)
+            with lock:
+                running[0] -= 1
+
+        self.executor.map(call, range(10), max_workers=8)
+
+        self.assertEqual(peak[0], 2)
+
+    def test_map_with_rate_limit(self):
+        start = time.monotonic()
+
+        self.executor.map(str, range(3), rate_limit=20)
+
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+    def test_submit(self):
+        future = self.executor.submit(pow, 2, 10)
+
+        self.assertEqual(future.result(timeout=5), 1024)
+
+    def test_submit_propagates_exception(self):
+        future = self.executor.submit(int, 'not a number')
+
+        with self.assertRaises(ValueError):
+            future.result(timeout=5)
@@ -0,0 +1,126 @@
+###
+# (C) Copyright [2019] Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##
+
+import time
+import unittest
+
+from simplivity import exceptions
+from simplivity.ovc_client import OVC
+from simplivity.testing import inventory
+from simplivity.testing.fake_ovc import FakeOVC
+
+
+class InventoryTest(unittest.TestCase):
+    def test_sizes(self):
+        federation = inventory.build_federation(clusters=3, hosts_per_cluster=2, virtual_machines=10, backups_per_vm=3)
+
+        self.assertEqual(len(federation['omnistack_clusters']), 3)
+        self.assertEqual(len(federation['hosts']), 6)
+        self.assertEqual(len(federation['virtual_machines']), 10)
+        self.assertEqual(len(federation['backups']), 30)
+
+    def test_ids_are_stable(self):
+        self.assertEqual(inventory.build_federation(virtual_machines=5), inventory.build_federation(virtual_machines=5))
+        self.assertEqual(inventory.build_federation()['virtual_machines'][7]['id'], inventory.make_id('vm', 7))
+
+
+class FakeOVCTest(unittest.TestCase):
+    def setUp(self):
+        self.fake = FakeOVC(inventory.build_federation(virtual_machines=30, backups_per_vm=2), seed=1).start()
+        self.addCleanup(self.fake.stop)
+        self.ovc = OVC(self.fake.config())
+
+    def test_login_with_bad_credentials(self):
+        config = self.fake.config(credentials={"username": "administrator@vsphere.local", "password": "wrong"})
+
+        with self.assertRaises(exceptions.HPESimpliVityException):
+            OVC(config)
+
+    def test_get_all_with_limit_and_offset(self):
+        vms = self.ovc.virtual_machines.get_all(limit=10, offset=25, sort='name', order='ascending')
+
+        self.assertEqual([vm.data['name'] for vm in vms], ['vm-000025', 'vm-000026', 'vm-000027', 'vm-000028', 'vm-000029'])
+
+    def test_get_all_with_pagination(self):
+        pages = self.ovc.virtual_machines.get_all(pagination=True, page_size=8, limit=30)
+        names = [vm.data['name'] for vm in pages.data['resources']]
+        while pages.data['page'] < pages.data['requested_pages']:
+            names.extend(vm.data['name'] for vm in pages.next_page()['resources'])
+
+        self.assertEqual(len(names), 30)
+        self.assertEqual(len(set(names)), 30)
+
+    def test_filters_with_wildcards_and_case(self):
+        self.assertEqual(len(self.ovc.virtual_machines.get_all(filters={'name': 'vm-00001*'})), 10)
+        self.assertEqual(len(self.ovc.virtual_machines.get_all(filters={'name': 'VM-000001,VM-000002'}, case_sensitive=False)), 2)
+        self.assertEqual(self.ovc.virtual_machines.get_all(filters={'name': 'VM-000001'}), [])
+
+    def test_get_by_id_and_missing_resource(self):
+        vm_id = inventory.make_id('vm', 4)
+
+        self.assertEqual(self.ovc.virtual_machines.get_by_id(vm_id).data['name'], 'vm-000004')
+        with self.assertRaises(exceptions.HPESimpliVityResourceNotFound):
+            self.ovc.virtual_machines.get_by_id('unknown')
+
+    def test_mutation_runs_a_task(self):
+        vm = self.ovc.virtual_machines.get_by_name('vm-000003')
+
+        clone = vm.clone('vm-clone')
+
+        self.assertEqual(clone.data['name'], 'vm-clone')
+        self.assertEqual(len(self.fake.get_resources('virtual_machines')), 31)
+        self.assertEqual(self.ovc.task_stats.get('POST /virtual_machines/{id}/clone').count, 1)
+
+    def test_task_is_in_progress_until_its_duration(self):
+        self.fake.task_duration = 60
+        vm = self.ovc.virtual_machines.get_by_name('vm-000003')
+
+        task, _ = self.ovc.connection.post('/virtual_machines/{}/clone'.format(vm.data['id']), {"virtual_machine_name": "vm-clone"})
+        task = self.ovc.connection.get('/tasks/{}'.format(task['task']['id']))
+
+        self.assertEqual(task['task']['state'], 'IN_PROGRESS')
+
+    def test_delete_removes_the_resource(self):
+        backup = self.ovc.backups.get_by_name('backup-000001-0')
+
+        backup.delete()
+
+        self.assertEqual(len(self.fake.get_resources('backups')), 59)
+
+    def test_injected_errors_are_retried(self):
+        self.fake.error_rate = 0.5
+        ovc = OVC(self.fake.config(retry={"max_attempts": 10, "backoff": 0, "jitter": False}))
+
+        self.assertEqual(len(ovc.hosts.get_all()), 6)
+        self.assertGreater(ovc.connection.retry_policy.stats.retries, 0)
+
+    def test_injected_latency(self):
+        self.fake.latency = 0.05
+        started = time.monotonic()
+
+        self.ovc.hosts.get_all()
+
+        self.assertGreaterEqual(time.monotonic() - started, 0.05)
+
+    def test_revoked_token_is_renewed(self):
+        self.fake.revoke_tokens()
+
+        self.assertEqual(len(self.ovc.policies.get_all()), 4)
+        self.assertEqual(self.fake.requests['POST /oauth/token'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
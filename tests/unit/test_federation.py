@@ -0,0 +1,265 @@
+###
+# (C) Copyright [2019] Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##
+
+import http.client
+import unittest
+from unittest import mock
+
+from simplivity import exceptions
+from simplivity import federation
+from simplivity.connection import Connection
+from simplivity.federation import FederatedConnection, FederationClient
+from simplivity.resources.virtual_machines import VirtualMachines
+
+
+class FederatedConnectionTest(unittest.TestCase):
+    def setUp(self):
+        self.connections = [self.__make_connection("10.0.0.{}".format(index)) for index in range(1, 4)]
+        self.federated = FederatedConnection(self.connections)
+
+    @staticmethod
+    def __make_connection(ip):
+        connection = mock.Mock()
+        connection._ovc_ip = ip
+        connection.do_http.return_value = (mock.Mock(status=200), {"ip": ip})
+        return connection
+
+    def test_unknown_routing(self):
+        with self.assertRaises(exceptions.HPESimpliVityException):
+            FederatedConnection(self.connections, routing="random")
+
+    def test_login_logs_in_to_all_ovcs(self):
+        self.federated.login("user", "password")
+
+        for connection in self.connections:
+            connection.login.assert_called_once_with("user", "password")
+
+    def test_round_robin_reads(self):
+        ips = [self.federated.get("/hosts")["ip"] for _ in range(6)]
+
+        self.assertEqual(ips, ["10.0.0.1", "10.0.0.2", "10.0.0.3"] * 2)
+
+    def test_least_latency_reads(self):
+        federated = FederatedConnection(self.connections, routing=federation.LEAST_LATENCY)
+        federated.members[0].latency = 0.5
+        federated.members[1].latency = 0.1
+        federated.members[2].latency = 0.3
+
+        self.assertEqual(federated.get("/hosts")["ip"], "10.0.0.2")
+
+    def test_least_latency_tries_unmeasured_ovcs_first(self):
+        federated = FederatedConnection(self.connections, routing=federation.LEAST_LATENCY)
+        federated.members[0].latency = 0.1
+
+        self.assertEqual(federated.get("/hosts")["ip"], "10.0.0.2")
+        self.assertIsNotNone(federated.members[1].latency)
+
+    def test_read_fails_over_on_network_error(self):
+        error = exceptions.HPESimpliVityException("failed")
+        error.__cause__ = http.client.RemoteDisconnected()
+        self.connections[0].do_http.side_effect = error
+
+        self.assertEqual(self.federated.get("/hosts")["ip"], "10.0.0.2")
+        self.assertFalse(self.federated.members[0].is_healthy())
+
+    def test_read_fails_over_on_server_error(self):
+        self.connections[0].do_http.return_value = (mock.Mock(status=503), {})
+
+        self.assertEqual(self.federated.get("/hosts")["ip"], "10.0.0.2")
+
+    def test_failed_ovc_is_skipped(self):
+        self.connections[0].do_http.side_effect = ConnectionResetError()
+        self.federated.get("/hosts")
+
+        ips = [self.federated.get("/hosts")["ip"] for _ in range(4)]
+
+        self.assertNotIn("10.0.0.1", ips)
+        self.assertEqual(self.connections[0].do_http.call_count, 1)
+
+    def test_read_does_not_fail_over_on_client_error(self):
+        self.connections[0].do_http.return_value = (mock.Mock(status=404), {"message": "not found"})
+
+        with self.assertRaises(exceptions.HPESimpliVityException):
+            self.federated.get("/hosts/missing")
+
+        self.connections[1].do_http.assert_not_called()
+
+    def test_read_fails_when_all_ovcs_fail(self):
+        for connection in self.connections:
+            connection.do_http.side_effect = ConnectionResetError()
+
+        with self.assertRaises(exceptions.HPESimpliVityException) as error:
+            self.federated.get("/hosts")
+
+        self.assertIn("10.0.0.3", error.exception.msg)
+
+    def test_get_members_fails_over_before_first_member(self):
+        self.connections[0].get_members.side_effect = lambda *args, **kwargs: self.__fail_listing()
+        self.connections[1].get_members.return_value = iter([{"id": "1"}, {"id": "2"}])
+
+        members = list(self.federated.get_members("/hosts", "hosts"))
+
+        self.assertEqual(members, [{"id": "1"}, {"id": "2"}])
+
+    def test_get_members_fails_over_on_server_error(self):
+        self.connections[0].get_members.side_effect = lambda *args, **kwargs: self.__fail_listing(
+            exceptions.HPESimpliVityServerError({"message": "Service Unavailable"}))
+        self.connections[1].get_members.return_value = iter([{"id": "1"}])
+
+        members = list(self.federated.get_members("/hosts", "hosts"))
+
+        self.assertEqual(members, [{"id": "1"}])
+        self.assertFalse(self.federated.members[0].is_healthy())
+
+    def test_get_members_does_not_fail_over_on_client_error(self):
+        self.connections[0].get_members.side_effect = lambda *args, **kwargs: self.__fail_listing(
+            exceptions.HPESimpliVityException({"message": "Bad Request"}))
+
+        with self.assertRaises(exceptions.HPESimpliVityException):
+            list(self.federated.get_members("/hosts", "hosts"))
+
+        self.connections[1].get_members.assert_not_called()
+
+    @staticmethod
+    def __fail_listing(error=None):
+        raise error or ConnectionResetError()
+        yield
+
+    def test_writes_go_to_the_first_ovc(self):
+        for connection in self.connections:
+            connection.post.return_value = (None, {})
+
+        self.federated.post("/hosts/1/remove_from_federation", {})
+        self.federated.post("/hosts/2/remove_from_federation", {})
+
+        self.assertEqual(self.connections[0].post.call_count, 2)
+        self.connections[1].post.assert_not_called()
+
+    def test_write_fails_over_when_not_sent(self):
+        self.connections[0].post.side_effect = ConnectionRefusedError()
+        self.connections[1].post.return_value = (None, {"ip": "10.0.0.2"})
+
+        task, body = self.federated.post("/policies", {})
+
+        self.assertEqual(body["ip"], "10.0.0.2")
+
+    def test_write_not_resent_after_network_error(self):
+        self.connections[0].post.side_effect = ConnectionResetError()
+
+        with self.assertRaises(ConnectionResetError):
+            self.federated.post("/policies", {})
+
+        self.connections[1].post.assert_not_called()
+
+    def test_task_polled_on_the_ovc_which_started_it(self):
+        task = {"task": {"id": "task-1", "state": "IN_PROGRESS"}}
+        self.connections[0].delete.return_value = (task, task)
+
+        self.federated.delete("/backups/1")
+        ips = [self.federated.get("/tasks/task-1")["ip"] for _ in range(3)]
+
+        self.assertEqual(ips, ["10.0.0.1"] * 3)
+
+    def test_task_unpinned_when_it_ends(self):
+        task = {"task": {"id": "task-1", "state": "IN_PROGRESS"}}
+        self.connections[0].delete.return_value = (task, task)
+        self.connections[0].do_http.return_value = (mock.Mock(status=200), {"task": {"id": "task-1", "state": "COMPLETED"}})
+
+        self.federated.delete("/backups/1")
+        self.federated.get("/tasks/task-1")
+        self.federated.get("/tasks/task-1")
+
+        self.assertEqual(sum(connection.do_http.call_count for connection in self.connections), 2)
+        self.assertEqual(self.federated._task_members, {})
+
+    @mock.patch.object(federation, 'MAX_TASK_MEMBERS', 2)
+    def test_oldest_pinned_tasks_are_dropped(self):
+        for index in range(3):
+            task = {"task": {"id": "task-{}".format(index), "state": "IN_PROGRESS"}}
+            self.connections[0].delete.return_value = (task, task)
+            self.federated.delete("/backups/{}".format(index))
+
+        self.assertEqual(list(self.federated._task_members), ["task-1", "task-2"])
+
+    def test_task_started_by_another_client_is_found(self):
+        self.connections[0].do_http.return_value = (mock.Mock(status=404), {"message": "Not found"})
+        self.connections[1].do_http.return_value = (mock.Mock(status=200), {"task": {"id": "task-1", "state": "IN_PROGRESS"}})
+        self.connections[2].do_http.return_value = (mock.Mock(status=404), {"message": "Not found"})
+
+        for _ in range(3):
+            self.federated.get("/tasks/task-1")
+
+        self.assertEqual(self.federated.get_task_ovc("task-1"), "10.0.0.2")
+        self.assertEqual(self.connections[1].do_http.call_count, 3)
+        self.assertTrue(all(member.is_healthy() for member in self.federated.members))
+
+    def test_unknown_task_is_not_found(self):
+        for connection in self.connections:
+            connection.do_http.return_value = (mock.Mock(status=404), {"message": "Not found"})
+
+        with self.assertRaises(exceptions.HPESimpliVityException):
+            self.federated.get("/tasks/task-1")
+
+        self.assertEqual(sum(connection.do_http.call_count for connection in self.connections), 3)
+
+    def test_task_pinned_to_an_ovc(self):
+        self.assertTrue(self.federated.pin_task("task-1", "10.0.0.3"))
+        self.assertFalse(self.federated.pin_task("task-2", "10.0.0.9"))
+
+        ips = [self.federated.get("/tasks/task-1")["ip"] for _ in range(3)]
+
+        self.assertEqual(ips, ["10.0.0.3"] * 3)
+
+    def test_task_not_failed_over(self):
+        task = {"task": {"id": "task-1", "state": "IN_PROGRESS"}}
+        self.connections[0].delete.return_value = (task, task)
+        self.connections[0].do_http.side_effect = ConnectionResetError()
+        self.federated.delete("/backups/1")
+
+        with self.assertRaises(exceptions.HPESimpliVityException):
+            self.federated.get("/tasks/task-1")
+
+        self.connections[1].do_http.assert_not_called()
+
+
+class FederationClientTest(unittest.TestCase):
+    @mock.patch.object(Connection, 'login')
+    def setUp(self, mock_login):
+        config = {"ips": ["10.0.0.1", "10.0.0.2"],
+                  "routing": "least_latency",
+                  "credentials": {
+                      "username": "simplivity",
+                      "password": "root"}}
+
+        self._client = FederationClient(config)
+        self._mock_login = mock_login
+
+    def test_logs_in_to_each_ovc(self):
+        self.assertEqual(self._mock_login.call_count, 2)
+
+    def test_creates_one_connection_per_ovc(self):
+        members = self._client.connection.members
+
+        self.assertEqual([member.ovc_ip for member in members], ["10.0.0.1", "10.0.0.2"])
+        self.assertIsInstance(members[0].connection, Connection)
+
+    def test_resources_use_the_federated_connection(self):
+        self.assertIsInstance(self._client.virtual_machines, VirtualMachines)
+        self.assertIsInstance(self._client.virtual_machines._connection, FederatedConnection)
+
+    def test_ips_required(self):
+        with self.assertRaises(exceptions.HPESimpliVityException):
+            FederationClient({"ip": "10.0.0.1"})
@@ -0,0 +1,101 @@
+###
+# (C) Copyright [2019] Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##
+
+import gc
+import unittest
+
+from simplivity.identity_map import IdentityMap
+from simplivity.ovc_client import OVC
+from simplivity.resources.virtual_machines import VirtualMachines
+from simplivity.testing import inventory
+from simplivity.testing.fake_ovc import FakeOVC
+
+
+class IdentityMapTest(unittest.TestCase):
+    def setUp(self):
+        self.fake = FakeOVC(inventory.build_federation(virtual_machines=20, backups_per_vm=2)).start()
+        self.addCleanup(self.fake.stop)
+        self.ovc = OVC(self.fake.config(identity_map=True))
+        self.identity_map = self.ovc.connection.identity_map
+
+    def test_one_object_per_resource_id(self):
+        machines = self.ovc.virtual_machines.get_all()
+        machine = self.ovc.virtual_machines.get_by_name('vm-000003')
+
+        self.assertIs(machine, self.ovc.virtual_machines.get_by_id(machine.data['id']))
+        self.assertIn(machine, machines)
+        self.assertIs(self.identity_map.get(VirtualMachines, machine.data['id']), machine)
+        self.assertEqual(self.identity_map.hits, 2)
+
+    def test_listing_updates_the_live_object(self):
+        machine = self.ovc.virtual_machines.get_by_name('vm-000003')
+        OVC(self.fake.config()).virtual_machines.get_by_name('vm-000003').set_policy('policy-0')
+
+        self.ovc.virtual_machines.get_all()
+
+        self.assertEqual(machine.data['policy_id'], inventory.make_id('policy', 0))
+
+    def test_refresh_updates_the_live_object(self):
+        machine = self.ovc.virtual_machines.get_by_name('vm-000003')
+        other = self.ovc.virtual_machines.get_all(filters={'name': 'vm-000003'})[0]
+
+        other.set_policy('policy-0')
+
+        self.assertIs(machine, other)
+        self.assertEqual(machine.data['policy_id'], inventory.make_id('policy', 0))
+
+    def test_partial_listing_keeps_the_known_fields(self):
+        machine = self.ovc.virtual_machines.get_by_name('vm-000003')
+        requests = self.fake.requests['GET /virtual_machines']
+
+        references = self.ovc.virtual_machines.get_all(filters={'name': 'vm-000003'}, fields='id,name')
+
+        self.assertIs(references[0], machine)
+        self.assertEqual(machine.data['datastore_id'], inventory.make_id('datastore', 3 % 4))
+        self.assertEqual(self.fake.requests['GET /virtual_machines'], requests + 1)
+
+    def test_backups_of_a_vm_are_the_live_objects(self):
+        machine = self.ovc.virtual_machines.get_by_name('vm-000003')
+        backups = self.ovc.backups.get_all(filters={'virtual_machine_id': machine.data['id']})
+
+        self.assertEqual(set(map(id, machine.get_backups())), set(map(id, backups)))
+
+    def test_released_objects_are_dropped(self):
+        machines = self.ovc.virtual_machines.get_all()
+        self.assertEqual(len(self.identity_map), 20)
+
+        del machines
+        gc.collect()
+
+        self.assertEqual(len(self.identity_map), 0)
+
+    def test_identity_map_is_optional(self):
+        ovc = OVC(self.fake.config())
+
+        self.assertIsNone(ovc.connection.identity_map)
+        self.assertIsNot(ovc.virtual_machines.get_by_name('vm-000003'), ovc.virtual_machines.get_by_name('vm-000003'))
+
+    def test_identity_map_can_be_shared(self):
+        identity_map = IdentityMap()
+        first = OVC(self.fake.config(identity_map=identity_map)).virtual_machines.get_by_name('vm-000003')
+
+        second = OVC(self.fake.config(identity_map=identity_map)).virtual_machines.get_by_name('vm-000003')
+
+        self.assertIs(first, second)
+
+
+if __name__ == '__main__':
+    unittest.main()
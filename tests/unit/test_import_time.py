@@ -0,0 +1,68 @@
+###
+# (C) Copyright [2019] Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##
+
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir)
+
+LOADED_RESOURCE_MODULES = """
+import json, sys
+from unittest import mock
+from simplivity.connection import Connection
+from simplivity.ovc_client import OVC
+loaded = {}
+loaded['import'] = sorted(name for name in sys.modules if name.startswith('simplivity.resources.'))
+with mock.patch.object(Connection, 'login'):
+    ovc = OVC({'ip': '127.0.0.1', 'credentials': {'username': 'user', 'password': 'password'}})
+ovc.hosts
+loaded['hosts'] = sorted(name for name in sys.modules if name.startswith('simplivity.resources.'))
+ovc.backups
+loaded['backups'] = sorted(name for name in sys.modules if name.startswith('simplivity.resources.'))
+print(json.dumps(loaded))
+"""
+
+
+def run_python(*args):
+    """Runs a new interpreter in the root of the repository and gets its output (stdout, stderr)."""
+    process = subprocess.run([sys.executable] + list(args), cwd=ROOT, stdout=subprocess.PIPE,
+                             stderr=subprocess.PIPE, universal_newlines=True, check=True)
+    return process.stdout, process.stderr
+
+
+class ImportTimeTest(unittest.TestCase):
+    def test_resource_modules_are_imported_on_first_access(self):
+        loaded = json.loads(run_python('-c', LOADED_RESOURCE_MODULES)[0])
+
+        self.assertEqual(loaded['import'], [])
+        self.assertEqual(loaded['hosts'], ['simplivity.resources.hosts', 'simplivity.resources.resource',
+                                           'simplivity.resources.tasks'])
+        self.assertEqual(loaded['backups'], ['simplivity.resources.backups', 'simplivity.resources.hosts',
+                                             'simplivity.resources.resource', 'simplivity.resources.tasks'])
+
+    def test_optional_modules_are_not_imported(self):
+        loaded = run_python('-c', 'import sys, simplivity.ovc_client, simplivity.resources.virtual_machines; '
+                                  'print(sorted(sys.modules))')[0]
+
+        for name in ('sqlite3', 'simplivity.inventory_store', 'simplivity.journal'):
+            self.assertNotIn("'{}'".format(name), loaded)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+###
+# (C) Copyright [2019] Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##
+
+import unittest
+from unittest import mock
+
+from simplivity import instrumentation
+from simplivity.instrumentation import LatencyHistogram, RequestInfo, get_path_template
+
+
+class GetPathTemplateTest(unittest.TestCase):
+    def test_ids_replaced(self):
+        path = "/virtual_machines/4230b9b5-a8c1-5b0f-2f53-c8e8c4a4d8a4/backup"
+
+        self.assertEqual(get_path_template(path), "/virtual_machines/{id}/backup")
+
+    def test_several_ids_replaced(self):
+        self.assertEqual(get_path_template("/policies/af1f/rules/5e2d"), "/policies/{id}/rules/{id}")
+
+    def test_query_removed(self):
+        self.assertEqual(get_path_template("/backups?offset=0&limit=500"), "/backups")
+
+    def test_actions_kept(self):
+        self.assertEqual(get_path_template("/backups/set_retention"), "/backups/set_retention")
+
+
+class RequestInfoTest(unittest.TestCase):
+    @mock.patch('simplivity.instrumentation.time.monotonic')
+    def test_phases(self, mock_monotonic):
+        mock_monotonic.side_effect = [10.0, 10.0, 10.5, 11.5, 11.75]
+        request = RequestInfo('GET', '/hosts')
+
+        request.start_phase()
+        request.end_phase(instrumentation.SEND, connect_duration=0.25)
+        request.end_phase(instrumentation.WAIT)
+        request.end_phase(instrumentation.READ)
+
+        self.assertEqual(request.timings, {'connect': 0.25, 'send': 0.25, 'wait': 1.0, 'read': 0.25})
+        self.assertEqual(request.duration, 1.75)
+
+
+class LatencyHistogramTest(unittest.TestCase):
+    def setUp(self):
+        self.histogram = LatencyHistogram(bounds=(0.1, 1))
+
+    def __record(self, method, path, **timings):
+        request = RequestInfo(method, path)
+        request.timings = timings
+        self.histogram.on_response(request, mock.Mock())
+
+    def test_keyed_by_method_and_template(self):
+        self.__record('GET', '/hosts/1', wait=0.05)
+        self.__record('GET', '/hosts/2', wait=0.5)
+        self.__record('POST', '/hosts/2/shutdown_virtual_controller', wait=2)
+
+        stats = self.histogram.get('GET', '/hosts/{id}')
+
+        self.assertEqual(stats.count, 2)
+        self.assertEqual(stats.buckets, [1, 1, 0])
+        self.assertEqual(stats.max, 0.5)
+        self.assertEqual(self.histogram.get('POST', '/hosts/{id}/shutdown_virtual_controller').buckets, [0, 0, 1])
+
+    def test_percentile(self):
+        for wait in (0.05, 0.05, 0.05, 0.5):
+            self.__record('GET', '/hosts', wait=wait)
+
+        stats = self.histogram.get('GET', '/hosts')
+
+        self.assertEqual(stats.percentile(50), 0.1)
+        self.assertEqual(stats.percentile(99), 0.5)
+
+    def test_phase_mean(self):
+        self.__record('GET', '/hosts', wait=0.2, decode=0.1)
+        self.__record('GET', '/hosts', wait=0.4, decode=0.3)
+
+        stats = self.histogram.get('GET', '/hosts')
+
+        self.assertAlmostEqual(stats.phase_mean('wait'), 0.3)
+        self.assertAlmostEqual(stats.phase_mean('decode'), 0.2)
+        self.assertAlmostEqual(stats.mean, 0.5)
+
+    def test_errors_counted(self):
+        self.histogram.on_error(RequestInfo('GET', '/hosts'), ConnectionResetError())
+
+        self.assertEqual(self.histogram.get('GET', '/hosts').errors, 1)
+        self.assertIsNone(self.histogram.get('GET', '/hosts').percentile(50))
+
+    def test_summary_slowest_first(self):
+        self.__record('GET', '/hosts', wait=0.1)
+        self.__record('GET', '/backups', wait=0.9)
+
+        self.assertEqual(list(self.histogram.summary()), [('GET', '/backups'), ('GET', '/hosts')])
+
+        self.histogram.reset()
+        self.assertEqual(self.histogram.summary(), {})
@@ -0,0 +1,208 @@
+###
+# (C) Copyright [2019] Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from simplivity import exceptions
+from simplivity.inventory_store import InventoryStore
+from simplivity.ovc_client import OVC
+from simplivity.testing import inventory
+from simplivity.testing.fake_ovc import FakeOVC
+
+MACHINES = [
+    {"id": "1", "name": "web-1", "omnistack_cluster_id": "c1", "datastore_id": "d1", "state": "ALIVE"},
+    {"id": "2", "name": "Web-2", "omnistack_cluster_id": "c1", "datastore_id": "d2", "state": "ALIVE"},
+    {"id": "3", "name": "db-1", "omnistack_cluster_id": "c2", "datastore_id": "d2", "state": "REMOVED"},
+]
+
+
+class InventoryStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.store = InventoryStore(':memory:', scope='10.0.0.1')
+        self.addCleanup(self.store.close)
+        self.store.replace('virtual_machines', MACHINES)
+
+    def __select_ids(self, filters=None, **kwargs):
+        return [data["id"] for data in self.store.select('virtual_machines', filters, **kwargs)]
+
+    def test_select_sorts_like_the_ovc(self):
+        self.assertEqual(self.__select_ids(), ["1", "3", "2"])
+        self.assertEqual(self.__select_ids(order='ascending'), ["2", "3", "1"])
+        self.assertEqual(self.__select_ids(order='ascending', case_sensitive=False), ["3", "1", "2"])
+        self.assertEqual(self.__select_ids(sort='id', order='ascending', offset=1, limit=1), ["2"])
+
+    def test_select_sorts_numbers_by_value(self):
+        self.store.replace('backups', [{"id": "1", "size": 900}, {"id": "2", "size": 10000},
+                                       {"id": "3", "size": 85.5}, {"id": "4"}])
+
+        ids = [data["id"] for data in self.store.select('backups', sort='size', order='ascending')]
+
+        self.assertEqual(ids, ["4", "3", "1", "2"])
+
+    def test_select_filters_on_the_indexed_fields(self):
+        self.assertEqual(self.__select_ids({"id": "1,3"}, order='ascending'), ["3", "1"])
+        self.assertEqual(self.__select_ids({"name": "web-*"}), ["1"])
+        self.assertEqual(self.__select_ids({"name": "WEB-*"}, case_sensitive=False), ["2", "1"])
+        self.assertEqual(self.__select_ids({"omnistack_cluster_id": "c1", "datastore_id": "d2"}), ["2"])
+
+    def test_only_filters_on_the_indexed_fields_are_served(self):
+        self.assertTrue(self.store.can_serve('virtual_machines', {"name": "web-1", "datastore_id": "d1"}))
+        self.assertFalse(self.store.can_serve('virtual_machines', {"state": "ALIVE"}))
+        self.assertFalse(self.store.can_serve('certificates', {}))
+
+    def test_freshness_window(self):
+        self.assertTrue(self.store.is_fresh('virtual_machines'))
+        self.assertFalse(self.store.is_fresh('backups'))
+
+        with mock.patch('simplivity.inventory_store.time.time', return_value=time.time() + 301):
+            self.assertFalse(self.store.is_fresh('virtual_machines'))
+
+    def test_upsert_and_remove(self):
+        self.store.upsert('virtual_machines', [{"id": "1", "name": "web-renamed"}, {"id": "4", "name": "app-1"}])
+        self.store.remove('virtual_machines', ["3"])
+
+        self.assertEqual(self.__select_ids(sort='id', order='ascending'), ["1", "2", "4"])
+        self.assertEqual(self.store.select('virtual_machines', {"id": "1"})[0]["name"], "web-renamed")
+
+    def test_upsert_without_snapshot_is_ignored(self):
+        self.store.upsert('backups', [{"id": "1", "name": "backup-1"}])
+
+        self.assertEqual(self.store.select('backups'), [])
+
+    def test_invalidate(self):
+        self.store.replace('hosts', [{"id": "h1", "name": "host-1"}])
+
+        self.store.invalidate(['virtual_machines'])
+        self.assertFalse(self.store.is_fresh('virtual_machines'))
+        self.assertTrue(self.store.is_fresh('hosts'))
+
+        self.store.invalidate()
+        self.assertFalse(self.store.is_fresh('hosts'))
+
+    def test_snapshots_are_kept_apart_by_scope(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "inventory.sqlite")
+        InventoryStore(path, scope='10.0.0.1').replace('hosts', [{"id": "h1", "name": "host-1"}])
+
+        other = InventoryStore(path, scope='10.0.0.2')
+
+        self.assertFalse(other.is_fresh('hosts'))
+        self.assertEqual(other.select('hosts'), [])
+        self.assertEqual(len(InventoryStore(path, scope='10.0.0.1').select('hosts')), 1)
+
+
+class ResourceInventoryTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, "inventory.sqlite")
+        self.fake = FakeOVC(inventory.build_federation(virtual_machines=30, backups_per_vm=2)).start()
+        self.addCleanup(self.fake.stop)
+
+    def __create_ovc(self, **kwargs):
+        return OVC(self.fake.config(inventory=self.path, **kwargs))
+
+    def test_new_client_starts_from_the_snapshot(self):
+        self.__create_ovc().virtual_machines.get_all()
+
+        ovc = self.__create_ovc()
+        machines = ovc.virtual_machines.get_all()
+        machine = ovc.virtual_machines.get_by_name('vm-000007')
+        cluster_machines = ovc.virtual_machines.get_all(filters={'omnistack_cluster_id': machine.data['omnistack_cluster_id']})
+
+        self.assertEqual(len(machines), 30)
+        self.assertEqual(machine.data['id'], inventory.make_id('vm', 7))
+        self.assertIn(machine.data['id'], [vm.data['id'] for vm in cluster_machines])
+        self.assertEqual(self.fake.requests['GET /virtual_machines'], 1)
+
+    def test_stale_snapshot_is_loaded_again(self):
+        self.__create_ovc().hosts.get_all()
+
+        with mock.patch('simplivity.inventory_store.time.time', return_value=time.time() + 3601):
+            self.__create_ovc().hosts.get_all()
+
+        self.assertEqual(self.fake.requests['GET /hosts'], 2)
+
+    def test_other_filters_are_sent_to_the_ovc(self):
+        ovc = self.__create_ovc()
+        ovc.virtual_machines.get_all()
+
+        machines = ovc.virtual_machines.get_all(filters={'state': 'ALIVE'})
+
+        self.assertEqual(len(machines), 30)
+        self.assertEqual(self.fake.requests['GET /virtual_machines'], 2)
+
+    def test_lookup_missing_from_the_snapshot_asks_the_ovc(self):
+        ovc = self.__create_ovc()
+        ovc.virtual_machines.get_all()
+        OVC(self.fake.config()).virtual_machines.get_by_name('vm-000001').clone('vm-new')
+        requests = self.fake.requests['GET /virtual_machines']
+
+        machine = ovc.virtual_machines.get_by_name('vm-new')
+        ovc.virtual_machines.get_by_name('vm-new')
+
+        self.assertEqual(machine.data['name'], 'vm-new')
+        self.assertEqual(self.fake.requests['GET /virtual_machines'], requests + 1)
+
+    def test_optional_fields_are_served_on_request(self):
+        ovc = self.__create_ovc()
+
+        machine = ovc.virtual_machines.get_by_name('vm-000007')
+        detailed = ovc.virtual_machines.get_all(filters={'name': 'vm-000007'}, show_optional_fields=True)[0]
+
+        self.assertNotIn('ha_status', machine.data)
+        self.assertEqual(detailed.data['ha_status'], 'SAFE')
+        self.assertEqual(detailed.data['name'], machine.data['name'])
+        self.assertEqual(self.fake.requests['GET /virtual_machines'], 1)
+
+    def test_changes_are_written_through(self):
+        ovc = self.__create_ovc()
+        backup = ovc.backups.get_by_name('backup-000001-0')
+        other = ovc.backups.get_by_name('backup-000002-0')
+
+        backup.rename('backup-renamed')
+        other.delete()
+
+        names = [item.data['name'] for item in ovc.backups.get_all(limit=100)]
+        self.assertIn('backup-renamed', names)
+        self.assertNotIn('backup-000001-0', names)
+        self.assertNotIn('backup-000002-0', names)
+        self.assertEqual(len(names), 59)
+
+    def test_refresh_inventory(self):
+        ovc = self.__create_ovc()
+        ovc.hosts.get_all()
+        ovc.datastores.get_all()
+
+        ovc.refresh_inventory()
+        ovc.hosts.get_all()
+
+        self.assertEqual(self.fake.requests['GET /hosts'], 2)
+        self.assertEqual(self.fake.requests['GET /datastores'], 2)
+
+    def test_refresh_without_store(self):
+        with self.assertRaises(exceptions.HPESimpliVityException):
+            OVC(self.fake.config()).refresh_inventory()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,174 @@
+###
+# (C) Copyright [2019] Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from simplivity import exceptions
+from simplivity import journal
+from simplivity.federation import FederationClient
+from simplivity.ovc_client import OVC
+from simplivity.resources.resource import ResourceClient
+from simplivity.testing import inventory
+from simplivity.testing.fake_ovc import FakeOVC
+
+
+class JournalTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, "job.journal")
+
+    def test_last_event_of_each_operation_is_kept(self):
+        with mock.patch.object(journal.os, 'fsync') as mock_fsync:
+            job_journal = journal.Journal(self.path)
+            job_journal.record("op-1", journal.SUBMITTED)
+            job_journal.record("op-1", journal.STARTED, task_id="task-1")
+            job_journal.record("op-2", journal.SUBMITTED)
+            job_journal.record("op-2", journal.COMPLETED, affected=[])
+            job_journal.close()
+
+        reopened = journal.Journal(self.path)
+        self.addCleanup(reopened.close)
+
+        self.assertEqual(mock_fsync.call_count, 4)
+        self.assertEqual(reopened.get("op-1")["task_id"], "task-1")
+        self.assertEqual(reopened.get("op-2")["event"], journal.COMPLETED)
+        self.assertEqual([entry["key"] for entry in reopened.get_pending()], ["op-1"])
+
+    def test_line_cut_short_is_ignored(self):
+        job_journal = journal.Journal(self.path)
+        job_journal.record("op-1", journal.COMPLETED, affected=[])
+        job_journal.close()
+        with open(self.path, 'a') as journal_file:
+            journal_file.write('{"key": "op-2", "ev')
+
+        with self.assertLogs('simplivity.journal', 'WARNING'):
+            reopened = journal.Journal(self.path)
+        self.addCleanup(reopened.close)
+
+        self.assertIsNone(reopened.get("op-2"))
+        self.assertEqual(reopened.get("op-1")["event"], journal.COMPLETED)
+
+    def test_operation_key_depends_on_the_request(self):
+        key = journal.get_operation_key('POST', '/backups/delete', {"backup_id": ["1", "2"]})
+
+        self.assertEqual(key, journal.get_operation_key('POST', '/backups/delete', {"backup_id": ["1", "2"]}))
+        self.assertNotEqual(key, journal.get_operation_key('POST', '/backups/delete', {"backup_id": ["1", "3"]}))
+
+
+class JournalingExecutorTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, "job.journal")
+        self.fake = FakeOVC(inventory.build_federation(virtual_machines=10, backups_per_vm=2)).start()
+        self.addCleanup(self.fake.stop)
+        self.ovc = OVC(self.fake.config())
+        self.backup_ids = sorted(backup["id"] for backup in self.fake.get_resources("backups"))
+
+    def __delete_backups(self, executor, ids):
+        return executor.post("/backups/delete", {"backup_id": ids}, key="delete " + ",".join(ids))
+
+    def test_completed_operations_are_skipped(self):
+        with self.ovc.journal(self.path) as executor:
+            affected = self.__delete_backups(executor, self.backup_ids[:5])
+
+        with self.ovc.journal(self.path) as executor:
+            self.assertEqual(self.__delete_backups(executor, self.backup_ids[:5]), affected)
+            self.__delete_backups(executor, self.backup_ids[5:8])
+
+        self.assertEqual(len(affected), 5)
+        self.assertEqual((executor.submitted, executor.skipped), (1, 1))
+        self.assertEqual(self.fake.requests["POST /backups/delete"], 2)
+        self.assertEqual(len(self.fake.get_resources("backups")), 12)
+
+    def test_started_task_is_resumed(self):
+        with self.ovc.journal(self.path) as executor:
+            with mock.patch.object(ResourceClient, 'task_affected_resources', side_effect=KeyboardInterrupt):
+                with self.assertRaises(KeyboardInterrupt):
+                    self.__delete_backups(executor, self.backup_ids[:5])
+
+        with self.ovc.journal(self.path) as executor:
+            results = executor.resume()
+            affected = self.__delete_backups(executor, self.backup_ids[:5])
+
+        key = "delete " + ",".join(self.backup_ids[:5])
+        self.assertEqual(list(results), [key])
+        self.assertEqual(results[key], affected)
+        self.assertEqual((executor.submitted, executor.resumed, executor.skipped), (0, 1, 1))
+        self.assertEqual(self.fake.requests["POST /backups/delete"], 1)
+        self.assertEqual(executor.journal.get(key)["event"], journal.COMPLETED)
+
+    def test_task_is_resumed_on_the_ovc_which_started_it(self):
+        other = FakeOVC(inventory.build_federation(virtual_machines=10, backups_per_vm=2)).start()
+        self.addCleanup(other.stop)
+        self.fake.task_duration = 0.2
+        config = self.fake.config(ips=[self.fake.address, other.address])
+        with FederationClient(config).journal(self.path) as executor:
+            with mock.patch.object(ResourceClient, 'task_affected_resources', side_effect=KeyboardInterrupt):
+                with self.assertRaises(KeyboardInterrupt):
+                    self.__delete_backups(executor, self.backup_ids[:5])
+
+        with FederationClient(config).journal(self.path) as executor:
+            results = executor.resume()
+
+        key = "delete " + ",".join(self.backup_ids[:5])
+        self.assertEqual(len(results[key]), 5)
+        self.assertEqual(executor.journal.get(key)["event"], journal.COMPLETED)
+        self.assertEqual(other.requests.get("GET /tasks/{id}", 0), 0)
+
+    def test_failed_operation_is_submitted_again(self):
+        self.fake.error_status = 400
+        self.fake.error_rate = 1.0
+        with self.ovc.journal(self.path) as executor:
+            with self.assertRaises(exceptions.HPESimpliVityException):
+                self.__delete_backups(executor, self.backup_ids[:5])
+        self.fake.error_rate = 0.0
+
+        with self.ovc.journal(self.path) as executor:
+            self.assertEqual(len(self.__delete_backups(executor, self.backup_ids[:5])), 5)
+
+        self.assertEqual(executor.submitted, 1)
+
+    def test_operation_without_task_is_submitted_again(self):
+        with self.ovc.journal(self.path) as executor:
+            executor.journal.record("delete " + ",".join(self.backup_ids[:5]), journal.SUBMITTED,
+                                    operation="POST /backups/delete")
+
+            with self.assertLogs('simplivity.journal', 'WARNING'):
+                self.__delete_backups(executor, self.backup_ids[:5])
+
+        self.assertEqual(self.fake.requests["POST /backups/delete"], 1)
+
+    def test_request_bodies_are_not_recorded(self):
+        vm_id = inventory.make_id("vm", 1)
+        with self.ovc.journal(self.path) as executor:
+            executor.post("/virtual_machines/{}/backup_parameters".format(vm_id),
+                          {"guest_username": "root", "guest_password": "secret-password"})
+
+        with open(self.path) as journal_file:
+            content = journal_file.read()
+
+        self.assertIn("POST /virtual_machines/{id}/backup_parameters", content)
+        self.assertNotIn("secret-password", content)
+
+
+if __name__ == '__main__':
+    unittest.main()
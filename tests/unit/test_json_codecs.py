@@ -0,0 +1,77 @@
+###
+# (C) Copyright [2019] Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##
+
+import json
+import unittest
+from unittest import mock
+
+from simplivity import json_codecs
+from simplivity.connection import Connection
+from simplivity.exceptions import HPESimpliVityException
+
+
+class JSONCodecsTest(unittest.TestCase):
+    def setUp(self):
+        self.document = {"virtual_machines": [{"id": "1", "name": "vm/1", "size": 1.5, "template": False}]}
+
+    def test_get_codec_by_name(self):
+        codec = json_codecs.get_codec('json')
+        self.assertIsInstance(codec, json_codecs.JSONCodec)
+        self.assertEqual(codec.name, 'json')
+
+    def test_get_codec_returns_codec_object(self):
+        codec = json_codecs.JSONCodec()
+        self.assertIs(json_codecs.get_codec(codec), codec)
+
+    def test_get_codec_default_is_fastest_available(self):
+        available = [codec_cls for codec_cls in json_codecs.CODECS if codec_cls.is_available()]
+        self.assertEqual(json_codecs.get_codec().name, available[0].name)
+
+    @mock.patch.object(json_codecs, 'orjson', None)
+    @mock.patch.object(json_codecs, 'ujson', None)
+    def test_get_codec_falls_back_to_json(self):
+        self.assertEqual(json_codecs.get_codec().name, 'json')
+
+    @mock.patch.object(json_codecs, 'ujson', None)
+    def test_get_codec_not_installed(self):
+        with self.assertRaises(HPESimpliVityException) as error:
+            json_codecs.get_codec('ujson')
+        self.assertEqual(error.exception.msg, json_codecs.CODEC_NOT_INSTALLED.format('ujson'))
+
+    def test_get_codec_unknown(self):
+        with self.assertRaises(HPESimpliVityException) as error:
+            json_codecs.get_codec('simplejson')
+        self.assertTrue('Unknown JSON codec simplejson' in error.exception.msg)
+
+    def test_available_codecs_decode_bytes(self):
+        encoded = json.dumps(self.document).encode('utf-8')
+        for codec_cls in json_codecs.CODECS:
+            if codec_cls.is_available():
+                self.assertEqual(codec_cls().loads(encoded), self.document)
+
+    def test_available_codecs_round_trip(self):
+        for codec_cls in json_codecs.CODECS:
+            if codec_cls.is_available():
+                codec = codec_cls()
+                self.assertEqual(json.loads(codec.dumps(self.document)), self.document)
+
+    def test_connection_uses_configured_codec(self):
+        connection = Connection('127.0.0.1', json_codec='json')
+        self.assertEqual(connection._json_codec.name, 'json')
+
+
+if __name__ == '__main__':
+    unittest.main()
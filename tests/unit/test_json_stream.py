@@ -0,0 +1,83 @@
+###
+# (C) Copyright [2019] Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##
+
+import json
+import unittest
+
+from simplivity.exceptions import HPESimpliVityException
+from simplivity.json_stream import MembersParser, iter_members
+
+
+def split(data, size):
+    return [data[index:index + size] for index in range(0, len(data), size)]
+
+
+class MembersParserTest(unittest.TestCase):
+    def setUp(self):
+        self.members = [{"id": "1", "name": "vm é 1", "size": 1024},
+                        {"id": "2", "name": "vm 2", "tags": [1, 2.5, None, True]}]
+        self.document = {"offset": 0, "virtual_machines": self.members, "count": 12345, "limit": 500}
+
+    def test_members_with_any_chunk_size(self):
+        data = json.dumps(self.document, ensure_ascii=False).encode('utf-8')
+
+        for size in (1, 3, 64, len(data)):
+            self.assertEqual(list(iter_members(split(data, size), 'virtual_machines')), self.members)
+
+    def test_other_fields_are_kept_in_document(self):
+        data = json.dumps(self.document, indent=2).encode('utf-8')
+        parser = MembersParser('virtual_machines')
+
+        for chunk in split(data, 5):
+            parser.feed(chunk)
+        parser.feed(b'', final=True)
+
+        self.assertEqual(parser.document, {"offset": 0, "count": 12345, "limit": 500})
+
+    def test_members_are_returned_when_complete(self):
+        parser = MembersParser('virtual_machines')
+
+        self.assertEqual(parser.feed(b'{"virtual_machines": [{"id": "1"}, {"id"'), [{"id": "1"}])
+        self.assertEqual(parser.feed(b': "2"}]}'), [{"id": "2"}])
+        self.assertEqual(parser.feed(b'', final=True), [])
+
+    def test_nested_field_with_same_name_is_not_a_member(self):
+        data = b'{"filter": {"virtual_machines": [1]}, "virtual_machines": [2]}'
+        self.assertEqual(list(iter_members([data], 'virtual_machines')), [2])
+
+    def test_missing_members_field(self):
+        self.assertEqual(list(iter_members([b'{"count": 0}'], 'virtual_machines')), [])
+
+    def test_empty_body(self):
+        self.assertEqual(list(iter_members([b''], 'virtual_machines')), [])
+
+    def test_invalid_separator(self):
+        with self.assertRaises(HPESimpliVityException) as error:
+            list(iter_members([b'{"vms": [1,,2]}'], 'vms'))
+        self.assertEqual(error.exception.msg, "Invalid listing response: unexpected ',' at position 11")
+
+    def test_truncated_document(self):
+        with self.assertRaises(HPESimpliVityException) as error:
+            list(iter_members([b'{"vms": [1'], 'vms'))
+        self.assertEqual(error.exception.msg, "Invalid listing response: unexpected end of the document")
+
+    def test_document_is_not_an_object(self):
+        with self.assertRaises(HPESimpliVityException):
+            list(iter_members([b'[1, 2]'], 'vms'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -206,6 +206,41 @@ class OVCTest(unittest.TestCase):
         certificates = self._ovc.certificates
         self.assertEqual(certificates, self._ovc.certificates)
 
+    @mock.patch.object(Connection, 'login')
+    def test_throttling_configuration(self, mock_login):
+        config = {"ip": "127.0.0.1",
+                  "credentials": {"username": "simplivity", "password": "root"},
+                  "rate_limit": 20,
+                  "adaptive_concurrency": {"initial_limit": 4, "max_limit": 16}}
+
+        ovc = OVC(config)
+
+        self.assertEqual(ovc.connection.throttle.rate_limiter.rate, 20)
+        self.assertEqual(ovc.connection.throttle.concurrency_limiter.limit, 4)
+
+    def test_throttling_disabled_by_default(self):
+        self.assertIsNone(self._ovc.connection.throttle.rate_limiter)
+        self.assertIsNone(self._ovc.connection.throttle.concurrency_limiter)
+
+    def test_map_returns_results_in_order(self):
+        results = self._ovc.map(lambda item: item * 2, [1, 2, 3])
+
+        self.assertEqual([result.result for result in results], [2, 4, 6])
+
+    def test_submit_returns_future(self):
+        future = self._ovc.submit(sum, [1, 2, 3])
+
+        self.assertEqual(future.result(timeout=5), 6)
+
+    @mock.patch.object(Connection, 'logout')
+    def test_logout_stops_executor(self, mock_logout):
+        future = self._ovc.submit(sum, [1, 2])
+
+        self._ovc.logout()
+
+        self.assertTrue(future.done())
+        mock_logout.assert_called_once_with()
+
 
 if __name__ == '__main__':
     unittest.main()
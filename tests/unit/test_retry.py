@@ -0,0 +1,82 @@
+###
+# (C) Copyright [2019] Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##
+
+import socket
+import ssl
+import unittest
+from http.client import RemoteDisconnected
+from unittest.mock import Mock
+
+from simplivity.exceptions import HPESimpliVityException
+from simplivity.retry import RetryPolicy
+
+
+def make_response(status, retry_after=None):
+    resp = Mock(status=status)
+    resp.getheader.return_value = retry_after
+    return resp
+
+
+class RetryPolicyTest(unittest.TestCase):
+    def setUp(self):
+        self.policy = RetryPolicy(max_attempts=4, backoff=1, max_backoff=3, max_elapsed=60, jitter=False)
+
+    def test_exponential_backoff_capped(self):
+        delays = [self.policy.get_delay('GET', attempt, 0, resp=make_response(503)) for attempt in (1, 2, 3)]
+
+        self.assertEqual(delays, [1, 2, 3])
+        self.assertEqual(self.policy.stats.retries, 3)
+
+    def test_gives_up_after_max_attempts(self):
+        self.assertIsNone(self.policy.get_delay('GET', 4, 0, resp=make_response(503)))
+        self.assertEqual(self.policy.stats.exhausted, 1)
+
+    def test_gives_up_after_max_elapsed(self):
+        self.assertIsNone(self.policy.get_delay('GET', 1, 59.5, resp=make_response(503)))
+
+    def test_success_is_not_retried(self):
+        self.assertIsNone(self.policy.get_delay('GET', 2, 0, resp=make_response(200)))
+        self.assertEqual(self.policy.stats.recovered, 1)
+
+    def test_client_error_is_not_retried(self):
+        self.assertIsNone(self.policy.get_delay('GET', 1, 0, resp=make_response(404)))
+
+    def test_post_retried_only_when_opted_in(self):
+        self.assertIsNone(self.policy.get_delay('POST', 1, 0, resp=make_response(503)))
+
+        policy = RetryPolicy(jitter=False, backoff=1, retry_post=True)
+        self.assertEqual(policy.get_delay('POST', 1, 0, resp=make_response(503)), 1)
+
+    def test_retry_after_header(self):
+        self.assertEqual(self.policy.get_delay('GET', 1, 0, resp=make_response(429, '2.5')), 2.5)
+
+    def test_jitter_stays_below_backoff(self):
+        policy = RetryPolicy(backoff=1)
+
+        for _ in range(20):
+            self.assertLessEqual(policy.get_delay('GET', 1, 0, resp=make_response(503)), 1)
+
+    def test_transient_errors(self):
+        wrapped = HPESimpliVityException('reset')
+        wrapped.__cause__ = RemoteDisconnected('Remote end closed connection')
+
+        self.assertTrue(RetryPolicy.is_transient_error(socket.timeout('timed out')))
+        self.assertTrue(RetryPolicy.is_transient_error(ConnectionResetError()))
+        self.assertTrue(RetryPolicy.is_transient_error(ssl.SSLError()))
+        self.assertTrue(RetryPolicy.is_transient_error(wrapped))
+        self.assertFalse(RetryPolicy.is_transient_error(HPESimpliVityException('Invalid credentials')))
+        self.assertFalse(RetryPolicy.is_transient_error(ssl.SSLCertVerificationError()))
+        self.assertFalse(RetryPolicy.is_transient_error(ValueError()))
@@ -0,0 +1,70 @@
+###
+# (C) Copyright [2019] Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##
+
+import unittest
+
+from simplivity.task_stats import TaskStatsCollector, TaskWaitStats, parse_task_time
+
+
+class ParseTaskTimeTest(unittest.TestCase):
+    def test_parse(self):
+        self.assertEqual(parse_task_time('2019-05-29T07:15:36Z'), 1559114136.0)
+
+    def test_parse_fraction(self):
+        self.assertEqual(parse_task_time('2019-05-29T07:15:36.250Z'), 1559114136.25)
+
+    def test_unknown(self):
+        self.assertIsNone(parse_task_time(None))
+        self.assertIsNone(parse_task_time('yesterday'))
+
+
+class TaskStatsCollectorTest(unittest.TestCase):
+    def setUp(self):
+        self.collector = TaskStatsCollector()
+
+    def __add(self, operation, wait_time, polls=2, state='COMPLETED', task_duration=None, wasted_sleep=None):
+        stats = TaskWaitStats('task', operation)
+        stats.state = state
+        stats.wait_time = wait_time
+        stats.polls = polls
+        stats.task_duration = task_duration
+        stats.wasted_sleep = wasted_sleep
+        self.collector.add(stats)
+
+    def test_aggregated_by_operation(self):
+        self.__add('POST /virtual_machines/{id}/clone', 10, polls=4, task_duration=8, wasted_sleep=1.5)
+        self.__add('POST /virtual_machines/{id}/clone', 20, polls=6, state='FAILED', wasted_sleep=0.5)
+        self.__add('DELETE /backups/{id}', 2)
+
+        stats = self.collector.get('POST /virtual_machines/{id}/clone')
+
+        self.assertEqual(stats.count, 2)
+        self.assertEqual(stats.failed, 1)
+        self.assertEqual(stats.mean_polls, 5)
+        self.assertEqual(stats.mean_wait_time, 15)
+        self.assertEqual(stats.max_wait_time, 20)
+        self.assertEqual(stats.mean_task_duration, 8)
+        self.assertEqual(stats.wasted_sleep, 2)
+        self.assertIsNone(self.collector.get('DELETE /backups/{id}').mean_task_duration)
+
+    def test_summary_longest_wait_first(self):
+        self.__add('DELETE /backups/{id}', 2)
+        self.__add('POST /virtual_machines/{id}/clone', 10)
+
+        self.assertEqual(list(self.collector.summary()), ['POST /virtual_machines/{id}/clone', 'DELETE /backups/{id}'])
+
+        self.collector.reset()
+        self.assertEqual(self.collector.summary(), {})
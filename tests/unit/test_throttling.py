@@ -0,0 +1,128 @@
+###
+# (C) Copyright [2019] Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##
+
+import threading
+import unittest
+from unittest.mock import patch
+
+from simplivity.throttling import AdaptiveConcurrencyLimiter
+from simplivity.throttling import RateLimiter
+from simplivity.throttling import Throttle
+
+
+class RateLimiterTest(unittest.TestCase):
+    def test_invalid_rate(self):
+        with self.assertRaises(ValueError):
+            RateLimiter(0)
+
+    @patch('simplivity.throttling.time.sleep')
+    @patch('simplivity.throttling.time.monotonic')
+    def test_burst_then_waits(self, mock_time, mock_sleep):
+        mock_time.return_value = 100.0
+        limiter = RateLimiter(rate=10, burst=2)
+
+        limiter.acquire()
+        limiter.acquire()
+        mock_sleep.assert_not_called()
+
+        mock_sleep.side_effect = lambda seconds: setattr(mock_time, 'return_value', mock_time.return_value + seconds)
+        limiter.acquire()
+
+        mock_sleep.assert_called_once()
+        self.assertAlmostEqual(mock_sleep.call_args[0][0], 0.1)
+
+
+class AdaptiveConcurrencyLimiterTest(unittest.TestCase):
+    def setUp(self):
+        self.limiter = AdaptiveConcurrencyLimiter(initial_limit=8, min_limit=2, max_limit=10, latency_threshold=1.0)
+
+    def test_failure_halves_limit(self):
+        sequence = self.limiter.acquire()
+
+        self.limiter.release(sequence, 0.1, failed=True)
+
+        self.assertEqual(self.limiter.limit, 4)
+        self.assertEqual(self.limiter.in_flight, 0)
+
+    def test_high_latency_decreases_limit(self):
+        self.limiter.release(self.limiter.acquire(), 2.0)
+
+        self.assertEqual(self.limiter.limit, 4)
+
+    def test_limit_does_not_go_below_minimum(self):
+        for _ in range(5):
+            self.limiter.release(self.limiter.acquire(), 0.1, failed=True)
+
+        self.assertEqual(self.limiter.limit, 2)
+
+    def test_concurrent_failures_decrease_once(self):
+        sequences = [self.limiter.acquire() for _ in range(4)]
+
+        for sequence in sequences:
+            self.limiter.release(sequence, 0.1, failed=True)
+
+        self.assertEqual(self.limiter.limit, 4)
+        self.assertEqual(self.limiter.decrease_count, 1)
+
+    def test_success_increases_limit_additively(self):
+        self.limiter.release(self.limiter.acquire(), 0.1, failed=True)
+
+        for _ in range(8):
+            self.limiter.release(self.limiter.acquire(), 0.1)
+
+        self.assertEqual(self.limiter.limit, 5)
+
+    def test_limit_does_not_exceed_maximum(self):
+        for _ in range(100):
+            self.limiter.release(self.limiter.acquire(), 0.1)
+
+        self.assertEqual(self.limiter.limit, 10)
+
+    def test_acquire_waits_for_free_slot(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1, max_limit=1)
+        sequence = limiter.acquire()
+        acquired = threading.Event()
+
+        thread = threading.Thread(target=lambda: (limiter.acquire(), acquired.set()))
+        thread.start()
+        self.assertFalse(acquired.wait(0.05))
+
+        limiter.release(sequence, 0.1)
+        self.assertTrue(acquired.wait(5))
+        thread.join()
+
+
+class ThrottleTest(unittest.TestCase):
+    def test_server_errors_count_as_failures(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=8)
+        throttle = Throttle(concurrency_limiter=limiter)
+
+        throttle.finish(throttle.start(), 503)
+
+        self.assertEqual(limiter.limit, 4)
+
+    def test_client_errors_do_not_count_as_failures(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=8)
+        throttle = Throttle(concurrency_limiter=limiter)
+
+        throttle.finish(throttle.start(), 404)
+
+        self.assertEqual(limiter.limit, 8)
+
+    def test_without_limiters(self):
+        throttle = Throttle()
+
+        throttle.finish(throttle.start(), None)
@@ -0,0 +1,137 @@
+###
+# (C) Copyright [2019] Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##
+
+import json
+import os
+import shutil
+import stat
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from simplivity.ovc_client import OVC
+from simplivity.testing.fake_ovc import FakeOVC
+from simplivity.token_cache import TokenCache
+
+
+class TokenCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, "cache", "tokens.json")
+        self.cache = TokenCache(self.path)
+
+    def test_set_and_get(self):
+        self.cache.set("10.0.0.1", "admin", "token-1", 3600)
+
+        token, expires_in = self.cache.get("10.0.0.1", "admin")
+
+        self.assertEqual(token, "token-1")
+        self.assertAlmostEqual(expires_in, 3600, delta=5)
+
+    def test_file_is_private(self):
+        self.cache.set("10.0.0.1", "admin", "token-1", 3600)
+
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o600)
+        self.assertEqual(stat.S_IMODE(os.stat(os.path.dirname(self.path)).st_mode), 0o700)
+
+    def test_tokens_are_keyed_by_ovc_and_user(self):
+        self.cache.set("10.0.0.1", "admin", "token-1", 3600)
+        self.cache.set("10.0.0.2", "admin", "token-2", 3600)
+        self.cache.set("10.0.0.1", "operator", "token-3", 3600)
+
+        self.assertEqual(self.cache.get("10.0.0.1", "admin")[0], "token-1")
+        self.assertEqual(self.cache.get("10.0.0.2", "admin")[0], "token-2")
+        self.assertEqual(self.cache.get("10.0.0.1", "operator")[0], "token-3")
+        self.assertIsNone(self.cache.get("10.0.0.2", "operator"))
+
+    def test_expiring_token_is_not_reused(self):
+        self.cache.set("10.0.0.1", "admin", "token-1", 3600)
+        with mock.patch('simplivity.token_cache.time.time', return_value=time.time() + 3590):
+            self.assertIsNone(self.cache.get("10.0.0.1", "admin"))
+
+    def test_token_without_expiry(self):
+        self.cache.set("10.0.0.1", "admin", "token-1")
+
+        self.assertEqual(self.cache.get("10.0.0.1", "admin"), ("token-1", None))
+
+    def test_remove(self):
+        self.cache.set("10.0.0.1", "admin", "token-1", 3600)
+        self.cache.set("10.0.0.2", "admin", "token-2", 3600)
+
+        self.cache.remove("10.0.0.1", "admin")
+
+        self.assertIsNone(self.cache.get("10.0.0.1", "admin"))
+        self.assertEqual(self.cache.get("10.0.0.2", "admin")[0], "token-2")
+
+    def test_file_accessible_by_other_users_is_ignored(self):
+        self.cache.set("10.0.0.1", "admin", "token-1", 3600)
+        os.chmod(self.path, 0o644)
+
+        self.assertIsNone(self.cache.get("10.0.0.1", "admin"))
+
+    def test_corrupted_file_is_ignored(self):
+        self.cache.set("10.0.0.1", "admin", "token-1", 3600)
+        with open(self.path, 'w') as cache_file:
+            cache_file.write("{not json")
+
+        self.assertIsNone(self.cache.get("10.0.0.1", "admin"))
+        self.cache.set("10.0.0.1", "admin", "token-2", 3600)
+        self.assertEqual(self.cache.get("10.0.0.1", "admin")[0], "token-2")
+
+
+class ConnectionTokenCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, "tokens.json")
+        self.fake = FakeOVC().start()
+        self.addCleanup(self.fake.stop)
+
+    def test_new_client_reuses_the_cached_token(self):
+        OVC(self.fake.config(token_cache=self.path)).hosts.get_all()
+
+        ovc = OVC(self.fake.config(token_cache=self.path))
+        hosts = ovc.hosts.get_all()
+
+        self.assertEqual(len(hosts), 6)
+        self.assertEqual(self.fake.requests["POST /oauth/token"], 1)
+
+    def test_rejected_cached_token_is_replaced(self):
+        OVC(self.fake.config(token_cache=self.path))
+        self.fake.revoke_tokens()
+        with open(self.path) as cache_file:
+            revoked_token = list(json.load(cache_file).values())[0]["access_token"]
+
+        ovc = OVC(self.fake.config(token_cache=self.path))
+        ovc.hosts.get_all()
+
+        self.assertEqual(self.fake.requests["POST /oauth/token"], 2)
+        self.assertNotEqual(TokenCache(self.path).get(self.fake.address, "administrator@vsphere.local")[0], revoked_token)
+
+    def test_cache_write_failure_does_not_fail_the_login(self):
+        path = os.path.join(self.directory, "file", "tokens.json")
+        open(os.path.join(self.directory, "file"), 'w').close()
+
+        with self.assertLogs('simplivity.connection', 'WARNING'):
+            ovc = OVC(self.fake.config(token_cache=path))
+
+        self.assertEqual(len(ovc.hosts.get_all()), 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
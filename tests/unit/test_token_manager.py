@@ -0,0 +1,84 @@
+###
+# (C) Copyright [2019] Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##
+
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from simplivity.token_manager import TokenManager
+
+
+class TokenManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.manager = TokenManager(refresh_margin=30, idle_timeout=600)
+
+    def test_no_token_is_not_expiring(self):
+        self.assertIsNone(self.manager.token)
+        self.assertFalse(self.manager.is_expiring())
+
+    @patch('simplivity.token_manager.time.monotonic')
+    def test_is_expiring_within_refresh_margin(self, mock_time):
+        mock_time.return_value = 1000
+        self.manager.set_token('token', expires_in=100)
+
+        mock_time.return_value = 1069
+        self.assertFalse(self.manager.is_expiring())
+
+        mock_time.return_value = 1070
+        self.assertTrue(self.manager.is_expiring())
+
+    @patch('simplivity.token_manager.time.monotonic')
+    def test_is_expiring_after_idle_timeout(self, mock_time):
+        mock_time.return_value = 1000
+        self.manager.set_token('token')
+
+        mock_time.return_value = 1500
+        self.manager.touch()
+
+        mock_time.return_value = 2069
+        self.assertFalse(self.manager.is_expiring())
+
+        mock_time.return_value = 2070
+        self.assertTrue(self.manager.is_expiring())
+
+    def test_refresh_skipped_when_token_already_replaced(self):
+        self.manager.set_token('new token')
+        logins = []
+
+        refreshed = self.manager.refresh(lambda: logins.append(1), 'old token')
+
+        self.assertFalse(refreshed)
+        self.assertEqual(logins, [])
+
+    def test_concurrent_refreshes_login_once(self):
+        self.manager.set_token('old token')
+        logins = []
+
+        def login():
+            time.sleep(0.05)
+            logins.append(1)
+            self.manager.set_token('new token')
+
+        threads = [threading.Thread(target=self.manager.refresh, args=(login, 'old token')) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(logins), 1)
+        self.assertEqual(self.manager.refresh_count, 1)
+        self.assertEqual(self.manager.token, 'new token')
@@ -0,0 +1,124 @@
+###
+# (C) Copyright [2019] Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##
+
+import json
+import unittest
+from unittest import mock
+
+from simplivity import exceptions
+from simplivity import tracing
+from simplivity.connection import Connection
+from simplivity.resources import datastores
+from simplivity.resources import virtual_machines as machines
+from simplivity.resources.resource import ResourceReference
+from simplivity.resources.tasks import Task
+
+
+class TracingTest(unittest.TestCase):
+    def setUp(self):
+        self.tracer = tracing.RecordingTracer()
+        tracing.enable(self.tracer)
+        self.addCleanup(tracing.disable)
+
+        self.connection = Connection('127.0.0.1')
+        self.connection._access_token = "123456789"
+        self.machines = machines.VirtualMachines(self.connection)
+
+    def test_disabled_records_nothing(self):
+        tracing.disable()
+
+        with tracing.span('operation') as span:
+            span.set_attribute('key', 'value')
+        self.machines.get_by_data({'id': '12345'})
+
+        self.assertFalse(tracing.is_enabled())
+        self.assertEqual(self.tracer.spans, [])
+
+    @mock.patch.object(tracing, 'otel_trace', None)
+    def test_enable_without_opentelemetry(self):
+        with self.assertRaises(exceptions.HPESimpliVityException):
+            tracing.enable()
+
+    def test_resource_method_span(self):
+        vm = self.machines.get_by_data({'id': '12345', 'name': 'vm1'})
+
+        vm_data = {'virtual_machine': {'id': '12345', 'hypervisor_virtual_machine_power_state': 'OFF'}}
+        with mock.patch.object(Connection, 'post', return_value=(None, {})), \
+                mock.patch.object(Connection, 'get', return_value=vm_data):
+            vm.power_off()
+
+        span = self.tracer.get_spans('VirtualMachine.power_off')[0]
+        self.assertEqual(span.attributes, {tracing.RESOURCE_TYPE: 'VirtualMachine', tracing.RESOURCE_ID: '12345'})
+        self.assertIsNone(span.parent)
+
+    def test_factories_and_generators_are_not_traced(self):
+        class Generators(machines.VirtualMachines):
+            def iter_names(self):
+                yield 'vm1'
+
+        names = list(Generators(self.connection).iter_names())
+        self.machines.get_by_data({'id': '12345'})
+
+        self.assertEqual(names, ['vm1'])
+        self.assertEqual(self.tracer.spans, [])
+
+    def test_nested_resource_calls(self):
+        vm = self.machines.get_by_data({'id': '12345', 'name': 'vm1'})
+
+        datastore = ResourceReference({'id': 'ds1', 'name': 'datastore1'}, datastores.Datastore)
+        task = {'task': {'id': 'task-1', 'state': 'COMPLETED', 'affected_objects': [{'object_id': '12345'}]}}
+        with mock.patch.object(Connection, 'post', return_value=(task, task)), \
+                mock.patch.object(Connection, 'get', side_effect=[task, task, {'virtual_machines': [{'id': '12345'}]}]):
+            vm.move('new_vm', datastore)
+
+        get_by_id = self.tracer.get_spans('VirtualMachines.get_by_id')
+        self.assertEqual(get_by_id[0].parent.name, 'VirtualMachine.move')
+        self.assertEqual(self.tracer.get_spans('Task.wait_for_task')[0].parent.name, 'VirtualMachine.move')
+
+    def test_error_recorded(self):
+        with mock.patch.object(Connection, 'get', side_effect=exceptions.HPESimpliVityException("failed")):
+            with self.assertRaises(exceptions.HPESimpliVityException):
+                self.machines.get_all()
+
+        self.assertIsInstance(self.tracer.get_spans('VirtualMachines.get_all')[0].error,
+                              exceptions.HPESimpliVityException)
+
+    @mock.patch('simplivity.resources.tasks.time.sleep')
+    def test_task_wait_span(self, mock_sleep):
+        running = {'task': {'id': 'task-1', 'state': 'IN_PROGRESS'}}
+        completed = {'task': {'id': 'task-1', 'state': 'COMPLETED', 'affected_objects': []}}
+        connection = mock.Mock()
+        connection.get.side_effect = [running, completed, completed]
+
+        Task(connection, running).wait_for_task()
+
+        span = self.tracer.get_spans('Task.wait_for_task')[0]
+        self.assertEqual(span.attributes, {tracing.TASK_ID: 'task-1', tracing.TASK_POLL_COUNT: 3})
+
+    @mock.patch.object(Connection, 'get_connection')
+    def test_http_span(self, mock_connection):
+        mock_response = mock.Mock(status=200)
+        mock_response.read.return_value = json.dumps({'virtual_machines': []}).encode()
+        mock_response.getheader.return_value = None
+        mock_connection.return_value.getresponse.return_value = mock_response
+
+        self.machines.get_all()
+
+        span = self.tracer.get_spans('HTTP GET')[0]
+        self.assertEqual(span.parent.name, 'VirtualMachines.get_all')
+        self.assertEqual(span.attributes[tracing.HTTP_STATUS_CODE], 200)
+        self.assertEqual(span.attributes[tracing.NET_PEER_NAME], '127.0.0.1')
+        self.assertTrue(span.attributes[tracing.HTTP_TARGET].startswith('/virtual_machines?'))